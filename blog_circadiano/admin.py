@@ -2,20 +2,31 @@
 
 from django.contrib import admin
 from .models import Articulo, Comentario, Categoria, Etiqueta, Serie
+from .condicional import marcar_articulos_modificados
+from .contadores import recalcular_articulos
+from .listados_admin import FiltroAutocompletar, ListadoEscalable
+from .views import CAMPOS_PESADOS
 
 # Personalizar la visualización de Articulo en el admin
-class ArticuloAdmin(admin.ModelAdmin):
+class ArticuloAdmin(ListadoEscalable, admin.ModelAdmin):
     # Solución para admin.E108: 'categoria' se puede usar directamente en list_display
     # Solución para admin.E108: 'display_etiquetas' es un método que ya definiste
-    list_display = ('titulo', 'autor', 'fecha_publicacion', 'categoria', 'display_etiquetas', 'total_likes')
+    list_display = ('titulo', 'autor', 'fecha_publicacion', 'categoria', 'display_etiquetas', 'num_likes', 'num_comentarios')
     
     # Solución para admin.E116: Los campos de relación se pueden usar directamente en list_filter
     # Django es lo suficientemente inteligente para crear un filtro por relación.
-    list_filter = ('fecha_publicacion', 'autor', 'categoria', 'etiquetas') # <-- No se necesita cambio aquí, el error es engañoso
+    # El autor se busca con autocompletado: la barra lateral no carga todos los usuarios
+    list_filter = ('fecha_publicacion', ('autor', FiltroAutocompletar), 'categoria', 'etiquetas')
+
+    search_fields = ('titulo', 'texto_plano', 'autor__username', 'categoria__nombre', 'etiquetas__nombre') # Añadir búsqueda por nombre de categoría/etiqueta
+    raw_id_fields = ('autor', 'likes')
+    # Autor y categoría en el mismo SELECT, etiquetas en una consulta para toda la página
+    list_select_related = ('autor', 'categoria')
+    campos_diferidos = CAMPOS_PESADOS
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('etiquetas')
 
-    search_fields = ('titulo', 'contenido', 'autor__username', 'categoria__nombre', 'etiquetas__nombre') # Añadir búsqueda por nombre de categoría/etiqueta
-    raw_id_fields = ('autor',) 
-    
     # Método para mostrar las etiquetas como una cadena separada por comas
     def display_etiquetas(self, obj):
         return ", ".join([tag.nombre for tag in obj.etiquetas.all()])
@@ -23,20 +34,46 @@ class ArticuloAdmin(admin.ModelAdmin):
 
 
 # Personalizar la visualización de Comentario en el admin
-class ComentarioAdmin(admin.ModelAdmin):
-    list_display = ('autor', 'articulo', 'parent', 'fecha_creacion', 'activo', 'total_likes')
-    list_filter = ('activo', 'fecha_creacion', 'autor', 'articulo')
+class ComentarioAdmin(ListadoEscalable, admin.ModelAdmin):
+    list_display = ('autor', 'articulo', 'respuesta_a', 'fecha_creacion', 'activo', 'num_likes')
+    list_filter = ('activo', 'fecha_creacion', ('autor', FiltroAutocompletar), ('articulo', FiltroAutocompletar))
+    # str() del comentario (lo usa también la casilla de acciones) recorre autor, artículo y
+    # autor del padre: todo en el mismo SELECT, sin las columnas pesadas del artículo
+    list_select_related = ('autor', 'articulo', 'parent__autor')
+    campos_diferidos = tuple(f'articulo__{campo}' for campo in CAMPOS_PESADOS) + ('parent__contenido',)
     search_fields = ('autor__username', 'contenido')
+    raw_id_fields = ('articulo', 'parent', 'autor', 'likes')
+    # Los más recientes primero, por la clave primaria (ordenar por fecha no tiene índice)
+    ordering = ('-id',)
     actions = ['make_active', 'make_inactive']
 
+    def respuesta_a(self, obj):
+        return obj.parent.autor.username if obj.parent_id else '-'
+    respuesta_a.short_description = "Respuesta a"
+    respuesta_a.admin_order_field = 'parent__autor__username'
+
+    def get_readonly_fields(self, request, obj=None):
+        # Mover un comentario ya publicado dejaría desfasada la ruta del hilo (suya y de sus respuestas)
+        if obj is not None:
+            return ('articulo', 'parent')
+        return ()
+
     def make_active(self, request, queryset):
-        queryset.update(activo=True)
+        self._cambiar_activo(queryset, True)
     make_active.short_description = "Marcar comentarios seleccionados como activos"
 
     def make_inactive(self, request, queryset):
-        queryset.update(activo=False)
+        self._cambiar_activo(queryset, False)
     make_inactive.short_description = "Marcar comentarios seleccionados como inactivos"
 
+    def _cambiar_activo(self, queryset, activo):
+        # update() no dispara signals: recalculamos el contador de comentarios de los artículos
+        # afectados y los marcamos como modificados (caché de páginas y ETag)
+        articulo_ids = list(queryset.values_list('articulo_id', flat=True).distinct())
+        queryset.update(activo=activo)
+        recalcular_articulos(Articulo.objects.filter(pk__in=articulo_ids))
+        marcar_articulos_modificados(articulo_ids)
+
 class SerieAdmin(admin.ModelAdmin):
     list_display = ('titulo', 'descripcion')
     search_fields = ('titulo',)
@@ -0,0 +1,330 @@
+# blog_circadiano/api.py
+
+"""
+API JSON de solo lectura (versión 1) bajo /blog/api/v1/: artículos, series, categorías
+y etiquetas.
+
+- Campos a elección: ?campos=id,titulo,extracto. Solo se leen de la base de datos las
+  columnas de los campos pedidos. El cuerpo ('contenido', ya renderizado, ver cuerpo.py)
+  y el documento de investigación ('documento') solo se envían si se piden; en el
+  detalle de un artículo el cuerpo va por omisión.
+- Paginación por cursor en /articulos/ (?cursor=..., ?limite=N hasta LIMITE_MAXIMO), la
+  misma de lista_articulos: cada respuesta trae la URL de la página 'siguiente'.
+- Lote por ids: ?ids=3,1,2 devuelve esos artículos o series en ese orden y en una sola
+  consulta (hasta LIMITE_MAXIMO ids; los que no existen se omiten).
+- ETag y Last-Modified, y caché hasta que los datos cambian, como los feeds
+  (condicional.validadores_coleccion y cache_paginas.cache_por_etag).
+
+Categoría, etiquetas y serie de cada artículo salen del registro en memoria
+(taxonomia.py): no suman consultas.
+"""
+
+import hashlib
+from collections import defaultdict
+from functools import wraps
+
+from django.core.files.storage import default_storage
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_safe
+
+from . import taxonomia
+from .cache_paginas import cache_por_etag
+from .condicional import validadores_coleccion
+from .models import Articulo
+from .pagination import CursorInvalido, paginar_por_cursor
+from .rendiciones import RENDICIONES
+from .views import ORDEN_SERIE
+
+LIMITE_POR_OMISION = 20
+LIMITE_MAXIMO = 100
+
+
+class ErrorApi(ValueError):
+    """Parámetros inválidos: se responde 400 con el mensaje."""
+
+
+def _api(vista):
+    # Errores como JSON (400/404) en lugar de las páginas HTML del sitio
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        try:
+            return vista(request, *args, **kwargs)
+        except ErrorApi as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except Http404 as e:
+            return JsonResponse({'error': str(e) or 'No encontrado.'}, status=404)
+    return require_safe(envoltura)
+
+
+# --- Parámetros ---
+
+def _campos(request, disponibles, por_omision):
+    pedido = request.GET.get('campos')
+    if not pedido:
+        return list(por_omision)
+    campos = list(dict.fromkeys(c.strip() for c in pedido.split(',') if c.strip()))
+    desconocidos = [c for c in campos if c not in disponibles]
+    if desconocidos:
+        raise ErrorApi(f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(disponibles)}.")
+    return campos
+
+
+def _ids(request):
+    crudo = request.GET.get('ids')
+    if crudo is None:
+        return None
+    try:
+        ids = [int(i) for i in crudo.split(',') if i.strip()]
+    except ValueError:
+        raise ErrorApi("'ids' debe ser una lista de números separados por comas.")
+    if not ids or len(ids) > LIMITE_MAXIMO:
+        raise ErrorApi(f"'ids' debe tener entre 1 y {LIMITE_MAXIMO} elementos.")
+    return list(dict.fromkeys(ids))
+
+
+def _limite(request):
+    try:
+        limite = int(request.GET.get('limite', LIMITE_POR_OMISION))
+    except ValueError:
+        raise ErrorApi("'limite' debe ser un número.")
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise ErrorApi(f"'limite' debe estar entre 1 y {LIMITE_MAXIMO}.")
+    return limite
+
+
+# --- Representaciones ---
+
+def _absoluta(request, nombre, **kwargs):
+    return request.build_absolute_uri(reverse(nombre, kwargs=kwargs))
+
+
+def _imagen(objeto):
+    if not objeto.imagen_destacada:
+        return None
+    datos = {'original': objeto.imagen_destacada.url}
+    for nombre in RENDICIONES:
+        rendicion = (objeto.imagen_rendiciones or {}).get(nombre)
+        if rendicion:
+            datos[nombre] = {
+                'webp': default_storage.url(rendicion['webp']),
+                'jpeg': default_storage.url(rendicion['jpeg']),
+                'ancho': rendicion['ancho'],
+                'alto': rendicion['alto'],
+            }
+    return datos
+
+
+def _categoria(categoria, request):
+    return {
+        'id': categoria.pk,
+        'slug': categoria.slug,
+        'nombre': categoria.nombre,
+        'num_articulos': categoria.num_articulos,
+        'url': _absoluta(request, 'blog_circadiano:articulos_por_categoria', categoria_slug=categoria.slug),
+    }
+
+
+def _etiqueta(etiqueta, request):
+    return {
+        'id': etiqueta.pk,
+        'slug': etiqueta.slug,
+        'nombre': etiqueta.nombre,
+        'num_articulos': etiqueta.num_articulos,
+        'url': _absoluta(request, 'blog_circadiano:articulos_por_etiqueta', etiqueta_slug=etiqueta.slug),
+    }
+
+
+def _referencia(objeto, campo_nombre='nombre'):
+    return {'id': objeto.pk, 'slug': objeto.slug, campo_nombre: getattr(objeto, campo_nombre)} if objeto else None
+
+
+class _Contexto:
+    """Lo que comparten todas las filas de una respuesta: la petición, el registro y las etiquetas."""
+
+    def __init__(self, request, articulos, campos):
+        self.request = request
+        self.registro = taxonomia.registro()
+        self.etiquetas = defaultdict(list)
+        if 'etiquetas' in campos and articulos:
+            relacion = Articulo.etiquetas.through.objects.filter(articulo_id__in=[a.pk for a in articulos])
+            for articulo_id, etiqueta_id in relacion.values_list('articulo_id', 'etiqueta_id'):
+                etiqueta = self.registro.etiquetas_por_id.get(etiqueta_id)
+                if etiqueta is not None:
+                    self.etiquetas[articulo_id].append(etiqueta)
+
+
+def _serie_de(articulo, ctx):
+    serie = ctx.registro.series_por_id.get(articulo.serie_id)
+    if serie is None:
+        return None
+    return dict(_referencia(serie, 'titulo'), parte=articulo.posicion_serie)
+
+
+# nombre -> (columnas que necesita, función (articulo, contexto) -> valor)
+CAMPOS_ARTICULO = {
+    'id': ((), lambda a, ctx: a.pk),
+    'url': ((), lambda a, ctx: _absoluta(ctx.request, 'blog_circadiano:detalle_articulo', pk=a.pk)),
+    'titulo': (('titulo',), lambda a, ctx: a.titulo),
+    'extracto': (('extracto',), lambda a, ctx: a.extracto),
+    'fecha_publicacion': (('fecha_publicacion',), lambda a, ctx: a.fecha_publicacion),
+    'actualizado': (('actualizado',), lambda a, ctx: a.actualizado),
+    'autor': (('autor__username',), lambda a, ctx: a.autor.username),
+    'categoria': (('categoria',), lambda a, ctx: _referencia(ctx.registro.categorias_por_id.get(a.categoria_id))),
+    'etiquetas': ((), lambda a, ctx: [_referencia(e) for e in sorted(ctx.etiquetas[a.pk], key=lambda e: e.nombre)]),
+    'serie': (('serie', 'posicion_serie'), _serie_de),
+    'palabras': (('palabras',), lambda a, ctx: a.palabras),
+    'minutos_lectura': (('minutos_lectura',), lambda a, ctx: a.minutos_lectura),
+    'num_likes': (('num_likes',), lambda a, ctx: a.num_likes),
+    'num_comentarios': (('num_comentarios',), lambda a, ctx: a.num_comentarios),
+    'imagen': (('imagen_destacada', 'imagen_rendiciones'), lambda a, ctx: _imagen(a)),
+    'guia': (('guia_slug',), lambda a, ctx: _absoluta(ctx.request, 'blog_circadiano:vista_guia', pk=a.pk) if a.guia_slug else None),
+    'contenido': (('contenido_html',), lambda a, ctx: a.contenido_html),
+    'documento': (('documento_html',), lambda a, ctx: a.documento_html or None),
+}
+CAMPOS_PESADOS = ('contenido', 'documento')
+CAMPOS_LISTA = [c for c in CAMPOS_ARTICULO if c not in CAMPOS_PESADOS]
+CAMPOS_DETALLE = CAMPOS_LISTA + ['contenido']
+
+
+def _consulta_articulos(queryset, campos):
+    """Solo las columnas de los campos pedidos (id y fecha_publicacion siempre: los usa el cursor)."""
+    columnas = {'id', 'fecha_publicacion'}
+    for campo in campos:
+        columnas.update(CAMPOS_ARTICULO[campo][0])
+    if 'autor' in campos:
+        queryset = queryset.select_related('autor')
+    return queryset.only(*columnas)
+
+
+def _serializar_articulos(request, articulos, campos):
+    ctx = _Contexto(request, articulos, campos)
+    return [{campo: CAMPOS_ARTICULO[campo][1](articulo, ctx) for campo in campos} for articulo in articulos]
+
+
+# --- Artículos ---
+
+def _filtrar_articulos(request):
+    articulos = Articulo.objects.all()
+    if request.GET.get('categoria'):
+        articulos = articulos.filter(categoria_id=taxonomia.categoria_o_404(request.GET['categoria']).pk)
+    if request.GET.get('etiqueta'):
+        articulos = articulos.filter(etiquetas=taxonomia.etiqueta_o_404(request.GET['etiqueta']).pk)
+    if request.GET.get('serie'):
+        articulos = articulos.filter(serie_id=taxonomia.serie_o_404(request.GET['serie']).pk)
+    ids = _ids(request)
+    if ids is not None:
+        articulos = articulos.filter(pk__in=ids)
+    return articulos
+
+
+# Lista y detalle: el ETag ya distingue la ruta y los parámetros
+etag_articulos, ultima_modificacion_articulos = validadores_coleccion()
+
+
+@_api
+@condition(etag_func=etag_articulos, last_modified_func=ultima_modificacion_articulos)
+@cache_por_etag(etag_articulos)
+def articulos(request):
+    """
+    Lista de artículos, del más reciente al más antiguo.
+    Filtros: ?categoria=<slug>, ?etiqueta=<slug>, ?serie=<slug>, ?ids=1,2,3.
+    """
+    campos = _campos(request, CAMPOS_ARTICULO, CAMPOS_LISTA)
+    consulta = _consulta_articulos(_filtrar_articulos(request), campos)
+
+    ids = _ids(request)
+    if ids is not None:
+        por_id = {a.pk: a for a in consulta}
+        elementos = [por_id[pk] for pk in ids if pk in por_id]
+        return JsonResponse({'resultados': _serializar_articulos(request, elementos, campos), 'siguiente': None})
+
+    try:
+        elementos, cursor = paginar_por_cursor(consulta, request.GET.get('cursor'), _limite(request))
+    except CursorInvalido:
+        raise ErrorApi("Cursor inválido.")
+    siguiente = None
+    if cursor:
+        parametros = request.GET.copy()
+        parametros['cursor'] = cursor
+        siguiente = request.build_absolute_uri(f'{request.path}?{parametros.urlencode()}')
+    return JsonResponse({'resultados': _serializar_articulos(request, elementos, campos), 'siguiente': siguiente})
+
+
+@_api
+@condition(etag_func=etag_articulos, last_modified_func=ultima_modificacion_articulos)
+@cache_por_etag(etag_articulos)
+def articulo(request, pk):
+    campos = _campos(request, CAMPOS_ARTICULO, CAMPOS_DETALLE)
+    elemento = _consulta_articulos(Articulo.objects.filter(pk=pk), campos).first()
+    if elemento is None:
+        raise Http404("Artículo no encontrado.")
+    return JsonResponse(_serializar_articulos(request, [elemento], campos)[0])
+
+
+# --- Series y taxonomía (registro en memoria) ---
+
+def etag_taxonomia(request, *args, **kwargs):
+    return hashlib.sha1(f'{request.get_full_path()}|{taxonomia.version()}'.encode()).hexdigest()
+
+
+def _series(request, series):
+    campos = _campos(
+        request,
+        ['id', 'slug', 'titulo', 'descripcion', 'url', 'num_articulos', 'ultima_publicacion', 'imagen', 'articulos'],
+        ['id', 'slug', 'titulo', 'descripcion', 'url', 'num_articulos', 'ultima_publicacion', 'imagen'],
+    )
+    partes = defaultdict(list)
+    if 'articulos' in campos and series:
+        # Ids de los artículos de cada serie en orden de lectura, en una consulta
+        filas = Articulo.objects.filter(serie_id__in=[s.pk for s in series]).order_by('serie_id', *ORDEN_SERIE)
+        for serie_id, pk in filas.values_list('serie_id', 'pk'):
+            partes[serie_id].append(pk)
+
+    valores = {
+        'id': lambda s: s.pk,
+        'slug': lambda s: s.slug,
+        'titulo': lambda s: s.titulo,
+        'descripcion': lambda s: s.descripcion,
+        'url': lambda s: _absoluta(request, 'blog_circadiano:detalle_serie', serie_slug=s.slug),
+        'num_articulos': lambda s: s.num_articulos,
+        'ultima_publicacion': lambda s: s.ultima_publicacion,
+        'imagen': _imagen,
+        'articulos': lambda s: partes[s.pk],
+    }
+    return [{campo: valores[campo](serie) for campo in campos} for serie in series]
+
+
+@_api
+@condition(etag_func=etag_taxonomia)
+@cache_por_etag(etag_taxonomia)
+def series(request):
+    """Todas las series (o las de ?ids=1,2,3, en ese orden). Con ?campos=...,articulos, los ids de sus partes."""
+    registro = taxonomia.registro()
+    ids = _ids(request)
+    if ids is None:
+        elegidas = registro.series
+    else:
+        elegidas = [registro.series_por_id[pk] for pk in ids if pk in registro.series_por_id]
+    return JsonResponse({'resultados': _series(request, elegidas), 'siguiente': None})
+
+
+@_api
+@condition(etag_func=etag_taxonomia)
+@cache_por_etag(etag_taxonomia)
+def serie(request, serie_slug):
+    return JsonResponse(_series(request, [taxonomia.serie_o_404(serie_slug)])[0])
+
+
+@_api
+@condition(etag_func=etag_taxonomia)
+@cache_por_etag(etag_taxonomia)
+def categorias(request):
+    return JsonResponse({'resultados': [_categoria(c, request) for c in taxonomia.registro().categorias], 'siguiente': None})
+
+
+@_api
+@condition(etag_func=etag_taxonomia)
+@cache_por_etag(etag_taxonomia)
+def etiquetas(request):
+    return JsonResponse({'resultados': [_etiqueta(e, request) for e in taxonomia.registro().etiquetas], 'siguiente': None})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BlogCircadianoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog_circadiano'
+
+    def ready(self):
+        import blog_circadiano.signals
@@ -0,0 +1,236 @@
+# blog_circadiano/cache_paginas.py
+
+"""
+Caché de páginas completas para visitantes anónimos.
+
+Cada entrada se guarda por ruta + parámetros GET junto con la "versión" de los
+datos con que se renderizó:
+
+- la versión del registro de taxonomía (cambia con las categorías, etiquetas y
+  series y con los artículos que entran o salen de ellas; ver taxonomia.py y signals.py), y
+- la generación de un artículo concreto (cambia con el artículo, sus comentarios y
+  sus likes) en su página de detalle, o la de los listados (cambia al guardar o
+  borrar cualquier artículo) en las demás páginas.
+
+Las generaciones cambian al confirmar la transacción que modificó los datos: si
+cambiaran antes, una petición que llegara entre medio renderizaría los datos viejos
+y los guardaría como vigentes bajo la generación nueva.
+
+Si la versión no coincide, la entrada queda obsoleta pero no se borra: una sola
+petición obtiene el candado y vuelve a renderizar (single-flight) mientras las
+demás siguen recibiendo la copia obsoleta (stale-while-revalidate). Así un pico
+de visitas sobre un artículo recién compartido cuesta un render, no miles.
+
+Los feeds, sitemaps y la API usan cache_por_etag(): su ETag ya identifica el contenido
+(con la generación de colecciones, que cambia con cualquier artículo), así que la
+entrada vale hasta que los datos cambian y nunca se sirve obsoleta.
+"""
+
+import hashlib
+import re
+import time
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone
+
+from . import taxonomia
+
+SEGUNDOS_FRESCO = 60 * 60            # una entrada vigente se re-renderiza igualmente cada hora
+SEGUNDOS_EN_CACHE = 60 * 60 * 24     # tiempo máximo que se conserva una copia (aunque esté obsoleta)
+SEGUNDOS_CANDADO = 30                # si quien renderiza muere, otro lo intenta tras este plazo
+SEGUNDOS_ESPERA_PRIMER_RENDER = 2.0  # sin copia previa, cuánto esperar a que otro termine de renderizar
+INTERVALO_ESPERA = 0.05
+
+# El token CSRF del formulario oculto de base.html depende de la cookie de cada visitante:
+# se guarda un marcador y se sustituye por un token válido al servir la copia.
+_TOKEN_CSRF = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+_MARCADOR_CSRF = '__csrf_token_pagina__'
+
+
+CLAVE_GENERACION_LISTADOS = 'pagina:gen:listados'
+CLAVE_GENERACION_COLECCIONES = 'pagina:gen:colecciones'
+
+
+def _clave_generacion_articulo(pk):
+    return f'pagina:gen:articulo:{pk}'
+
+
+def _generacion(clave):
+    generacion = cache.get(clave)
+    if generacion is None:
+        cache.add(clave, uuid.uuid4().hex, None)
+        generacion = cache.get(clave)
+    return generacion
+
+
+def invalidar_articulos(pks):
+    """Marca como obsoletas las páginas que dependen de esos artículos (detalle, comentarios, likes)."""
+    claves = [_clave_generacion_articulo(pk) for pk in set(pks)]
+    if claves:
+        transaction.on_commit(lambda: cache.set_many({clave: uuid.uuid4().hex for clave in claves}, None))
+
+
+def invalidar_articulo(pk):
+    invalidar_articulos([pk])
+
+
+def invalidar_listados():
+    """Marca como obsoletas las páginas que listan artículos (portada, listas, series)."""
+    transaction.on_commit(lambda: cache.set(CLAVE_GENERACION_LISTADOS, uuid.uuid4().hex, None))
+
+
+def generacion_listados():
+    return _generacion(CLAVE_GENERACION_LISTADOS)
+
+
+def _nueva_generacion_colecciones():
+    # HTTP solo transmite segundos: Last-Modified sin microsegundos
+    return uuid.uuid4().hex, timezone.now().replace(microsecond=0)
+
+
+def invalidar_colecciones():
+    """Marca como obsoletos los documentos de un conjunto de artículos (feeds, sitemaps, API)."""
+    transaction.on_commit(lambda: cache.set(CLAVE_GENERACION_COLECCIONES, _nueva_generacion_colecciones(), None))
+
+
+def generacion_colecciones():
+    """
+    (generación, momento en que empezó) de esos documentos. Si la caché la perdió empieza
+    una nueva con la hora actual: los clientes descargan de nuevo una vez, nunca de menos.
+    """
+    generacion = cache.get(CLAVE_GENERACION_COLECCIONES)
+    if generacion is None:
+        cache.add(CLAVE_GENERACION_COLECCIONES, _nueva_generacion_colecciones(), None)
+        generacion = cache.get(CLAVE_GENERACION_COLECCIONES)
+    return generacion
+
+
+def _version_actual(articulo_pk):
+    if articulo_pk is None:
+        return (taxonomia.version(), generacion_listados())
+    return (taxonomia.version(), _generacion(_clave_generacion_articulo(articulo_pk)))
+
+
+def _clave_pagina(request):
+    parametros = sorted(request.GET.lists())
+    crudo = f'{request.path}?{parametros}'.encode()
+    return 'pagina:' + hashlib.sha256(crudo).hexdigest()
+
+
+def _es_cacheable(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+
+
+def _responder(request, entrada, estado):
+    contenido = entrada['contenido'].replace(_MARCADOR_CSRF, get_token(request))
+    response = HttpResponse(contenido, content_type=entrada['content_type'])
+    response['X-Cache-Pagina'] = estado
+    return response
+
+
+def _guardar(clave, response, version):
+    contenido = _TOKEN_CSRF.sub(rf'\g<1>{_MARCADOR_CSRF}\g<2>', response.content.decode(response.charset))
+    entrada = {
+        'contenido': contenido,
+        'content_type': response['Content-Type'],
+        'version': version,
+        'fresco_hasta': time.time() + SEGUNDOS_FRESCO,
+    }
+    cache.set(clave, entrada, SEGUNDOS_EN_CACHE)
+
+
+def cache_anonimo(articulo_kwarg=None):
+    """
+    Decorador para vistas públicas. Solo actúa en GET/HEAD de visitantes anónimos
+    y solo guarda respuestas 200. Si se indica articulo_kwarg (ej. 'pk'), la página
+    depende además de la generación de ese artículo.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if not _es_cacheable(request):
+                return vista(request, *args, **kwargs)
+
+            clave = _clave_pagina(request)
+            clave_candado = clave + ':candado'
+            version = _version_actual(kwargs.get(articulo_kwarg) if articulo_kwarg else None)
+            entrada = cache.get(clave)
+
+            if entrada is not None and entrada['version'] == version and entrada['fresco_hasta'] > time.time():
+                return _responder(request, entrada, 'HIT')
+
+            # Solo quien obtiene el candado renderiza; el resto sirve la copia obsoleta o espera la primera.
+            tiene_candado = cache.add(clave_candado, 1, SEGUNDOS_CANDADO)
+            if not tiene_candado:
+                if entrada is not None:
+                    return _responder(request, entrada, 'STALE')
+                limite = time.monotonic() + SEGUNDOS_ESPERA_PRIMER_RENDER
+                while time.monotonic() < limite:
+                    time.sleep(INTERVALO_ESPERA)
+                    entrada = cache.get(clave)
+                    if entrada is not None:
+                        return _responder(request, entrada, 'HIT')
+
+            try:
+                response = vista(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    if hasattr(response, 'render') and callable(response.render):
+                        response.render()
+                    _guardar(clave, response, version)
+                response['X-Cache-Pagina'] = 'MISS'
+                return response
+            finally:
+                if tiene_candado:
+                    cache.delete(clave_candado)
+        return envoltura
+    return decorador
+
+
+def _guardar_al_transmitir(clave, contenido, content_type):
+    # La copia se guarda solo si la respuesta se envió completa
+    partes = []
+    for parte in contenido:
+        partes.append(parte)
+        yield parte
+    entrada = {'contenido': b''.join(partes), 'content_type': content_type}
+    cache.set(clave, entrada, SEGUNDOS_EN_CACHE)
+
+
+def cache_por_etag(etag_func):
+    """
+    Decorador para documentos públicos iguales para todos los visitantes (feeds, sitemaps)
+    cuyo ETag identifica el contenido (ver condicional.validadores_coleccion). La copia se
+    guarda por ruta + ETag: los crawlers reciben la guardada hasta que los datos cambian.
+    Las respuestas en streaming se guardan a medida que se envían.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(request, *args, **kwargs)
+
+            etag = etag_func(request, *args, **kwargs)
+            clave = 'documento:' + hashlib.sha256(f'{request.get_full_path()}|{etag}'.encode()).hexdigest()
+            entrada = cache.get(clave)
+            if entrada is not None:
+                response = HttpResponse(entrada['contenido'], content_type=entrada['content_type'])
+                response['X-Cache-Pagina'] = 'HIT'
+                return response
+
+            response = vista(request, *args, **kwargs)
+            if response.status_code == 200:
+                if response.streaming:
+                    response.streaming_content = _guardar_al_transmitir(
+                        clave, response.streaming_content, response['Content-Type']
+                    )
+                else:
+                    cache.set(clave, {'contenido': response.content, 'content_type': response['Content-Type']}, SEGUNDOS_EN_CACHE)
+            response['X-Cache-Pagina'] = 'MISS'
+            return response
+        return envoltura
+    return decorador
@@ -0,0 +1,142 @@
+# blog_circadiano/comentarios.py
+
+"""
+Hilos de comentarios cargados por partes y con un número fijo de consultas.
+
+Cada comentario guarda su ruta materializada (ids de sus ancestros + el propio),
+así que ordenar por ruta devuelve un subárbol completo, a cualquier profundidad,
+en orden de lectura: cada comentario seguido de sus respuestas. La plantilla lo
+recorre como una lista plana (sin includes recursivos) usando el nivel de cada
+nodo para abrir y cerrar las listas de respuestas.
+
+La página del artículo no trae comentarios: script.js pide al abrir la sección
+una página de comentarios principales (vista comentarios_articulo) y las
+respuestas de cada uno solo cuando el lector las despliega.
+"""
+
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import StartsWith
+
+from .models import Comentario
+from .pagination import paginar_por_cursor
+
+COMENTARIOS_POR_PAGINA = 20
+
+
+def _num_respuestas():
+    """
+    Respuestas visibles (a cualquier profundidad) de cada comentario, como subconsulta: las
+    activas que no cuelgan de una respuesta inactiva, igual que las deja _aplanar().
+    """
+    # Respuesta inactiva del mismo hilo de la que desciende el comentario contado
+    ocultas = Comentario.objects.filter(
+        articulo_id=OuterRef(OuterRef('articulo_id')),
+        ruta__startswith=OuterRef(OuterRef('ruta')),
+        profundidad__gt=OuterRef(OuterRef('profundidad')),
+        activo=False,
+    ).filter(StartsWith(OuterRef('ruta'), F('ruta')))
+    descendientes = Comentario.objects.filter(
+        articulo_id=OuterRef('articulo_id'),
+        ruta__startswith=OuterRef('ruta'),
+        profundidad__gt=OuterRef('profundidad'),
+        activo=True,
+    ).exclude(Exists(ocultas))
+    return Coalesce(
+        Subquery(
+            descendientes.order_by().values('articulo_id')
+            .annotate(total=Count('*')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _aplanar(comentarios, articulo, profundidad_base=0):
+    """
+    Recorre comentarios ordenados por ruta y deja solo los visibles (las respuestas
+    de un comentario inactivo se ocultan junto con él). Cada nodo recibe:
+
+    - 'nivel': profundidad relativa a profundidad_base,
+    - 'tiene_respuestas': a continuación se abre su lista de respuestas,
+    - 'cierres': cuántas listas de respuestas se cierran después de él.
+    """
+    nodos = []
+    ruta_oculta = None
+    for comentario in comentarios:
+        if ruta_oculta is not None and comentario.ruta.startswith(ruta_oculta):
+            continue
+        if not comentario.activo:
+            ruta_oculta = comentario.ruta
+            continue
+        ruta_oculta = None
+        comentario.articulo = articulo  # evita una consulta si la plantilla lo usa
+        # Un nodo nunca baja más de un nivel respecto del anterior (HTML siempre bien anidado)
+        nivel_anterior = nodos[-1].nivel if nodos else -1
+        comentario.nivel = min(comentario.profundidad - profundidad_base, nivel_anterior + 1)
+        nodos.append(comentario)
+
+    for actual, siguiente in zip(nodos, nodos[1:] + [None]):
+        nivel_siguiente = siguiente.nivel if siguiente is not None else 0
+        actual.tiene_respuestas = nivel_siguiente > actual.nivel
+        actual.cierres = range(max(actual.nivel - nivel_siguiente, 0))
+    return nodos
+
+
+def respuestas(raiz, articulo):
+    """Todas las respuestas visibles de 'raiz' (comentario de 'articulo'), en orden de lectura, con una consulta."""
+    comentarios = (
+        Comentario.objects.filter(articulo_id=raiz.articulo_id, ruta__startswith=raiz.ruta)
+        .exclude(pk=raiz.pk)
+        .select_related('autor')
+        .order_by('ruta')
+    )
+    return _aplanar(comentarios, articulo, profundidad_base=raiz.profundidad + 1)
+
+
+def pagina(articulo, cursor=None, por_pagina=COMENTARIOS_POR_PAGINA, destacado=None):
+    """
+    Una página de comentarios principales (los más recientes primero), cada uno con
+    'num_respuestas'. Retorna (comentarios, siguiente_cursor).
+
+    Si se indica 'destacado' (id de cualquier comentario del artículo, ej. el recién
+    publicado), su hilo se muestra primero y desplegado en la primera página: su
+    comentario principal trae el atributo 'respuestas' con el subárbol ya aplanado.
+    Las páginas siguientes, pedidas con el mismo 'destacado', no lo repiten.
+    """
+    principales = (
+        Comentario.objects.filter(articulo=articulo, parent__isnull=True, activo=True)
+        .select_related('autor')
+        .annotate(num_respuestas=_num_respuestas())
+    )
+    raiz_pk = None
+    if destacado is not None:
+        ruta = Comentario.objects.filter(pk=destacado, articulo=articulo).values_list('ruta', flat=True).first()
+        raiz_pk = int(ruta[:Comentario.DIGITOS_RUTA]) if ruta else None
+
+    # El hilo destacado queda fuera de la paginación en todas las páginas
+    paginados = principales.exclude(pk=raiz_pk) if raiz_pk is not None else principales
+    comentarios, siguiente_cursor = paginar_por_cursor(
+        paginados, cursor, por_pagina, campo='fecha_creacion'
+    )
+
+    if raiz_pk is not None and not cursor:
+        raiz = principales.filter(pk=raiz_pk).first()
+        if raiz is not None:
+            raiz.respuestas = respuestas(raiz, articulo)
+            comentarios = [raiz] + list(comentarios)
+
+    for comentario in comentarios:
+        comentario.articulo = articulo
+    return comentarios, siguiente_cursor
+
+
+def ids_con_like(usuario, comentarios):
+    """Ids de los comentarios dados que le gustan al usuario (una consulta; vacío si es anónimo)."""
+    if not usuario.is_authenticated or not comentarios:
+        return set()
+    return set(
+        Comentario.likes.through.objects.filter(
+            user_id=usuario.pk, comentario_id__in=[c.pk for c in comentarios]
+        ).values_list('comentario_id', flat=True)
+    )
@@ -0,0 +1,132 @@
+# blog_circadiano/condicional.py
+
+"""
+Validadores para GET condicional (ETag / Last-Modified / 304) de las páginas de artículos.
+
+Se usan con django.views.decorators.http.condition, que los evalúa ANTES de la vista:
+si el navegador ya tiene la versión vigente, la respuesta es un 304 que cuesta una
+consulta por clave primaria y ningún render de plantilla.
+
+La validez de una página depende de:
+- Articulo.actualizado (cambia con el artículo, sus comentarios, likes y taxonomía),
+- la versión de las plantillas desplegadas, y
+- para usuarios con sesión, lo que el encabezado muestra de ellos (usuario, token CSRF
+  de los formularios y contador de mensajes no leídos).
+
+Los feeds y sitemaps (documentos generados a partir de un conjunto de artículos) usan
+validadores_coleccion().
+"""
+
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from mensajeria.context_processors import unread_messages_count
+
+from . import taxonomia
+from .cache_paginas import generacion_colecciones, invalidar_articulos, invalidar_colecciones
+from .models import Articulo
+
+
+@lru_cache(maxsize=None)
+def _plantillas_modificadas():
+    """
+    Fecha de la plantilla modificada más recientemente. Las plantillas solo cambian con
+    un despliegue (que reinicia los procesos), así que se calcula una vez por proceso.
+    """
+    directorios = [Path(__file__).resolve().parent / 'templates']
+    for plantillas in settings.TEMPLATES:
+        directorios.extend(Path(d) for d in plantillas.get('DIRS', []))
+
+    mtime = 0.0
+    for directorio in directorios:
+        for archivo in directorio.rglob('*.html'):
+            mtime = max(mtime, archivo.stat().st_mtime)
+    return datetime.fromtimestamp(int(mtime), tz=dt_timezone.utc)
+
+
+def _actualizado(request, pk):
+    """Articulo.actualizado con una sola consulta por petición (ETag y Last-Modified la comparten)."""
+    memo = request.__dict__.setdefault('_articulo_actualizado', {})
+    if pk not in memo:
+        memo[pk] = Articulo.objects.filter(pk=pk).values_list('actualizado', flat=True).first()
+    return memo[pk]
+
+
+def _estado_usuario(request):
+    if not request.user.is_authenticated:
+        return 'anonimo'
+    no_leidos = unread_messages_count(request)
+    return ':'.join([
+        str(request.user.pk),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        str(no_leidos['unread_messages_count']),
+        str(no_leidos['has_unread_messages_overall']),
+    ])
+
+
+def etag_articulo(request, pk, **kwargs):
+    actualizado = _actualizado(request, pk)
+    if actualizado is None:
+        return None  # la vista responderá 404
+    crudo = f'{pk}|{actualizado.isoformat()}|{_plantillas_modificadas().isoformat()}|{_estado_usuario(request)}'
+    return hashlib.sha1(crudo.encode()).hexdigest()
+
+
+def ultima_modificacion_articulo(request, pk, **kwargs):
+    # Con sesión la página cambia también por datos del usuario: solo se valida por ETag
+    if request.user.is_authenticated:
+        return None
+    actualizado = _actualizado(request, pk)
+    if actualizado is None:
+        return None
+    return max(actualizado, _plantillas_modificadas())
+
+
+def _generacion_colecciones(request):
+    """generacion_colecciones() una vez por petición (ETag, Last-Modified y cache_por_etag la comparten)."""
+    if not hasattr(request, '_generacion_colecciones'):
+        request._generacion_colecciones = generacion_colecciones()
+    return request._generacion_colecciones
+
+
+def validadores_coleccion():
+    """
+    ETag y Last-Modified (para condition()) de un documento que depende de un conjunto de
+    artículos (feeds, sitemaps, API).
+
+    No consultan los artículos: salen de la generación de colecciones guardada en la
+    caché (cache_paginas.generacion_colecciones), que cambia con cualquier alta, baja o
+    cambio de un artículo (signals.py) y con marcar_articulos_modificados (comentarios,
+    likes, nombres de su taxonomía). El ETag incluye además la ruta y la versión de la
+    taxonomía (categorías, etiquetas o series nuevas). Last-Modified es el último cambio
+    de cualquier artículo, no solo de los del conjunto: a lo sumo, una descarga de más.
+    """
+    def etag(request, *args, **kwargs):
+        generacion, _ = _generacion_colecciones(request)
+        crudo = f'{request.get_full_path()}|{generacion}|{taxonomia.version()}'
+        return hashlib.sha1(crudo.encode()).hexdigest()
+
+    def ultima_modificacion(request, *args, **kwargs):
+        return _generacion_colecciones(request)[1]
+
+    return etag, ultima_modificacion
+
+
+def marcar_articulos_modificados(pks):
+    """
+    Para cambios que no pasan por Articulo.save() (comentarios, likes, taxonomía, acciones
+    masivas): adelanta 'actualizado' y marca como obsoletas la página cacheada de cada
+    artículo y las colecciones (feeds, sitemaps, API).
+    """
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return
+    Articulo.objects.filter(pk__in=pks).update(actualizado=timezone.now())
+    # Las generaciones cambian al confirmar la transacción (ver cache_paginas.py)
+    invalidar_articulos(pks)
+    invalidar_colecciones()
@@ -0,0 +1,54 @@
+# blog_circadiano/contadores.py
+
+"""
+Contadores desnormalizados de likes y comentarios.
+
+En el día a día se mantienen con incrementos atómicos F() desde signals.py.
+Las funciones recalcular_* los reconstruyen desde las tablas de origen con un
+UPDATE por conjunto (sin traer filas a Python); las usa el comando
+'manage.py reconciliar_contadores' y las acciones masivas del admin.
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Articulo, Comentario
+
+
+def _conteo(queryset, campo):
+    """Subconsulta correlacionada que cuenta las filas de 'queryset' agrupadas por 'campo'."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{campo: OuterRef('pk')}).order_by().values(campo)
+            .annotate(total=Count('*')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def sumar(modelo, pks, campo, cantidad):
+    """Suma (o resta, si cantidad < 0) de forma atómica en la base de datos, sin bajar de cero."""
+    if not pks or not cantidad:
+        return
+    modelo.objects.filter(pk__in=pks).update(**{campo: Greatest(F(campo) + cantidad, Value(0))})
+
+
+def recalcular_articulos(queryset=None):
+    """Recalcula num_likes y num_comentarios (activos) de los artículos indicados (todos por defecto)."""
+    if queryset is None:
+        queryset = Articulo.objects.all()
+    likes = Articulo.likes.through.objects.all()
+    comentarios = Comentario.objects.filter(activo=True)
+    return queryset.update(
+        num_likes=_conteo(likes, 'articulo_id'),
+        num_comentarios=_conteo(comentarios, 'articulo_id'),
+    )
+
+
+def recalcular_comentarios(queryset=None):
+    """Recalcula num_likes de los comentarios indicados (todos por defecto)."""
+    if queryset is None:
+        queryset = Comentario.objects.all()
+    likes = Comentario.likes.through.objects.all()
+    return queryset.update(num_likes=_conteo(likes, 'comentario_id'))
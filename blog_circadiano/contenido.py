@@ -0,0 +1,59 @@
+# blog_circadiano/contenido.py
+
+import hashlib
+import html
+import math
+import re
+
+from django.utils.html import strip_tags
+
+PALABRAS_POR_MINUTO = 200
+LARGO_EXTRACTO = 280
+
+_ESPACIOS = re.compile(r'\s+')
+# Bloques cuyo contenido no es texto legible (CKEditor puede incrustar estilos o scripts)
+_BLOQUES_NO_TEXTO = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# Etiquetas de bloque: se reemplazan por un espacio para no pegar palabras de párrafos distintos
+_ETIQUETAS_BLOQUE = re.compile(r'<\s*(br|/p|/div|/li|/h[1-6]|/td|/tr|/blockquote)\b[^>]*>', re.IGNORECASE)
+
+
+def html_a_texto(contenido_html):
+    """
+    Convierte el HTML de CKEditor en texto plano de una sola línea:
+    sin etiquetas, con las entidades decodificadas y los espacios normalizados.
+    """
+    if not contenido_html:
+        return ''
+    texto = _BLOQUES_NO_TEXTO.sub(' ', contenido_html)
+    texto = _ETIQUETAS_BLOQUE.sub(' ', texto)
+    texto = html.unescape(strip_tags(texto))
+    return _ESPACIOS.sub(' ', texto).strip()
+
+
+def hash_contenido(contenido_html):
+    """Huella SHA-256 del HTML; permite saber si hay que volver a derivar los campos."""
+    return hashlib.sha256((contenido_html or '').encode('utf-8')).hexdigest()
+
+
+def extracto(texto, largo=LARGO_EXTRACTO):
+    """Recorta el texto plano en el último espacio antes de 'largo' caracteres."""
+    if len(texto) <= largo:
+        return texto
+    recorte = texto[:largo].rsplit(' ', 1)[0]
+    return recorte.rstrip(' ,;:.') + '…'
+
+
+def derivar_campos(contenido_html):
+    """
+    Calcula de una sola pasada los campos derivados del contenido de un artículo.
+    Retorna un diccionario con los nombres de campo de Articulo.
+    """
+    texto = html_a_texto(contenido_html)
+    palabras = len(texto.split())
+    return {
+        'texto_plano': texto,
+        'extracto': extracto(texto),
+        'palabras': palabras,
+        'minutos_lectura': max(1, math.ceil(palabras / PALABRAS_POR_MINUTO)),
+        'hash_contenido': hash_contenido(contenido_html),
+    }
@@ -0,0 +1,353 @@
+# blog_circadiano/cuerpo.py
+
+"""
+Renderizado del cuerpo de los artículos (contenido y documento detallado).
+
+El HTML que guarda CKEditor se limpia y normaliza una sola vez, al guardar el
+artículo, y el resultado queda en Articulo.contenido_html / documento_html junto
+con la huella de lo que se renderizó. En cada visita la plantilla solo emite ese
+texto ya calculado.
+
+En la misma pasada:
+- se descartan etiquetas, atributos y URLs fuera de la lista permitida
+  (scripts, manejadores on*, javascript:, iframes de sitios desconocidos...),
+- se cierran las etiquetas que quedaron abiertas,
+- los títulos h2-h6 reciben un id y un enlace ancla,
+- los enlaces a otros sitios se abren en otra pestaña con rel="noopener noreferrer", y
+- las imágenes cargan en diferido (loading="lazy") y las subidas con CKEditor llevan
+  sus dimensiones y un srcset con variantes más livianas (ver imagenes.py).
+
+Si cambian estas reglas hay que subir VERSION: así 'manage.py renderizar_cuerpos'
+sabe que todos los artículos deben volver a renderizarse.
+"""
+
+import hashlib
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http.request import validate_host
+from django.utils.text import slugify
+
+VERSION = 3
+
+ETIQUETAS_PERMITIDAS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'cite', 'code', 'col', 'colgroup',
+    'dd', 'del', 'div', 'dl', 'dt', 'em', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'ins', 'li', 'mark', 'ol', 'p', 'pre', 'q',
+    's', 'small', 'span', 'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+# Etiquetas que se eliminan junto con todo su contenido
+ETIQUETAS_DESCARTADAS = {'script', 'style', 'object', 'embed', 'applet', 'noscript', 'template', 'svg', 'math'}
+ETIQUETAS_VACIAS = {'br', 'col', 'hr', 'img'}
+TITULOS_CON_ANCLA = {'h2', 'h3', 'h4', 'h5', 'h6'}
+# Etiquetas cuyo cierre es opcional en HTML: abrir una cierra la anterior del mismo grupo
+CIERRES_IMPLICITOS = {
+    'li': {'li'}, 'p': {'p'}, 'dt': {'dt', 'dd'}, 'dd': {'dt', 'dd'},
+    'td': {'td', 'th'}, 'th': {'td', 'th'}, 'tr': {'tr', 'td', 'th'},
+}
+
+ATRIBUTOS_GLOBALES = {'class', 'dir', 'id', 'lang', 'style', 'title'}
+ATRIBUTOS_PERMITIDOS = {
+    'a': {'href', 'name', 'rel', 'target'},
+    'col': {'span', 'width'},
+    'colgroup': {'span', 'width'},
+    'iframe': {'allow', 'allowfullscreen', 'frameborder', 'height', 'src', 'width'},
+    'img': {'alt', 'height', 'src', 'width'},
+    'li': {'value'},
+    'ol': {'reversed', 'start', 'type'},
+    'table': {'border', 'cellpadding', 'cellspacing', 'summary', 'width'},
+    'td': {'align', 'colspan', 'rowspan', 'valign', 'width'},
+    'th': {'align', 'colspan', 'rowspan', 'scope', 'valign', 'width'},
+}
+ATRIBUTOS_URL = {'href', 'src'}
+ESQUEMAS_PERMITIDOS = {'http', 'https', 'mailto', 'tel'}
+# Solo se conservan iframes (vídeos, podcasts) de estos sitios y por https
+SITIOS_IFRAME = {
+    'www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com',
+    'open.spotify.com', 'docs.google.com',
+}
+_ANCHO_EN_ESTILO = re.compile(r'(?:^|;)\s*width\s*:\s*(\d+)px', re.IGNORECASE)
+_ESTILO_PELIGROSO = ('expression', 'javascript:', 'url(', '@import', 'behavior')
+
+
+def huella(contenido, documento):
+    """Identifica lo renderizado: versión de las reglas + HTML de origen de ambos cuerpos."""
+    crudo = f'{VERSION}\x00{contenido or ""}\x00{documento or ""}'
+    return hashlib.sha256(crudo.encode('utf-8')).hexdigest()
+
+
+def _es_externo(url):
+    host = urlsplit(url).hostname
+    if not host:
+        return False
+    hosts_propios = [h for h in settings.ALLOWED_HOSTS if h != '*']
+    return not validate_host(host, hosts_propios)
+
+
+def _url_segura(valor):
+    # Los navegadores ignoran espacios y caracteres de control dentro del esquema ("java\tscript:")
+    limpio = ''.join(c for c in valor if c > ' ').strip()
+    esquema = urlsplit(limpio).scheme.lower() if ':' in limpio else ''
+    if esquema and esquema not in ESQUEMAS_PERMITIDOS:
+        return None
+    return valor.strip()
+
+
+class _Limpiador(HTMLParser):
+    def __init__(self, imagenes=None, ids=()):
+        super().__init__(convert_charrefs=True)
+        self.imagenes = imagenes or {}  # src -> ImagenContenido
+        self.salida = []
+        self.abiertas = []
+        self.descartando = 0
+        # Los ids explícitos del fragmento, reservados de antemano: un título anterior sin id
+        # no puede generar el mismo id que uno escrito más abajo
+        self.ids_usados = set(ids)
+        self.titulo = None  # (etiqueta, atributos, posición en salida) del título en curso
+
+    # --- Atributos ---
+
+    def _atributos(self, etiqueta, atributos):
+        permitidos = ATRIBUTOS_GLOBALES | ATRIBUTOS_PERMITIDOS.get(etiqueta, set())
+        limpios = {}
+        for nombre, valor in atributos:
+            nombre = nombre.lower()
+            if nombre not in permitidos or nombre in limpios:
+                continue
+            valor = valor if valor is not None else ''
+            if nombre in ATRIBUTOS_URL:
+                valor = _url_segura(valor)
+                if valor is None:
+                    continue
+            elif nombre == 'style' and any(p in valor.lower() for p in _ESTILO_PELIGROSO):
+                continue
+            limpios[nombre] = valor
+
+        if etiqueta == 'a' and _es_externo(limpios.get('href', '')):
+            limpios['target'] = '_blank'
+            rel = set(limpios.get('rel', '').split()) | {'noopener', 'noreferrer'}
+            limpios['rel'] = ' '.join(sorted(rel))
+        if etiqueta == 'img':
+            self._imagen_responsiva(limpios)
+        if 'id' in limpios:
+            self.ids_usados.add(limpios['id'])
+        return limpios
+
+    def _imagen_responsiva(self, atributos):
+        registro = self.imagenes.get(atributos.get('src'))
+        if registro is not None:
+            # Dimensiones intrínsecas (evitan saltos de diseño); si CKEditor fijó el ancho
+            # (atributo o style="width: 500px"), se respeta con la proporción de la imagen
+            ancho = atributos.get('width', '')
+            if not ancho.isdigit():
+                en_estilo = _ANCHO_EN_ESTILO.search(atributos.get('style', ''))
+                ancho = en_estilo.group(1) if en_estilo else str(registro.ancho)
+            atributos['width'] = ancho
+            atributos['height'] = str(round(int(ancho) * registro.alto / registro.ancho))
+            if registro.variantes:
+                candidatos = sorted(registro.variantes.items(), key=lambda v: int(v[0]))
+                atributos['srcset'] = ', '.join(
+                    [f'{url} {ancho_v}w' for ancho_v, url in candidatos] + [f'{atributos["src"]} {registro.ancho}w']
+                )
+                atributos['sizes'] = f'(max-width: {ancho}px) 100vw, {ancho}px'
+        atributos['loading'] = 'lazy'
+        atributos['decoding'] = 'async'
+
+    def _iframe_permitido(self, atributos):
+        src = dict(atributos).get('src') or ''
+        partes = urlsplit(src.strip())
+        return partes.scheme == 'https' and partes.hostname in SITIOS_IFRAME
+
+    @staticmethod
+    def _etiqueta_html(etiqueta, atributos):
+        texto = ''.join(f' {nombre}="{escape(valor)}"' for nombre, valor in atributos.items())
+        return f'<{etiqueta}{texto}>'
+
+    # --- Eventos del parser ---
+
+    @staticmethod
+    def _es_descartable(etiqueta):
+        return etiqueta in ETIQUETAS_DESCARTADAS or etiqueta == 'iframe'
+
+    def handle_starttag(self, etiqueta, atributos):
+        if self.descartando:
+            # Dentro de un bloque descartado solo se cuentan los anidamientos del mismo tipo
+            if self._es_descartable(etiqueta):
+                self.descartando += 1
+            return
+        if etiqueta in ETIQUETAS_DESCARTADAS or (etiqueta == 'iframe' and not self._iframe_permitido(atributos)):
+            self.descartando += 1
+            return
+        if etiqueta not in ETIQUETAS_PERMITIDAS:
+            return  # se quita la etiqueta pero se conserva su texto
+
+        while self.abiertas and self.abiertas[-1] in CIERRES_IMPLICITOS.get(etiqueta, ()):
+            self._cerrar(self.abiertas.pop())
+
+        limpios = self._atributos(etiqueta, atributos)
+        if etiqueta in ETIQUETAS_VACIAS:
+            self.salida.append(self._etiqueta_html(etiqueta, limpios))
+            return
+        if etiqueta in TITULOS_CON_ANCLA and self.titulo is None:
+            # El id depende del texto del título: la etiqueta se escribe al cerrarlo
+            self.titulo = (etiqueta, limpios, len(self.salida))
+            self.salida.append('')
+        else:
+            self.salida.append(self._etiqueta_html(etiqueta, limpios))
+        self.abiertas.append(etiqueta)
+
+    def handle_startendtag(self, etiqueta, atributos):
+        self.handle_starttag(etiqueta, atributos)
+        if etiqueta not in ETIQUETAS_VACIAS:
+            self.handle_endtag(etiqueta)
+
+    def handle_endtag(self, etiqueta):
+        if self.descartando:
+            if self._es_descartable(etiqueta):
+                self.descartando -= 1
+            return
+        if etiqueta not in self.abiertas:
+            return  # cierre sin apertura: se ignora
+        # Cierra también lo que quedó abierto dentro (HTML mal anidado)
+        while self.abiertas:
+            abierta = self.abiertas.pop()
+            self._cerrar(abierta)
+            if abierta == etiqueta:
+                break
+
+    def _cerrar(self, etiqueta):
+        if self.titulo is not None and etiqueta == self.titulo[0]:
+            etiqueta_titulo, atributos, posicion = self.titulo
+            self.titulo = None
+            if 'id' not in atributos:
+                texto = _Texto.de(''.join(self.salida[posicion + 1:]))
+                atributos['id'] = self._id_unico(slugify(texto) or 'seccion')
+            self.salida[posicion] = self._etiqueta_html(etiqueta_titulo, atributos)
+            self.salida.append(
+                f'<a class="anchor-titulo" href="#{escape(atributos["id"])}" aria-hidden="true">#</a>'
+            )
+        self.salida.append(f'</{etiqueta}>')
+
+    def _id_unico(self, base):
+        candidato, n = base, 2
+        while candidato in self.ids_usados:
+            candidato, n = f'{base}-{n}', n + 1
+        self.ids_usados.add(candidato)
+        return candidato
+
+    def handle_data(self, datos):
+        if not self.descartando:
+            self.salida.append(escape(datos, quote=False))
+
+    # Comentarios, <!DOCTYPE> e instrucciones de procesamiento se descartan
+    def handle_comment(self, datos):
+        pass
+
+    def handle_decl(self, datos):
+        pass
+
+    def handle_pi(self, datos):
+        pass
+
+    def resultado(self):
+        self.close()
+        while self.abiertas:
+            self._cerrar(self.abiertas.pop())
+        return ''.join(self.salida)
+
+
+class _Texto(HTMLParser):
+    """Texto visible de un fragmento ya limpio (para calcular el id de los títulos)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.partes = []
+
+    def handle_data(self, datos):
+        self.partes.append(datos)
+
+    @classmethod
+    def de(cls, fragmento):
+        parser = cls()
+        parser.feed(fragmento)
+        parser.close()
+        return ' '.join(''.join(parser.partes).split())
+
+
+class _Imagenes(HTMLParser):
+    """Valores de src de todas las imágenes de un fragmento."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fuentes = set()
+
+    def handle_starttag(self, etiqueta, atributos):
+        if etiqueta == 'img':
+            src = dict(atributos).get('src')
+            if src:
+                self.fuentes.add(src.strip())
+
+    @classmethod
+    def de(cls, fragmento):
+        parser = cls()
+        parser.feed(fragmento)
+        parser.close()
+        return parser.fuentes
+
+
+class _Ids(HTMLParser):
+    """Valores de id de todas las etiquetas de un fragmento."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ids = set()
+
+    def handle_starttag(self, etiqueta, atributos):
+        for nombre, valor in atributos:
+            if nombre == 'id' and valor:
+                self.ids.add(valor)
+
+    handle_startendtag = handle_starttag
+
+    @classmethod
+    def de(cls, fragmento):
+        parser = cls()
+        parser.feed(fragmento)
+        parser.close()
+        return parser.ids
+
+
+def _imagenes_subidas(contenido_html):
+    """src -> ImagenContenido de las imágenes subidas con CKEditor (procesa las nuevas)."""
+    # Importación diferida: imagenes.py usa los modelos, que a su vez importan este módulo
+    from . import imagenes
+
+    nombres = {src: imagenes.nombre_en_storage(src) for src in _Imagenes.de(contenido_html)}
+    registros = imagenes.metadatos(nombres.values())
+    return {src: registros[nombre] for src, nombre in nombres.items() if nombre in registros}
+
+
+def renderizar(contenido_html, con_imagenes=True):
+    """
+    Limpia y normaliza el HTML de CKEditor. Retorna el HTML listo para la plantilla.
+    Con con_imagenes=False no se consultan ni procesan las imágenes subidas
+    (solo reciben loading="lazy").
+    """
+    if not contenido_html:
+        return ''
+    limpiador = _Limpiador(_imagenes_subidas(contenido_html) if con_imagenes else None, _Ids.de(contenido_html))
+    limpiador.feed(contenido_html)
+    return limpiador.resultado()
+
+
+def renderizar_articulo(articulo, con_imagenes=True):
+    """Campos renderizados de un artículo (nombres de campo de Articulo)."""
+    return {
+        'contenido_html': renderizar(articulo.contenido, con_imagenes),
+        'documento_html': renderizar(articulo.documento_detallado, con_imagenes),
+        'hash_render': huella(articulo.contenido, articulo.documento_detallado),
+    }
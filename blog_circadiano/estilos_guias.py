@@ -0,0 +1,425 @@
+# blog_circadiano/estilos_guias.py
+
+"""
+Hoja de estilos de las guías interactivas, generada en el servidor.
+
+Las guías se escribieron con las clases de utilidad de Tailwind CSS (v3) y cargaban
+su compilador en el navegador (cdn.tailwindcss.com). compilar() produce el CSS
+equivalente solo para las clases que aparecen en las guías: el reset "preflight"
+de Tailwind más una regla por clase, en el mismo orden en que las emite Tailwind
+(primero las utilidades sin variante, luego hover: y después sm:, md:, lg:).
+
+Cubre las familias de utilidades que usan las guías. Una clase desconocida se
+ignora, como hace Tailwind con cualquier palabra del HTML que no sea una utilidad;
+'manage.py construir_guias' lista las que parecen utilidades para que se agreguen aquí.
+"""
+
+import re
+
+PUNTOS_DE_QUIEBRE = {'sm': 640, 'md': 768, 'lg': 1024, 'xl': 1280, '2xl': 1536}
+
+PALETA = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d'],
+    'orange': ['#fff7ed', '#ffedd5', '#fed7aa', '#fdba74', '#fb923c', '#f97316', '#ea580c', '#c2410c', '#9a3412', '#7c2d12'],
+    'amber': ['#fffbeb', '#fef3c7', '#fde68a', '#fcd34d', '#fbbf24', '#f59e0b', '#d97706', '#b45309', '#92400e', '#78350f'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d'],
+    'teal': ['#f0fdfa', '#ccfbf1', '#99f6e4', '#5eead4', '#2dd4bf', '#14b8a6', '#0d9488', '#0f766e', '#115e59', '#134e4a'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87'],
+}
+TONOS = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900']
+COLORES_FIJOS = {'white': '#ffffff', 'black': '#000000', 'transparent': 'transparent', 'current': 'currentColor'}
+
+TAMANOS_TEXTO = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'),
+}
+PESOS = {'light': 300, 'normal': 400, 'medium': 500, 'semibold': 600, 'bold': 700, 'extrabold': 800, 'black': 900}
+INTERLINEADOS = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+RADIOS = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+          'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+SOMBRAS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+    'none': '0 0 #0000',
+}
+ANCHOS_MAXIMOS = {'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem',
+                  '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+                  'full': '100%', 'none': 'none', 'prose': '65ch'}
+DESENFOQUES = {'none': '0', 'sm': '4px', '': '8px', 'md': '12px', 'lg': '16px', 'xl': '24px', '2xl': '40px', '3xl': '64px'}
+DIRECCIONES_DEGRADADO = {'t': 'to top', 'tr': 'to top right', 'r': 'to right', 'br': 'to bottom right',
+                         'b': 'to bottom', 'bl': 'to bottom left', 'l': 'to left', 'tl': 'to top left'}
+
+TRANSICION = 'cubic-bezier(0.4, 0, 0.2, 1)'
+PROPIEDADES_TRANSICION = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+    'all': 'all',
+}
+
+# Utilidades sin valor: clase -> declaraciones
+ESTATICAS = {
+    'block': 'display: block', 'inline-block': 'display: inline-block', 'inline': 'display: inline',
+    'flex': 'display: flex', 'inline-flex': 'display: inline-flex', 'grid': 'display: grid', 'hidden': 'display: none',
+    'static': 'position: static', 'fixed': 'position: fixed', 'absolute': 'position: absolute',
+    'relative': 'position: relative', 'sticky': 'position: sticky',
+    'flex-row': 'flex-direction: row', 'flex-col': 'flex-direction: column', 'flex-wrap': 'flex-wrap: wrap',
+    'flex-1': 'flex: 1 1 0%', 'flex-shrink-0': 'flex-shrink: 0', 'shrink-0': 'flex-shrink: 0', 'flex-grow': 'flex-grow: 1',
+    'items-start': 'align-items: flex-start', 'items-center': 'align-items: center', 'items-end': 'align-items: flex-end',
+    'justify-start': 'justify-content: flex-start', 'justify-center': 'justify-content: center',
+    'justify-end': 'justify-content: flex-end', 'justify-between': 'justify-content: space-between',
+    'justify-around': 'justify-content: space-around',
+    'text-left': 'text-align: left', 'text-center': 'text-align: center', 'text-right': 'text-align: right',
+    'uppercase': 'text-transform: uppercase', 'lowercase': 'text-transform: lowercase', 'capitalize': 'text-transform: capitalize',
+    'italic': 'font-style: italic',
+    'antialiased': '-webkit-font-smoothing: antialiased; -moz-osx-font-smoothing: grayscale',
+    'list-disc': 'list-style-type: disc', 'list-decimal': 'list-style-type: decimal', 'list-none': 'list-style-type: none',
+    'list-inside': 'list-style-position: inside', 'list-outside': 'list-style-position: outside',
+    'cursor-pointer': 'cursor: pointer', 'cursor-default': 'cursor: default',
+    'overflow-hidden': 'overflow: hidden', 'overflow-auto': 'overflow: auto', 'overflow-x-auto': 'overflow-x: auto',
+    'bg-clip-text': '-webkit-background-clip: text; background-clip: text',
+    'scroll-smooth': 'scroll-behavior: smooth',
+    'underline': 'text-decoration-line: underline',
+}
+
+# Orden de las familias en la hoja (el de los "core plugins" de Tailwind): ante clases
+# que se contradicen en el mismo elemento gana la que va después.
+ORDEN = [
+    'position', 'inset', 'z', 'margin', 'display', 'height', 'max-height', 'min-height', 'width', 'max-width',
+    'flex', 'cursor', 'scroll-margin', 'list-position', 'list-type', 'grid-cols', 'flex-direction', 'align',
+    'justify', 'gap', 'space', 'overflow', 'rounded', 'border-width', 'border-color', 'bg-color', 'bg-image',
+    'gradient', 'bg-clip', 'padding', 'text-align', 'font-size', 'font-weight', 'text-transform', 'font-style',
+    'leading', 'text-color', 'decoration', 'smoothing', 'shadow', 'backdrop', 'transition', 'duration', 'scroll',
+]
+
+_FAMILIA_ESTATICA = [
+    (r'(static|fixed|absolute|relative|sticky)$', 'position'),
+    (r'(block|inline-block|inline|flex|inline-flex|grid|hidden)$', 'display'),
+    (r'flex-(row|col|wrap)$', 'flex-direction'),
+    (r'(flex-1|flex-shrink-0|shrink-0|flex-grow)$', 'flex'),
+    (r'items-', 'align'), (r'justify-', 'justify'),
+    (r'text-(left|center|right)$', 'text-align'),
+    (r'(uppercase|lowercase|capitalize)$', 'text-transform'), (r'italic$', 'font-style'),
+    (r'antialiased$', 'smoothing'), (r'list-(disc|decimal|none)$', 'list-type'),
+    (r'list-(inside|outside)$', 'list-position'), (r'cursor-', 'cursor'), (r'overflow-', 'overflow'),
+    (r'bg-clip-', 'bg-clip'), (r'scroll-smooth$', 'scroll'), (r'underline$', 'decoration'),
+]
+
+# Patrón de una palabra que "parece" una clase de utilidad con variantes (md:hover:text-xl, !h-64, bg-white/80)
+CANDIDATA = re.compile(r'[!a-zA-Z0-9\-:/\[\]#.%]+')
+
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji";font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){-webkit-text-decoration:underline dotted;text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono","Courier New",monospace;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+"""
+
+
+def _espaciado(valor):
+    """Escala de espaciado: 4 -> 1rem, px -> 1px, 0.5 -> 0.125rem, [250px] -> 250px."""
+    if valor == '0':
+        return '0px'
+    if valor == 'px':
+        return '1px'
+    if valor.startswith('[') and valor.endswith(']'):
+        return valor[1:-1].replace('_', ' ')
+    if re.fullmatch(r'\d+(\.5)?', valor):
+        return f'{float(valor) / 4:g}rem'
+    return None
+
+
+def _color(valor):
+    """gray-600, white, [#1ABC9C] y con opacidad: white/80."""
+    valor, _, opacidad = valor.partition('/')
+    if valor.startswith('[#') and valor.endswith(']'):
+        hexadecimal = valor[1:-1]
+    elif valor in COLORES_FIJOS:
+        hexadecimal = COLORES_FIJOS[valor]
+    else:
+        familia, _, tono = valor.rpartition('-')
+        if familia not in PALETA or tono not in TONOS:
+            return None
+        hexadecimal = PALETA[familia][TONOS.index(tono)]
+    if not opacidad:
+        return hexadecimal
+    if not hexadecimal.startswith('#') or not opacidad.isdigit():
+        return None
+    return f'rgb({_rgb(hexadecimal)} / {int(opacidad) / 100:g})'
+
+
+def _rgb(hexadecimal):
+    h = hexadecimal.lstrip('#')
+    if len(h) == 3:
+        h = ''.join(c * 2 for c in h)
+    return ' '.join(str(int(h[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+_LADOS = {'': ['{}'], 'x': ['{}-left', '{}-right'], 'y': ['{}-top', '{}-bottom'],
+          't': ['{}-top'], 'r': ['{}-right'], 'b': ['{}-bottom'], 'l': ['{}-left']}
+
+
+def _utilidad(clase):
+    """
+    Retorna (familia, suborden, selector_extra, declaraciones) para una clase sin
+    variantes, o None si no es una utilidad conocida. 'selector_extra' se agrega al
+    selector de la clase (space-x usa los hijos).
+    """
+    if clase in ESTATICAS:
+        familia = next(f for patron, f in _FAMILIA_ESTATICA if re.match(patron, clase))
+        return familia, 0, '', ESTATICAS[clase]
+
+    negativo = clase.startswith('-')
+    nombre = clase.lstrip('-')
+
+    m = re.fullmatch(r'([mp])([xytrbl]?)-(.+)', nombre)
+    if m:
+        medida = 'auto' if m.group(3) == 'auto' and m.group(1) == 'm' else _espaciado(m.group(3))
+        if medida is None:
+            return None
+        if negativo:
+            medida = f'-{medida}'
+        propiedad = 'margin' if m.group(1) == 'm' else 'padding'
+        declaraciones = '; '.join(f'{p.format(propiedad)}: {medida}' for p in _LADOS[m.group(2)])
+        suborden = 0 if not m.group(2) else (1 if m.group(2) in 'xy' else 2)
+        return propiedad, suborden, '', declaraciones
+
+    m = re.fullmatch(r'space-([xy])-(.+)', nombre)
+    if m and _espaciado(m.group(2)):
+        lado = 'left' if m.group(1) == 'x' else 'top'
+        return 'space', 0, ' > :not([hidden]) ~ :not([hidden])', f'margin-{lado}: {_espaciado(m.group(2))}'
+
+    m = re.fullmatch(r'(gap|gap-x|gap-y)-(.+)', nombre)
+    if m and _espaciado(m.group(2)):
+        propiedad = {'gap': 'gap', 'gap-x': 'column-gap', 'gap-y': 'row-gap'}[m.group(1)]
+        return 'gap', 0, '', f'{propiedad}: {_espaciado(m.group(2))}'
+
+    m = re.fullmatch(r'scroll-mt-(.+)', nombre)
+    if m and _espaciado(m.group(1)):
+        return 'scroll-margin', 0, '', f'scroll-margin-top: {_espaciado(m.group(1))}'
+
+    m = re.fullmatch(r'(w|h|min-h|max-h|min-w)-(.+)', nombre)
+    if m:
+        valor = m.group(2)
+        medida = {'full': '100%', 'screen': '100vh' if 'h' in m.group(1) else '100vw', 'auto': 'auto'}.get(valor)
+        medida = medida or _espaciado(valor)
+        if medida is None and re.fullmatch(r'\d+/\d+', valor):
+            a, b = valor.split('/')
+            medida = f'{int(a) / int(b) * 100:g}%'
+        if medida is None:
+            return None
+        propiedad, familia = {
+            'w': ('width', 'width'), 'h': ('height', 'height'), 'min-h': ('min-height', 'min-height'),
+            'max-h': ('max-height', 'max-height'), 'min-w': ('min-width', 'width'),
+        }[m.group(1)]
+        return familia, 0, '', f'{propiedad}: {medida}'
+
+    m = re.fullmatch(r'max-w-(.+)', nombre)
+    if m:
+        medida = ANCHOS_MAXIMOS.get(m.group(1)) or (_espaciado(m.group(1)) if m.group(1).startswith('[') else None)
+        return ('max-width', 0, '', f'max-width: {medida}') if medida else None
+
+    m = re.fullmatch(r'(top|right|bottom|left|inset)-(.+)', nombre)
+    if m and _espaciado(m.group(2)):
+        medida = ('-' if negativo else '') + _espaciado(m.group(2))
+        propiedades = ['top', 'right', 'bottom', 'left'] if m.group(1) == 'inset' else [m.group(1)]
+        return 'inset', 0, '', '; '.join(f'{p}: {medida}' for p in propiedades)
+
+    m = re.fullmatch(r'z-(\d+|auto)', nombre)
+    if m:
+        return 'z', 0, '', f'z-index: {m.group(1)}'
+
+    m = re.fullmatch(r'grid-cols-(\d+|none)', nombre)
+    if m:
+        valor = 'none' if m.group(1) == 'none' else f'repeat({m.group(1)}, minmax(0, 1fr))'
+        return 'grid-cols', 0, '', f'grid-template-columns: {valor}'
+
+    m = re.fullmatch(r'rounded(?:-([trbl]))?(?:-(.+))?', nombre)
+    if m and (m.group(2) or '') in RADIOS:
+        radio = RADIOS[m.group(2) or '']
+        esquinas = {
+            None: ['border-radius'],
+            't': ['border-top-left-radius', 'border-top-right-radius'],
+            'r': ['border-top-right-radius', 'border-bottom-right-radius'],
+            'b': ['border-bottom-right-radius', 'border-bottom-left-radius'],
+            'l': ['border-top-left-radius', 'border-bottom-left-radius'],
+        }[m.group(1)]
+        return 'rounded', 0 if m.group(1) is None else 1, '', '; '.join(f'{e}: {radio}' for e in esquinas)
+
+    m = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', nombre)
+    if m:
+        ancho = f'{m.group(2) or 1}px'
+        lado = m.group(1) or ''
+        declaraciones = '; '.join(f'{p.format("border")}-width: {ancho}' for p in _LADOS[lado])
+        return 'border-width', 0 if not lado else (1 if lado in 'xy' else 2), '', declaraciones
+
+    m = re.fullmatch(r'(border|bg|text|from|to|via)-(.+)', nombre)
+    if m:
+        prefijo, valor = m.groups()
+        if prefijo == 'text' and valor in TAMANOS_TEXTO:
+            tamano, interlineado = TAMANOS_TEXTO[valor]
+            return 'font-size', 0, '', f'font-size: {tamano}; line-height: {interlineado}'
+        if prefijo == 'bg' and valor.startswith('gradient-to-'):
+            direccion = DIRECCIONES_DEGRADADO.get(valor[len('gradient-to-'):])
+            if direccion:
+                return 'bg-image', 0, '', f'background-image: linear-gradient({direccion}, var(--tw-gradient-stops))'
+            return None
+        color = _color(valor)
+        if color is None:
+            return None
+        if prefijo == 'from':
+            transparente = f'rgb({_rgb(color)} / 0)' if color.startswith('#') else 'transparent'
+            return 'gradient', 0, '', (
+                f'--tw-gradient-from: {color}; --tw-gradient-to: {transparente}; '
+                '--tw-gradient-stops: var(--tw-gradient-from), var(--tw-gradient-to)'
+            )
+        if prefijo == 'via':
+            return 'gradient', 1, '', (
+                f'--tw-gradient-stops: var(--tw-gradient-from), {color}, var(--tw-gradient-to)'
+            )
+        if prefijo == 'to':
+            return 'gradient', 2, '', f'--tw-gradient-to: {color}'
+        familia, propiedad = {'border': ('border-color', 'border-color'), 'bg': ('bg-color', 'background-color'),
+                              'text': ('text-color', 'color')}[prefijo]
+        return familia, 0, '', f'{propiedad}: {color}'
+
+    m = re.fullmatch(r'font-(\w+)', nombre)
+    if m and m.group(1) in PESOS:
+        return 'font-weight', 0, '', f'font-weight: {PESOS[m.group(1)]}'
+
+    m = re.fullmatch(r'leading-(\w+)', nombre)
+    if m and m.group(1) in INTERLINEADOS:
+        return 'leading', 0, '', f'line-height: {INTERLINEADOS[m.group(1)]}'
+
+    m = re.fullmatch(r'shadow(?:-(\w+))?', nombre)
+    if m and (m.group(1) or '') in SOMBRAS:
+        return 'shadow', 0, '', f'box-shadow: {SOMBRAS[m.group(1) or ""]}'
+
+    m = re.fullmatch(r'backdrop-blur(?:-(\w+))?', nombre)
+    if m and (m.group(1) or '') in DESENFOQUES:
+        filtro = f'blur({DESENFOQUES[m.group(1) or ""]})'
+        return 'backdrop', 0, '', f'-webkit-backdrop-filter: {filtro}; backdrop-filter: {filtro}'
+
+    m = re.fullmatch(r'transition(?:-(\w+))?', nombre)
+    if m and (m.group(1) or '') in PROPIEDADES_TRANSICION:
+        return 'transition', 0, '', (
+            f'transition-property: {PROPIEDADES_TRANSICION[m.group(1) or ""]}; '
+            f'transition-timing-function: {TRANSICION}; transition-duration: 150ms'
+        )
+
+    m = re.fullmatch(r'duration-(\d+)', nombre)
+    if m:
+        return 'duration', 0, '', f'transition-duration: {m.group(1)}ms'
+
+    return None
+
+
+def _escapar(clase):
+    """Escapa para un selector CSS los caracteres que no pueden ir sin barra (: / [ ] # ! . %)."""
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', clase)
+
+
+def _interpretar(candidata):
+    """'md:hover:!text-xl' -> (('md',), True, importante, regla) o None."""
+    *variantes, base = candidata.split(':')
+    importante = base.startswith('!')
+    base = base.lstrip('!')
+    if not base or any(v not in PUNTOS_DE_QUIEBRE and v != 'hover' for v in variantes):
+        return None
+    regla = _utilidad(base)
+    if regla is None:
+        return None
+    puntos = [v for v in variantes if v in PUNTOS_DE_QUIEBRE]
+    if len(puntos) > 1:
+        return None
+    return (puntos[0] if puntos else None), 'hover' in variantes, importante, regla
+
+
+def clases_en(html):
+    """Todas las palabras del HTML (marcado, estilos y scripts) que podrían ser clases."""
+    return set(CANDIDATA.findall(html))
+
+
+def compilar(clases):
+    """
+    CSS para el conjunto de palabras 'clases': preflight, .container si se usa y las
+    utilidades reconocidas. Retorna (css, reconocidas).
+    """
+    reglas = []
+    for candidata in clases:
+        interpretada = _interpretar(candidata)
+        if interpretada is None:
+            continue
+        punto, hover, importante, (familia, suborden, extra, declaraciones) = interpretada
+        if importante:
+            declaraciones = '; '.join(f'{d.strip()} !important' for d in declaraciones.split(';'))
+        selector = '.' + _escapar(candidata) + (':hover' if hover else '') + extra
+        orden = (
+            PUNTOS_DE_QUIEBRE[punto] if punto else 0,
+            hover,
+            ORDEN.index(familia),
+            suborden,
+            candidata,
+        )
+        reglas.append((orden, punto, f'{selector}{{{declaraciones}}}'))
+    reglas.sort(key=lambda r: r[0])
+
+    partes = [PREFLIGHT]
+    if 'container' in clases:
+        partes.append('.container{width:100%}')
+        partes.extend(
+            f'@media (min-width: {ancho}px){{.container{{max-width:{ancho}px}}}}'
+            for ancho in PUNTOS_DE_QUIEBRE.values()
+        )
+    for _, punto, regla in reglas:
+        if punto:
+            regla = f'@media (min-width: {PUNTOS_DE_QUIEBRE[punto]}px){{{regla}}}'
+        partes.append(regla)
+    reconocidas = {r for r in clases if _interpretar(r) is not None} | ({'container'} & clases)
+    return '\n'.join(partes) + '\n', reconocidas
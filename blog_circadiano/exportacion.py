@@ -0,0 +1,271 @@
+# blog_circadiano/exportacion.py
+
+"""
+Exportación estática del blog público ('manage.py exportar_sitio').
+
+Pide cada página pública a las vistas de siempre (con el Client de Django, como un
+visitante anónimo: mismas URLs, middleware y plantillas) y la guarda como
+<ruta>/index.html junto a sus versiones .gz y .br. El resultado sirve de respaldo de
+solo lectura: WhiteNoise lo sirve con SITIO_ESTATICO=True (ver settings) y cualquier
+hosting estático lo sirve tal cual.
+
+- Las páginas siguientes de cada lista (?cursor=...) se guardan en <lista>/pagina/N/
+  con su fragmento para el scroll infinito en <lista>/pagina/N/parcial.html; los
+  enlaces "Cargar más" se reescriben a esas rutas.
+- Los comentarios y todo lo que requiere sesión quedan fuera: el respaldo es de lectura.
+
+Exportación incremental: manifiesto.json guarda, por trabajo (una lista con todas sus
+páginas o un artículo), la versión de los datos con que se generó y el hash de cada
+archivo. Un artículo solo se vuelve a pedir si cambió Articulo.actualizado; las listas,
+si cambió la versión de la taxonomía (categorías, etiquetas o series) o algún artículo
+(el 'actualizado' más reciente o el total).
+Un archivo solo se reescribe si su contenido cambió, y los de páginas que ya no
+existen se borran.
+"""
+
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.db import connections
+from django.db.models import Count, Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from . import taxonomia
+from .condicional import _plantillas_modificadas
+from .models import Articulo, Serie
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete 'brotli' solo se generan los .gz
+    brotli = None
+
+MANIFIESTO = 'manifiesto.json'
+TRABAJOS_POR_TAREA = 50
+MAXIMO_PAGINAS_POR_LISTA = 1000
+
+# El token CSRF del formulario oculto de base.html cambia en cada petición y no sirve en una copia estática
+_TOKEN_CSRF = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+# Enlace "Cargar más" de partials/articulos_pagina.html
+_SIGUIENTE = re.compile(r'href="\?([^"]*)"(\s+class="[^"]*load-more-link[^"]*"\s+data-parcial-url=")[^"]*(")')
+
+
+def trabajos():
+    """
+    Todas las páginas a exportar, agrupadas en trabajos: (clave, tipo, version).
+    tipo 'lista' recorre todas las páginas de la lista; 'pagina' es una sola URL.
+    """
+    articulos = Articulo.objects.aggregate(ultima=Max('actualizado'), total=Count('pk'))
+    ultima = articulos['ultima'].isoformat() if articulos['ultima'] else ''
+    global_ = f'{taxonomia.version()}|{ultima}|{articulos["total"]}|{_plantillas_modificadas().isoformat()}'
+    registro = taxonomia.registro()
+
+    resultado = [
+        (reverse('home'), 'pagina', global_),
+        (reverse('blog_circadiano:nosotros'), 'pagina', global_),
+        (reverse('blog_circadiano:lista_articulos'), 'lista', global_),
+        (reverse('blog_circadiano:lista_series'), 'pagina', global_),
+    ]
+    resultado += [
+        (reverse('blog_circadiano:articulos_por_categoria', kwargs={'categoria_slug': c.slug}), 'lista', global_)
+        for c in registro.categorias
+    ]
+    resultado += [
+        (reverse('blog_circadiano:articulos_por_etiqueta', kwargs={'etiqueta_slug': e.slug}), 'lista', global_)
+        for e in registro.etiquetas
+    ]
+    resultado += [
+        (reverse('blog_circadiano:detalle_serie', kwargs={'serie_slug': slug}), 'pagina', global_)
+        for slug in Serie.objects.values_list('slug', flat=True)
+    ]
+    plantillas = _plantillas_modificadas().isoformat()
+    resultado += [
+        (reverse('blog_circadiano:detalle_articulo', kwargs={'pk': pk}), 'pagina', f'{actualizado.isoformat()}|{plantillas}')
+        for pk, actualizado in Articulo.objects.order_by('pk').values_list('pk', 'actualizado').iterator()
+    ]
+    return resultado
+
+
+def _archivo(destino, ruta):
+    relativa = ruta.lstrip('/')
+    if not relativa or relativa.endswith('/'):
+        relativa += 'index.html'
+    return Path(destino) / relativa
+
+
+def _escribir(destino, ruta, contenido, anterior):
+    """Guarda la página y sus versiones comprimidas si cambió. Retorna (sha256, escrita)."""
+    huella = hashlib.sha256(contenido).hexdigest()
+    archivo = _archivo(destino, ruta)
+    if huella == anterior and archivo.exists():
+        return huella, False
+    archivo.parent.mkdir(parents=True, exist_ok=True)
+    archivo.write_bytes(contenido)
+    Path(f'{archivo}.gz').write_bytes(gzip.compress(contenido, compresslevel=9, mtime=0))
+    if brotli is not None:
+        Path(f'{archivo}.br').write_bytes(brotli.compress(contenido))
+    return huella, True
+
+
+def borrar(destino, ruta):
+    archivo = _archivo(destino, ruta)
+    for sufijo in ('', '.gz', '.br'):
+        Path(f'{archivo}{sufijo}').unlink(missing_ok=True)
+    # Directorios que quedaron vacíos (artículo o página de lista eliminados)
+    carpeta = archivo.parent
+    while carpeta != Path(destino) and carpeta.exists() and not any(carpeta.iterdir()):
+        carpeta.rmdir()
+        carpeta = carpeta.parent
+
+
+class _Exportador:
+    def __init__(self, destino, host):
+        self.destino = destino
+        # Un error en una vista cuenta como página fallida, no detiene la exportación
+        self.cliente = Client(raise_request_exception=False, HTTP_HOST=host)
+
+    def _pedir(self, ruta, parametros=''):
+        respuesta = self.cliente.get(f'{ruta}?{parametros}' if parametros else ruta)
+        if respuesta.status_code != 200:
+            return None, f'{ruta}?{parametros}: HTTP {respuesta.status_code}'
+        contenido = _TOKEN_CSRF.sub(r'\g<1>\g<2>', respuesta.content.decode(respuesta.charset))
+        # Una copia obsoleta (otro proceso estaba renderizando) no se da por vigente
+        obsoleta = respuesta.get('X-Cache-Pagina') == 'STALE'
+        return (contenido, obsoleta), None
+
+    def lista(self, ruta):
+        """Recorre la lista siguiendo los cursores. Retorna ({ruta_archivo: html}, obsoleta, errores)."""
+        paginas, errores, obsoleta = {}, [], False
+        parametros, numero = '', 1
+        while numero <= MAXIMO_PAGINAS_POR_LISTA:
+            pedida, error = self._pedir(ruta, parametros)
+            if error:
+                errores.append(error)
+                break
+            contenido, vieja = pedida
+            obsoleta |= vieja
+            ruta_pagina = ruta if numero == 1 else f'{ruta}pagina/{numero}/'
+            if numero > 1:
+                parcial, error = self._pedir(ruta, f'{parametros}&parcial=1')
+                if error:
+                    errores.append(error)
+                    break
+                paginas[f'{ruta_pagina}parcial.html'] = self._enlazar(parcial[0], ruta, numero)
+                obsoleta |= parcial[1]
+            paginas[ruta_pagina] = self._enlazar(contenido, ruta, numero)
+
+            siguiente = _SIGUIENTE.search(contenido)
+            if not siguiente:
+                break
+            parametros, numero = html.unescape(siguiente.group(1)), numero + 1
+        return paginas, obsoleta, errores
+
+    @staticmethod
+    def _enlazar(contenido, ruta, numero):
+        """'Cargar más' (?cursor=...) apunta a la página estática siguiente y a su fragmento."""
+        siguiente = f'{ruta}pagina/{numero + 1}/'
+        return _SIGUIENTE.sub(rf'href="{siguiente}"\g<2>{siguiente}parcial.html\g<3>', contenido)
+
+    def ejecutar(self, trabajo):
+        """Exporta un trabajo. Retorna (clave, version, {ruta: sha256}, escritas, errores)."""
+        clave, tipo, version, anteriores = trabajo
+        if tipo == 'lista':
+            paginas, obsoleta, errores = self.lista(clave)
+        else:
+            pedida, error = self._pedir(clave)
+            paginas, obsoleta, errores = ({clave: pedida[0]}, pedida[1], []) if pedida else ({}, False, [error])
+
+        huellas, escritas = {}, 0
+        for ruta, contenido in paginas.items():
+            huellas[ruta], escrita = _escribir(self.destino, ruta, contenido.encode(), anteriores.get(ruta))
+            escritas += escrita
+        # Con errores o copias obsoletas la versión no se registra: la próxima exportación lo reintenta
+        return clave, (None if errores or obsoleta else version), huellas, escritas, errores
+
+
+_exportador = None
+
+
+def _iniciar_proceso(destino, host):
+    global _exportador
+    django.setup()
+    _exportador = _Exportador(destino, host)
+
+
+def _ejecutar_lote(lote):
+    try:
+        return [_exportador.ejecutar(trabajo) for trabajo in lote]
+    finally:
+        connections.close_all()
+
+
+def leer_manifiesto(destino):
+    try:
+        return json.loads((Path(destino) / MANIFIESTO).read_text())
+    except FileNotFoundError:
+        return {'trabajos': {}}
+
+
+def exportar(destino, host, procesos=1, todo=False, al_avanzar=None):
+    """
+    Exporta (o actualiza) el sitio en 'destino'. Retorna un resumen con los contadores
+    y la lista de errores. 'al_avanzar(resultado)' se llama tras cada trabajo.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    anterior = leer_manifiesto(destino)['trabajos']
+
+    pendientes, vigentes = [], {}
+    for clave, tipo, version in trabajos():
+        previo = anterior.get(clave, {})
+        if not todo and previo.get('version') == version:
+            vigentes[clave] = previo
+        else:
+            pendientes.append((clave, tipo, version, previo.get('paginas', {})))
+
+    resumen = {'trabajos': len(pendientes) + len(vigentes), 'exportados': 0, 'escritas': 0, 'borradas': 0, 'errores': []}
+    nuevos = dict(vigentes)
+
+    def registrar(resultado):
+        clave, version, huellas, escritas, errores = resultado
+        nuevos[clave] = {'version': version, 'paginas': huellas}
+        resumen['exportados'] += 1
+        resumen['escritas'] += escritas
+        resumen['errores'] += errores
+        if al_avanzar:
+            al_avanzar(resultado)
+
+    if procesos > 1 and len(pendientes) > 1:
+        lotes = [pendientes[i:i + TRABAJOS_POR_TAREA] for i in range(0, len(pendientes), TRABAJOS_POR_TAREA)]
+        # Los procesos hijos abren sus propias conexiones: no deben heredar las del padre
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso, initargs=(destino, host)) as pool:
+            for resultados in pool.map(_ejecutar_lote, lotes):
+                for resultado in resultados:
+                    registrar(resultado)
+    else:
+        exportador = _Exportador(destino, host)
+        for trabajo in pendientes:
+            registrar(exportador.ejecutar(trabajo))
+
+    # Páginas que ya no existen: artículos o series borrados, listas que se acortaron
+    actuales = {ruta for datos in nuevos.values() for ruta in datos['paginas']}
+    for datos in anterior.values():
+        for ruta in datos.get('paginas', {}):
+            if ruta not in actuales:
+                borrar(destino, ruta)
+                resumen['borradas'] += 1
+
+    manifiesto = {'generado': timezone.now().isoformat(), 'trabajos': nuevos}
+    temporal = destino / f'{MANIFIESTO}.{os.getpid()}'
+    temporal.write_text(json.dumps(manifiesto, indent=1, sort_keys=True))
+    temporal.replace(destino / MANIFIESTO)
+    return resumen
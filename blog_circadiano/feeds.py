@@ -0,0 +1,141 @@
+# blog_circadiano/feeds.py
+
+"""
+Feeds RSS 2.0 y Atom de los últimos artículos: de todo el blog, de una categoría,
+de una etiqueta o de una serie.
+
+Cada feed lleva ETag y Last-Modified (condicional.validadores_coleccion) y se guarda
+en caché hasta que cambia algún artículo (cache_paginas.cache_por_etag):
+un lector de feeds que pregunta cada pocos minutos recibe un 304 o la copia guardada,
+nunca un render de las listas.
+"""
+
+from django.contrib.syndication.views import Feed
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from . import taxonomia
+from .cache_paginas import cache_por_etag
+from .condicional import validadores_coleccion
+from .models import Articulo
+from .views import CAMPOS_PESADOS
+
+ARTICULOS_POR_FEED = 20
+NOMBRE_SITIO = 'circadianos.cl'
+
+
+class ArticulosRss(Feed):
+    """Últimos artículos de todo el blog."""
+
+    language = 'es'
+
+    def get_object(self, request, **kwargs):
+        return None
+
+    def articulos(self, obj):
+        return Articulo.objects.all()
+
+    def title(self, obj):
+        return NOMBRE_SITIO
+
+    def description(self, obj):
+        return f'Últimos artículos de {NOMBRE_SITIO}'
+
+    def subtitle(self, obj):  # Atom
+        return self.description(obj)
+
+    def link(self, obj):
+        return reverse('blog_circadiano:lista_articulos')
+
+    def items(self, obj):
+        articulos = (
+            self.articulos(obj)
+            .select_related('autor')
+            .prefetch_related('etiquetas')
+            .defer(*CAMPOS_PESADOS)
+            .order_by('-fecha_publicacion', '-id')[:ARTICULOS_POR_FEED]
+        )
+        return taxonomia.adjuntar(list(articulos))
+
+    def item_title(self, item):
+        return item.titulo
+
+    def item_description(self, item):
+        return item.extracto
+
+    def item_link(self, item):
+        return reverse('blog_circadiano:detalle_articulo', kwargs={'pk': item.pk})
+
+    def item_pubdate(self, item):
+        return item.fecha_publicacion
+
+    def item_updateddate(self, item):
+        return item.actualizado
+
+    def item_author_name(self, item):
+        return item.autor.get_full_name() or item.autor.username
+
+    def item_categories(self, item):
+        categorias = [item.categoria.nombre] if item.categoria else []
+        return categorias + [etiqueta.nombre for etiqueta in item.etiquetas.all()]
+
+
+class CategoriaRss(ArticulosRss):
+    def get_object(self, request, categoria_slug):
+        return taxonomia.categoria_o_404(categoria_slug)
+
+    def articulos(self, obj):
+        return Articulo.objects.filter(categoria_id=obj.pk)
+
+    def title(self, obj):
+        return f'{obj.nombre} - {NOMBRE_SITIO}'
+
+    def description(self, obj):
+        return f'Últimos artículos de la categoría {obj.nombre}'
+
+    def link(self, obj):
+        return reverse('blog_circadiano:articulos_por_categoria', kwargs={'categoria_slug': obj.slug})
+
+
+class EtiquetaRss(ArticulosRss):
+    def get_object(self, request, etiqueta_slug):
+        return taxonomia.etiqueta_o_404(etiqueta_slug)
+
+    def articulos(self, obj):
+        return Articulo.objects.filter(etiquetas=obj.pk)
+
+    def title(self, obj):
+        return f'{obj.nombre} - {NOMBRE_SITIO}'
+
+    def description(self, obj):
+        return f'Últimos artículos con la etiqueta {obj.nombre}'
+
+    def link(self, obj):
+        return reverse('blog_circadiano:articulos_por_etiqueta', kwargs={'etiqueta_slug': obj.slug})
+
+
+class SerieRss(ArticulosRss):
+    def get_object(self, request, serie_slug):
+        return taxonomia.serie_o_404(serie_slug)
+
+    def articulos(self, obj):
+        return Articulo.objects.filter(serie_id=obj.pk)
+
+    def title(self, obj):
+        return f'{obj.titulo} - {NOMBRE_SITIO}'
+
+    def description(self, obj):
+        return obj.descripcion or f'Artículos de la serie {obj.titulo}'
+
+    def link(self, obj):
+        return reverse('blog_circadiano:detalle_serie', kwargs={'serie_slug': obj.slug})
+
+
+def vista(clase, atom=False):
+    """Vista del feed con validadores y caché. Con atom=True, el mismo feed en formato Atom."""
+    if atom:
+        clase = type(clase.__name__.replace('Rss', 'Atom'), (clase,), {'feed_type': Atom1Feed})
+    feed = clase()
+    etag, ultima_modificacion = validadores_coleccion()
+    return condition(etag_func=etag, last_modified_func=ultima_modificacion)(cache_por_etag(etag)(feed))
@@ -7,4 +7,17 @@ class ComentarioForm(forms.ModelForm):
         fields = ['contenido'] # Solo pedimos el contenido del comentario al usuario
         widgets = {
             'contenido': forms.Textarea(attrs={'rows': 4, 'placeholder': 'Escribe tu comentario aquí...'}),
-        }
\ No newline at end of file
+        }
+
+    def __init__(self, *args, parent=None, **kwargs):
+        # Comentario al que se responde (None para un comentario principal)
+        self.parent = parent
+        super().__init__(*args, **kwargs)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.parent is not None and not self.parent.admite_respuestas:
+            raise forms.ValidationError(
+                "Este hilo llegó a su profundidad máxima; responde a un comentario anterior."
+            )
+        return cleaned_data
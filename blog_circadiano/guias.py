@@ -0,0 +1,187 @@
+# blog_circadiano/guias.py
+
+"""
+Guías interactivas pre-renderizadas.
+
+'manage.py construir_guias' renderiza cada plantilla de templates/blog_circadiano/guias/
+a un HTML estático y autocontenido en static/blog_circadiano/guias/, con el hash del
+contenido en el nombre (<guia>.<hash>.html). Lo que antes llegaba de CDNs queda a su lado:
+
+- guias.<hash>.css: preflight y solo las utilidades de Tailwind que usan las guías
+  (estilos_guias.py), en lugar de compilar el CSS en el navegador de cada lector.
+- chart.<hash>.js: copia local de Chart.js (CHARTJS, versionada con el repositorio).
+
+Una clase de Tailwind que estilos_guias.py no sabe generar se quedaría sin estilo sin que
+nadie lo note: construir() la rechaza (ClasesSinEstilo) en lugar de publicar la guía.
+
+guias.json mapea cada guia_slug a su HTML. Tras collectstatic, WhiteNoise los sirve
+comprimidos y, como el nombre cambia con el contenido, con caché de un año
+(WHITENOISE_IMMUTABLE_FILE_TEST). Una guía que todavía no se construyó la sigue
+renderizando la vista en cada petición.
+
+El Procfile lo ejecuta en 'release', antes de collectstatic.
+"""
+
+import hashlib
+import json
+import re
+import urllib.error
+import urllib.request
+from functools import lru_cache
+from pathlib import Path
+
+from django.templatetags.static import static
+from django.template.loader import render_to_string
+
+from .estilos_guias import clases_en, compilar
+
+APP = Path(__file__).resolve().parent
+PLANTILLAS = APP / 'templates' / 'blog_circadiano' / 'guias'
+DIRECTORIO = APP / 'static' / 'blog_circadiano' / 'guias'
+PREFIJO_ESTATICO = 'blog_circadiano/guias/'
+MANIFIESTO = DIRECTORIO / 'guias.json'
+
+# Copia local de Chart.js: dist/chart.umd.js del paquete npm, sin modificar, versionada
+# con el repositorio para no depender de la red al construir. Queda fuera de static/:
+# collectstatic no la procesa (referencia un .map que no se copia) y solo se sirve la
+# versión con hash que genera construir(). Si falta, se descarga una vez y se verifica
+# con CHARTJS_SHA256.
+CHARTJS_VERSION = '4.5.1'
+CHARTJS_SHA256 = 'ecc3cd1eeb8c34d2178e3f59fd63ec5a3d84358c11730af0b9958dc886d7652a'
+CHARTJS_URL = f'https://cdn.jsdelivr.net/npm/chart.js@{CHARTJS_VERSION}/dist/chart.umd.js'
+CHARTJS = APP / 'vendor' / f'chart-{CHARTJS_VERSION}.umd.js'
+
+_SCRIPT_TAILWIND = re.compile(r'[ \t]*<script[^>]*\bsrc="https://cdn\.tailwindcss\.com[^"]*"[^>]*>\s*</script>\n?')
+_SCRIPT_CHARTJS = re.compile(r'<script[^>]*\bsrc="https://cdn\.jsdelivr\.net/npm/chart\.js[^"]*"[^>]*>\s*</script>')
+_SOURCE_MAP = re.compile(r'^//# sourceMappingURL=.*$', re.MULTILINE)
+_ATRIBUTO_CLASS = re.compile(r'class="([^"]*)"')
+# Nombres generados: <nombre>.<12 hex>.<ext>, el formato que reconoce WHITENOISE_IMMUTABLE_FILE_TEST
+_GENERADO = re.compile(r'^.+\.[0-9a-f]{12}\.(html|css|js)$')
+
+
+class ErrorChartjs(Exception):
+    """No se pudo descargar Chart.js o la descarga no coincide con CHARTJS_SHA256."""
+
+
+class ClasesSinEstilo(Exception):
+    """Hay guías con clases que estilos_guias.py no genera. 'por_guia': {guia_slug: [clases]}."""
+
+    def __init__(self, por_guia):
+        self.por_guia = por_guia
+        super().__init__('; '.join(f"{guia}: {' '.join(clases)}" for guia, clases in por_guia.items()))
+
+
+def _con_hash(base, extension, contenido):
+    return f'{base}.{hashlib.sha256(contenido).hexdigest()[:12]}.{extension}'
+
+
+def plantillas():
+    """Nombres de archivo de las guías (los valores posibles de Articulo.guia_slug)."""
+    return sorted(p.name for p in PLANTILLAS.glob('*.html'))
+
+
+def _descargar_chartjs():
+    try:
+        with urllib.request.urlopen(CHARTJS_URL, timeout=30) as respuesta:
+            contenido = respuesta.read()
+    except (urllib.error.URLError, OSError) as e:
+        raise ErrorChartjs(f"No se pudo descargar {CHARTJS_URL}: {e}") from e
+    recibido = hashlib.sha256(contenido).hexdigest()
+    if recibido != CHARTJS_SHA256:
+        raise ErrorChartjs(f"{CHARTJS_URL} tiene SHA-256 {recibido}; se esperaba {CHARTJS_SHA256}.")
+    CHARTJS.parent.mkdir(parents=True, exist_ok=True)
+    CHARTJS.write_bytes(contenido)
+
+
+def _chartjs(origen=None):
+    if origen is None:
+        origen = CHARTJS
+        if not origen.exists():
+            _descargar_chartjs()
+    # collectstatic (ManifestStaticFilesStorage) falla si el .map referenciado no existe
+    return _SOURCE_MAP.sub('', Path(origen).read_text(encoding='utf-8')).encode()
+
+
+def clases_no_reconocidas(html, reconocidas):
+    """
+    Clases de los atributos class="" que no son utilidades conocidas ni están
+    definidas en los <style> de la propia guía: probablemente falten en estilos_guias.py.
+    """
+    propias = set(re.findall(r'\.([\w-]+)', ' '.join(re.findall(r'<style[^>]*>(.*?)</style>', html, re.S))))
+    usadas = {c for valor in _ATRIBUTO_CLASS.findall(html) for c in valor.split() if '${' not in c}
+    return sorted(usadas - reconocidas - propias)
+
+
+def construir(chartjs=None):
+    """
+    Construye todas las guías en DIRECTORIO (borrando las versiones anteriores) y
+    retorna {guia_slug: nombre del archivo}. Si alguna usa clases que estilos_guias.py
+    no genera, lanza ClasesSinEstilo sin escribir nada.
+    """
+    documentos = {nombre: render_to_string(f'blog_circadiano/guias/{nombre}') for nombre in plantillas()}
+
+    clases = set()
+    for html in documentos.values():
+        clases |= clases_en(html)
+    css, reconocidas = compilar(clases)
+
+    archivos = {}
+    nombre_css = _con_hash('guias', 'css', css.encode())
+    archivos[nombre_css] = css.encode()
+    nombre_js = None
+    if any(_SCRIPT_CHARTJS.search(html) for html in documentos.values()):
+        js = _chartjs(chartjs)
+        nombre_js = _con_hash('chart', 'js', js)
+        archivos[nombre_js] = js
+
+    sin_estilo = {}
+    for nombre, html in documentos.items():
+        sin_reconocer = clases_no_reconocidas(html, reconocidas)
+        if sin_reconocer:
+            sin_estilo[nombre] = sin_reconocer
+    if sin_estilo:
+        raise ClasesSinEstilo(sin_estilo)
+
+    resultado = {}
+    for nombre, html in documentos.items():
+        # Como el script de Tailwind, la hoja va al final de <head>: ante igual especificidad
+        # las utilidades ganan a los estilos propios de la guía
+        estatico = _SCRIPT_TAILWIND.sub('', html).replace(
+            '</head>', f'    <link rel="stylesheet" href="{nombre_css}">\n</head>', 1
+        )
+        if nombre_js:
+            estatico = _SCRIPT_CHARTJS.sub(f'<script src="{nombre_js}"></script>', estatico)
+        contenido = estatico.encode()
+        archivo = _con_hash(Path(nombre).stem, 'html', contenido)
+        archivos[archivo] = contenido
+        resultado[nombre] = archivo
+
+    DIRECTORIO.mkdir(parents=True, exist_ok=True)
+    for viejo in DIRECTORIO.iterdir():
+        if _GENERADO.match(viejo.name) and viejo.name not in archivos:
+            viejo.unlink()
+    for archivo, contenido in archivos.items():
+        (DIRECTORIO / archivo).write_bytes(contenido)
+    MANIFIESTO.write_text(json.dumps(resultado, indent=2, sort_keys=True) + '\n')
+    _manifiesto.cache_clear()
+    return resultado
+
+
+@lru_cache(maxsize=None)
+def _manifiesto():
+    # Solo cambia con un despliegue: se lee una vez por proceso
+    try:
+        return json.loads(MANIFIESTO.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def url(guia_slug):
+    """URL estática de la guía construida, o None si no se construyó (o falta collectstatic)."""
+    archivo = _manifiesto().get(guia_slug)
+    if not archivo:
+        return None
+    try:
+        return static(PREFIJO_ESTATICO + archivo)
+    except ValueError:  # ManifestStaticFilesStorage: el archivo no pasó por collectstatic
+        return None
@@ -0,0 +1,110 @@
+# blog_circadiano/imagenes.py
+
+"""
+Variantes redimensionadas de las imágenes que se suben con CKEditor.
+
+Al renderizar un artículo (cuerpo.py) cada imagen subida se reconoce por su URL,
+se lee una sola vez para conocer sus dimensiones y se generan copias más angostas
+junto al original, en el almacenamiento configurado en STORAGES['default']
+(sistema de archivos en desarrollo, Cloudinary en producción). El resultado queda
+en ImagenContenido, así que renderizar de nuevo solo consulta esa tabla. También
+queda registrada la imagen que no se pudo leer (con el motivo en 'error'), para no
+volver a intentarlo ni repetir la advertencia en cada guardado o importación.
+"""
+
+import io
+import logging
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ImagenContenido
+
+logger = logging.getLogger(__name__)
+
+ANCHOS_VARIANTES = (480, 800, 1200)
+CALIDAD = 82
+# GIF queda fuera: redimensionarlo perdería la animación
+FORMATOS_REDIMENSIONABLES = {'JPEG', 'PNG', 'WEBP'}
+
+
+def nombre_en_storage(src):
+    """
+    Nombre del archivo en el almacenamiento a partir del src de una imagen subida con
+    CKEditor (todo lo que sigue a CKEDITOR_UPLOAD_PATH). None si no es una imagen subida.
+    """
+    if not src:
+        return None
+    ruta = unquote(urlsplit(src).path)
+    carpeta = '/' + settings.CKEDITOR_UPLOAD_PATH.strip('/') + '/'
+    inicio = ruta.find(carpeta)
+    if inicio == -1:
+        return None
+    return ruta[inicio + 1:]
+
+
+def _nombre_variante(nombre, ancho):
+    base, extension = posixpath.splitext(nombre)
+    return f'{base}__{ancho}w{extension}'
+
+
+def _procesar(nombre):
+    """
+    Lee la imagen, genera sus variantes y guarda los metadatos. Si no se puede leer,
+    guarda el motivo y retorna None.
+    """
+    try:
+        with default_storage.open(nombre, 'rb') as archivo:
+            imagen = Image.open(archivo)
+            imagen.load()
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.warning("No se pudo leer la imagen de contenido %s: %s", nombre, e)
+        ImagenContenido.objects.update_or_create(
+            ruta=nombre, defaults={'ancho': None, 'alto': None, 'variantes': {}, 'error': (str(e) or type(e).__name__)[:300]}
+        )
+        return None
+
+    formato = imagen.format
+    imagen = ImageOps.exif_transpose(imagen)
+    ancho, alto = imagen.size
+
+    variantes = {}
+    if formato in FORMATOS_REDIMENSIONABLES:
+        for ancho_variante in ANCHOS_VARIANTES:
+            if ancho_variante >= ancho:
+                break
+            copia = imagen.copy()
+            copia.thumbnail((ancho_variante, alto), Image.LANCZOS)
+            if formato == 'JPEG' and copia.mode not in ('RGB', 'L'):
+                copia = copia.convert('RGB')
+            buffer = io.BytesIO()
+            copia.save(buffer, format=formato, quality=CALIDAD, optimize=True)
+            guardado = default_storage.save(_nombre_variante(nombre, ancho_variante), ContentFile(buffer.getvalue()))
+            variantes[str(ancho_variante)] = default_storage.url(guardado)
+
+    registro, _ = ImagenContenido.objects.update_or_create(
+        ruta=nombre, defaults={'ancho': ancho, 'alto': alto, 'variantes': variantes, 'error': ''}
+    )
+    return registro
+
+
+def metadatos(nombres):
+    """
+    Diccionario nombre -> ImagenContenido para los nombres dados: una consulta para
+    las ya conocidas y procesamiento (una sola vez) de las nuevas. Las que no se
+    pudieron leer no aparecen en el resultado.
+    """
+    nombres = set(filter(None, nombres))
+    if not nombres:
+        return {}
+    conocidas = {i.ruta: i for i in ImagenContenido.objects.filter(ruta__in=nombres)}
+    for nombre in nombres - set(conocidas):
+        registro = _procesar(nombre)
+        if registro is not None:
+            conocidas[nombre] = registro
+    return {nombre: registro for nombre, registro in conocidas.items() if not registro.error}
+
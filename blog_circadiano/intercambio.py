@@ -0,0 +1,475 @@
+# blog_circadiano/intercambio.py
+
+"""
+Exportación e importación del contenido del blog en JSON Lines (un registro JSON por
+línea), para mover artículos entre entornos sin el admin ni dumpdata
+('manage.py exportar_contenido' e 'importar_contenido').
+
+El archivo empieza con las categorías, etiquetas y series y sigue con un registro por
+artículo que lleva dentro sus etiquetas, sus likes y sus comentarios (con sus likes):
+
+    {"tipo": "categoria", "slug": "sueno", "nombre": "Sueño"}
+    {"tipo": "articulo", "clave": "5f0c...", "titulo": "...", "categoria": "sueno",
+     "etiquetas": ["luz"], "likes": ["ana"], "comentarios": [{"id": 7, "padre": null, ...}]}
+
+Las referencias van por clave natural: slug para la taxonomía, username para los
+usuarios (los que no existen se crean sin contraseña utilizable), Articulo.clave para
+los artículos y (artículo, autor, fecha) para los comentarios. Así importar dos veces
+el mismo archivo no duplica nada:
+
+- categorías, etiquetas, series y artículos se crean o actualizan (upsert);
+- las etiquetas de cada artículo quedan como en el archivo;
+- likes y comentarios se suman a los que ya existen en el destino (son actividad de
+  los usuarios, no contenido): los comentarios ya presentes solo se actualizan.
+
+Solo se escribe lo que cambió respecto del destino (el contenido se compara por su huella,
+sin leer el HTML guardado). Los artículos sin cambios no se tocan: conservan 'actualizado',
+su página cacheada, su ETag y su lastmod en el sitemap, y no se reindexan. Los que cambian
+toman el 'actualizado' del archivo, salvo que no sea posterior al del destino (entonces el
+del momento, para que las validaciones condicionales vean el cambio).
+
+Ambos sentidos trabajan por lotes de artículos (keyset al exportar, bulk_create y
+inserciones directas en las tablas intermedias al importar), así que la memoria no
+crece con el tamaño del archivo. Cada lote importado es una transacción.
+"""
+
+import datetime
+import json
+import uuid
+from collections import Counter, defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Concat, Length, LPad
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search, taxonomia
+from .cache_paginas import invalidar_articulos, invalidar_colecciones, invalidar_listados
+from .contadores import recalcular_articulos, recalcular_comentarios
+from .contenido import derivar_campos
+from .cuerpo import huella, renderizar_articulo
+from .models import Articulo, Categoria, Comentario, Etiqueta, Serie
+from .tareas import reconstruir_relacionados
+
+LOTE_POR_OMISION = 500
+
+# tipo -> (modelo, campos además del slug)
+TAXONOMIA = {
+    'categoria': (Categoria, ['nombre']),
+    'etiqueta': (Etiqueta, ['nombre']),
+    'serie': (Serie, ['titulo', 'descripcion', 'imagen_destacada', 'imagen_rendiciones']),
+}
+
+# Campos de Articulo que escribe la importación (además de los derivados del contenido)
+CAMPOS_ARTICULO = [
+    'titulo', 'contenido', 'documento_detallado', 'fecha_publicacion', 'autor', 'imagen_destacada',
+    'imagen_rendiciones', 'guia_slug', 'categoria', 'serie', 'posicion_serie',
+    'texto_plano', 'extracto', 'palabras', 'minutos_lectura', 'hash_contenido',
+    'contenido_html', 'documento_html', 'hash_render',
+]
+
+# Lo que se compara con el destino para saber si un artículo cambió. hash_render resume
+# contenido y documento (y la versión de las reglas de cuerpo.py).
+CAMPOS_COMPARADOS = [
+    'titulo', 'fecha_publicacion', 'autor_id', 'imagen_destacada', 'imagen_rendiciones', 'guia_slug',
+    'categoria_id', 'serie_id', 'posicion_serie', 'hash_render',
+]
+
+
+class ErrorImportacion(ValueError):
+    """Una línea del archivo no es un registro válido."""
+
+
+class _Codificador(DjangoJSONEncoder):
+    # DjangoJSONEncoder recorta las fechas a milisegundos; aquí se conservan completas porque
+    # la fecha es parte de la clave natural de un comentario.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _json(registro):
+    return json.dumps(registro, ensure_ascii=False, cls=_Codificador)
+
+
+def _agrupar(filas):
+    grupos = defaultdict(list)
+    for clave, valor in filas:
+        grupos[clave].append(valor)
+    return grupos
+
+
+def _vacio(valor):
+    # '', {} y None valen lo mismo en los campos opcionales (archivo vs. base de datos)
+    return None if valor in ('', {}, None) else valor
+
+
+# --- Exportación ---
+
+def exportar(lote=LOTE_POR_OMISION):
+    """Genera las líneas del archivo (sin salto de línea), leyendo los artículos de a 'lote'."""
+    for tipo, (modelo, campos) in TAXONOMIA.items():
+        for fila in modelo.objects.order_by('pk').values('slug', *campos).iterator(chunk_size=lote):
+            yield _json({'tipo': tipo, **fila})
+
+    ultimo = 0
+    while True:
+        articulos = list(
+            Articulo.objects.filter(pk__gt=ultimo).order_by('pk').values(
+                'pk', 'clave', 'titulo', 'contenido', 'documento_detallado', 'fecha_publicacion',
+                'actualizado', 'autor__username', 'imagen_destacada', 'imagen_rendiciones', 'guia_slug',
+                'categoria__slug', 'serie__slug', 'posicion_serie',
+            )[:lote]
+        )
+        if not articulos:
+            return
+        ultimo = articulos[-1]['pk']
+        pks = [a['pk'] for a in articulos]
+
+        etiquetas = _agrupar(
+            Articulo.etiquetas.through.objects.filter(articulo_id__in=pks).values_list('articulo_id', 'etiqueta__slug')
+        )
+        likes = _agrupar(
+            Articulo.likes.through.objects.filter(articulo_id__in=pks).values_list('articulo_id', 'user__username')
+        )
+        likes_comentarios = _agrupar(
+            Comentario.likes.through.objects.filter(comentario__articulo_id__in=pks).values_list('comentario_id', 'user__username')
+        )
+        # Por ruta: cada comentario aparece después de su padre
+        comentarios = defaultdict(list)
+        filas = Comentario.objects.filter(articulo_id__in=pks).order_by('articulo_id', 'ruta').values_list(
+            'articulo_id', 'pk', 'parent_id', 'autor__username', 'contenido', 'fecha_creacion', 'activo',
+        )
+        for articulo_id, pk, padre, autor, contenido, fecha, activo in filas:
+            comentarios[articulo_id].append({
+                'id': pk, 'padre': padre, 'autor': autor, 'contenido': contenido,
+                'fecha_creacion': fecha, 'activo': activo, 'likes': likes_comentarios.get(pk, []),
+            })
+
+        for a in articulos:
+            pk = a.pop('pk')
+            yield _json({
+                'tipo': 'articulo',
+                'clave': a['clave'],
+                'titulo': a['titulo'],
+                'contenido': a['contenido'],
+                'documento_detallado': a['documento_detallado'],
+                'fecha_publicacion': a['fecha_publicacion'],
+                'actualizado': a['actualizado'],
+                'autor': a['autor__username'],
+                'imagen_destacada': a['imagen_destacada'] or None,
+                'imagen_rendiciones': a['imagen_rendiciones'],
+                'guia_slug': a['guia_slug'],
+                'categoria': a['categoria__slug'],
+                'serie': a['serie__slug'],
+                'posicion_serie': a['posicion_serie'],
+                'etiquetas': etiquetas.get(pk, []),
+                'likes': likes.get(pk, []),
+                'comentarios': comentarios.get(pk, []),
+            })
+
+
+# --- Importación ---
+
+def _usuarios(nombres):
+    """username -> id, creando (sin contraseña utilizable) los que no existen."""
+    nombres = {n for n in nombres if n}
+    ids = dict(User.objects.filter(username__in=nombres).values_list('username', 'pk'))
+    faltan = nombres - ids.keys()
+    if faltan:
+        sin_clave = make_password(None)
+        User.objects.bulk_create([User(username=n, password=sin_clave) for n in faltan], ignore_conflicts=True)
+        ids.update(User.objects.filter(username__in=faltan).values_list('username', 'pk'))
+    return ids
+
+
+def _por_slug(modelo, slugs):
+    return dict(modelo.objects.filter(slug__in={s for s in slugs if s}).values_list('slug', 'pk'))
+
+
+def _fecha(valor, donde):
+    fecha = parse_datetime(valor) if isinstance(valor, str) else None
+    if fecha is None:
+        raise ErrorImportacion(f"{donde}: fecha inválida {valor!r}.")
+    return fecha
+
+
+class _Importacion:
+    def __init__(self, lote):
+        self.lote = lote
+        self.resumen = Counter()
+        self.pendientes = {tipo: [] for tipo in (*TAXONOMIA, 'articulo')}
+        # Si se escribió taxonomía o algún dato de artículo que el registro de taxonomía lee
+        self.taxonomia_cambiada = False
+        # Si cambió el texto o las etiquetas de algún artículo (lo que usa relacionados.py)
+        self.relacionados_obsoletos = False
+
+    def agregar(self, numero, registro):
+        tipo = registro.get('tipo') if isinstance(registro, dict) else None
+        if tipo not in self.pendientes:
+            raise ErrorImportacion(f"Línea {numero}: tipo de registro desconocido {tipo!r}.")
+        self.pendientes[tipo].append((numero, registro))
+        if len(self.pendientes[tipo]) >= self.lote:
+            self.vaciar(tipo)
+
+    def vaciar(self, tipo):
+        if tipo == 'articulo':
+            # Los artículos se refieren a la taxonomía por slug: va antes
+            for otro in TAXONOMIA:
+                self.vaciar(otro)
+        registros, self.pendientes[tipo] = self.pendientes[tipo], []
+        if not registros:
+            return
+        with transaction.atomic():
+            if tipo == 'articulo':
+                self._articulos(registros)
+            else:
+                self._taxonomia(tipo, registros)
+
+    def _taxonomia(self, tipo, registros):
+        modelo, campos = TAXONOMIA[tipo]
+        existentes = {
+            fila['slug']: fila
+            for fila in modelo.objects.filter(slug__in=[r.get('slug') for _, r in registros]).values('slug', *campos)
+        }
+        objetos = []
+        for numero, r in registros:
+            if not r.get('slug'):
+                raise ErrorImportacion(f"Línea {numero}: {tipo} sin slug.")
+            datos = {campo: r[campo] for campo in campos if campo in r}
+            if 'imagen_rendiciones' in campos:
+                datos['imagen_rendiciones'] = datos.get('imagen_rendiciones') or {}
+            previo = existentes.get(r['slug'])
+            if previo and all(_vacio(valor) == _vacio(previo[campo]) for campo, valor in datos.items()):
+                continue
+            objetos.append(modelo(slug=r['slug'], **datos))
+        if not objetos:
+            return
+        modelo.objects.bulk_create(
+            objetos, batch_size=self.lote, update_conflicts=True, unique_fields=['slug'], update_fields=campos,
+        )
+        self.resumen[f'{tipo}s'] += len(objetos)
+        self.taxonomia_cambiada = True
+
+    def _articulos(self, registros):
+        usuarios = _usuarios(
+            {r.get('autor') for _, r in registros}
+            | {n for _, r in registros for n in r.get('likes', [])}
+            | {c.get('autor') for _, r in registros for c in r.get('comentarios', [])}
+            | {n for _, r in registros for c in r.get('comentarios', []) for n in c.get('likes', [])}
+        )
+        categorias = _por_slug(Categoria, {r.get('categoria') for _, r in registros})
+        series = _por_slug(Serie, {r.get('serie') for _, r in registros})
+        etiquetas = _por_slug(Etiqueta, {s for _, r in registros for s in r.get('etiquetas', [])})
+
+        leidos = []
+        for numero, r in registros:
+            try:
+                datos = {
+                    'titulo': r['titulo'],
+                    'contenido': r['contenido'],
+                    'documento_detallado': r.get('documento_detallado'),
+                    'fecha_publicacion': _fecha(r['fecha_publicacion'], f"Línea {numero}"),
+                    'autor_id': usuarios[r['autor']],
+                    'imagen_destacada': r.get('imagen_destacada') or None,
+                    'imagen_rendiciones': r.get('imagen_rendiciones') or {},
+                    'guia_slug': r.get('guia_slug') or None,
+                    'categoria_id': categorias.get(r.get('categoria')),
+                    'serie_id': series.get(r.get('serie')),
+                    'posicion_serie': r.get('posicion_serie'),
+                }
+                datos['hash_render'] = huella(datos['contenido'], datos['documento_detallado'])
+                actualizado = _fecha(r['actualizado'], f"Línea {numero}") if r.get('actualizado') else None
+                clave = uuid.UUID(str(r['clave']))
+            except (KeyError, ValueError, TypeError) as e:
+                raise ErrorImportacion(f"Línea {numero}: artículo inválido ({e!r}).") from e
+            leidos.append((clave, datos, actualizado, r))
+
+        claves = [clave for clave, _, _, _ in leidos]
+        existentes = {
+            fila['clave']: fila
+            for fila in Articulo.objects.filter(clave__in=claves).values('clave', 'actualizado', *CAMPOS_COMPARADOS)
+        }
+        objetos = []
+        for clave, datos, _, _ in leidos:
+            previo = existentes.get(clave)
+            if previo and all(_vacio(datos[campo]) == _vacio(previo[campo]) for campo in CAMPOS_COMPARADOS):
+                continue
+            articulo = Articulo(clave=clave, **datos)
+            # bulk_create no pasa por save(): los campos derivados se calculan aquí
+            for campo, valor in {**derivar_campos(articulo.contenido), **renderizar_articulo(articulo)}.items():
+                setattr(articulo, campo, valor)
+            objetos.append(articulo)
+
+        if objetos:
+            Articulo.objects.bulk_create(
+                objetos, batch_size=self.lote, update_conflicts=True, unique_fields=['clave'], update_fields=CAMPOS_ARTICULO,
+            )
+            self.taxonomia_cambiada = self.relacionados_obsoletos = True
+        pks = dict(Articulo.objects.filter(clave__in=claves).values_list('clave', 'pk'))
+        cambiados = {pks[a.clave] for a in objetos}
+
+        por_pk = [(pks[clave], r) for clave, _, _, r in leidos]
+        lista_pks = [pk for pk, _ in por_pk]
+
+        # Etiquetas: como en el archivo (solo se reescriben las de los artículos en que difieren)
+        relacion = Articulo.etiquetas.through
+        actuales = _agrupar(relacion.objects.filter(articulo_id__in=lista_pks).values_list('articulo_id', 'etiqueta_id'))
+        deseadas = {pk: {etiquetas[s] for s in r.get('etiquetas', []) if s in etiquetas} for pk, r in por_pk}
+        distintas = [pk for pk in lista_pks if set(actuales.get(pk, [])) != deseadas[pk]]
+        if distintas:
+            relacion.objects.filter(articulo_id__in=distintas).delete()
+            relacion.objects.bulk_create(
+                [relacion(articulo_id=pk, etiqueta_id=e) for pk in distintas for e in deseadas[pk]],
+                batch_size=self.lote,
+            )
+            cambiados.update(distintas)
+            self.relacionados_obsoletos = True
+        # Likes: se suman a los del destino
+        relacion = Articulo.likes.through
+        actuales = set(relacion.objects.filter(articulo_id__in=lista_pks).values_list('articulo_id', 'user_id'))
+        nuevos = {(pk, usuarios[n]) for pk, r in por_pk for n in r.get('likes', [])} - actuales
+        relacion.objects.bulk_create(
+            [relacion(articulo_id=pk, user_id=usuario) for pk, usuario in nuevos],
+            batch_size=self.lote, ignore_conflicts=True,
+        )
+        cambiados.update(pk for pk, _ in nuevos)
+        cambiados.update(self._comentarios(por_pk, usuarios))
+
+        self.resumen['articulos nuevos'] += len(cambiados - {pks[c] for c in existentes})
+        self.resumen['articulos actualizados'] += len(cambiados & {pks[c] for c in existentes})
+        self.resumen['articulos sin cambios'] += len(lista_pks) - len(cambiados)
+        if not cambiados:
+            return
+
+        # Lo que save() y los signals harían uno por uno
+        cambiados = sorted(cambiados)
+        recalcular_articulos(Articulo.objects.filter(pk__in=cambiados))
+        recalcular_comentarios(Comentario.objects.filter(articulo_id__in=cambiados))
+        search.reindexar(Articulo.objects.filter(pk__in=cambiados), lote=self.lote)
+        # bulk_update no aplica auto_now: 'actualizado' queda como se decide aquí
+        ahora = timezone.now()
+        fechas = []
+        for clave, _, actualizado, _ in leidos:
+            pk = pks[clave]
+            if pk not in cambiados:
+                continue
+            previo = existentes[clave]['actualizado'] if clave in existentes else None
+            if actualizado is None or (previo is not None and actualizado <= previo):
+                actualizado = ahora
+            fechas.append(Articulo(pk=pk, actualizado=actualizado))
+        Articulo.objects.bulk_update(fechas, ['actualizado'], batch_size=self.lote)
+        # Las generaciones cambian al confirmar la transacción del lote (ver cache_paginas.py)
+        invalidar_articulos(cambiados)
+        invalidar_listados()
+        invalidar_colecciones()
+
+    def _comentarios(self, por_pk, usuarios):
+        existentes = {
+            (articulo_id, autor_id, fecha): (pk, contenido, activo)
+            for pk, articulo_id, autor_id, fecha, contenido, activo in Comentario.objects.filter(
+                articulo_id__in=[pk for pk, _ in por_pk]
+            ).values_list('pk', 'articulo_id', 'autor_id', 'fecha_creacion', 'contenido', 'activo')
+        }
+
+        # Por niveles del árbol: el padre de cada comentario ya tiene id (y ruta) al insertar los hijos
+        niveles = defaultdict(list)
+        for articulo_pk, r in por_pk:
+            profundidad = {}
+            for c in r.get('comentarios', []):
+                profundidad[c['id']] = profundidad.get(c.get('padre'), -1) + 1
+                niveles[profundidad[c['id']]].append((articulo_pk, c))
+
+        destino = {}  # (artículo, id de origen) -> id
+        likes = []  # (artículo, comentario, username)
+        cambiados = set()
+        for nivel in sorted(niveles):
+            nuevos, actualizados = [], []
+            for articulo_pk, c in niveles[nivel]:
+                datos = {
+                    'contenido': c.get('contenido', ''),
+                    'activo': c.get('activo', True),
+                    'fecha_creacion': _fecha(c.get('fecha_creacion'), f"Comentario {c.get('id')} del artículo {articulo_pk}"),
+                    'autor_id': usuarios[c['autor']],
+                }
+                previo = existentes.get((articulo_pk, datos['autor_id'], datos['fecha_creacion']))
+                if previo:
+                    pk = previo[0]
+                    if previo[1:] != (datos['contenido'], datos['activo']):
+                        actualizados.append((Comentario(pk=pk, contenido=datos['contenido'], activo=datos['activo']), articulo_pk))
+                else:
+                    comentario = Comentario(articulo_id=articulo_pk, parent_id=destino.get((articulo_pk, c.get('padre'))), **datos)
+                    nuevos.append((comentario, c))
+                    continue
+                destino[(articulo_pk, c['id'])] = pk
+                likes += [(articulo_pk, pk, n) for n in set(c.get('likes', []))]
+
+            Comentario.objects.bulk_create([comentario for comentario, _ in nuevos], batch_size=self.lote)
+            for comentario, c in nuevos:
+                destino[(comentario.articulo_id, c['id'])] = comentario.pk
+                likes += [(comentario.articulo_id, comentario.pk, n) for n in set(c.get('likes', []))]
+            self._rutas([comentario for comentario, _ in nuevos])
+            Comentario.objects.bulk_update([comentario for comentario, _ in actualizados], ['contenido', 'activo'], batch_size=self.lote)
+            cambiados.update(comentario.articulo_id for comentario, _ in nuevos)
+            cambiados.update(articulo_pk for _, articulo_pk in actualizados)
+            self.resumen['comentarios nuevos'] += len(nuevos)
+            self.resumen['comentarios actualizados'] += len(actualizados)
+
+        relacion = Comentario.likes.through
+        actuales = set(relacion.objects.filter(comentario_id__in=[pk for _, pk, _ in likes]).values_list('comentario_id', 'user_id'))
+        nuevos = [(articulo_pk, pk, usuarios[n]) for articulo_pk, pk, n in likes if (pk, usuarios[n]) not in actuales]
+        relacion.objects.bulk_create(
+            [relacion(comentario_id=pk, user_id=usuario) for _, pk, usuario in nuevos],
+            batch_size=self.lote, ignore_conflicts=True,
+        )
+        cambiados.update(articulo_pk for articulo_pk, _, _ in nuevos)
+        return cambiados
+
+    def _rutas(self, comentarios):
+        """
+        Lo que Comentario.save() calcula tras el primer INSERT, en un UPDATE por lote en vez
+        de uno por comentario: ruta = ruta del padre + id propio con ceros a la izquierda.
+        """
+        propio = LPad(Cast('pk', CharField()), Comentario.DIGITOS_RUTA, Value('0'))
+        ruta_padre = Subquery(Comentario.objects.filter(pk=OuterRef('parent_id')).values('ruta'))
+        for i in range(0, len(comentarios), self.lote):
+            lote = comentarios[i:i + self.lote]
+            raices = [c.pk for c in lote if c.parent_id is None]
+            respuestas = [c.pk for c in lote if c.parent_id is not None]
+            if raices:
+                Comentario.objects.filter(pk__in=raices).update(ruta=propio, profundidad=0)
+            if respuestas:
+                Comentario.objects.filter(pk__in=respuestas).update(ruta=Concat(ruta_padre, propio))
+                Comentario.objects.filter(pk__in=respuestas).update(
+                    profundidad=Length('ruta') / Comentario.DIGITOS_RUTA - 1
+                )
+
+
+def importar(lineas, lote=LOTE_POR_OMISION):
+    """
+    Importa las líneas de un archivo generado por exportar(). Retorna un Counter con lo
+    creado, lo actualizado y los artículos que no cambiaron. Lanza ErrorImportacion ante una línea inválida (los lotes
+    anteriores ya quedaron guardados: volver a importar el archivo completa el resto).
+    """
+    importacion = _Importacion(lote)
+    for numero, linea in enumerate(lineas, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+        except ValueError as e:
+            raise ErrorImportacion(f"Línea {numero}: JSON inválido ({e}).") from e
+        importacion.agregar(numero, registro)
+
+    for tipo in importacion.pendientes:
+        importacion.vaciar(tipo)
+    if importacion.taxonomia_cambiada:
+        taxonomia.invalidar()
+    if importacion.relacionados_obsoletos:
+        reconstruir_relacionados.encolar()
+    return importacion.resumen
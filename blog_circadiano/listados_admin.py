@@ -0,0 +1,123 @@
+# blog_circadiano/listados_admin.py
+
+"""
+Piezas para que los listados del admin cuesten lo mismo con mil filas que con un millón
+(las usan blog_circadiano/admin.py y mensajeria/admin.py):
+
+- PaginadorEstimado: sin filtros, el total de la tabla sale de las estadísticas de la
+  base de datos en vez de un COUNT(*) que la recorre entera.
+- FiltroAutocompletar: filtro lateral por una relación (autor, artículo, remitente...)
+  que busca con el autocompletado del admin en vez de cargar todas las filas en la barra.
+- ListadoEscalable: mixin de ModelAdmin que usa ambos, no pide el segundo COUNT(*) del
+  "N en total" y difiere en la página las columnas pesadas (campos_diferidos).
+"""
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+# Bajo este número de filas el COUNT(*) exacto es barato y se prefiere
+CONTEO_EXACTO_HASTA = 50000
+
+
+def filas_estimadas(queryset):
+    """
+    Número aproximado de filas de la tabla del queryset, sin recorrerla: las estadísticas
+    del planificador en PostgreSQL y el id más alto en las demás bases (un solo salto de
+    índice; sobreestima si hubo borrados). None si no hay estimación.
+    """
+    modelo = queryset.model
+    conexion = connections[queryset.db]
+    if conexion.vendor == 'postgresql':
+        with conexion.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [modelo._meta.db_table])
+            fila = cursor.fetchone()
+        # -1 (o 0) mientras la tabla no se ha analizado nunca
+        return fila[0] if fila and fila[0] > 0 else None
+    if modelo._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField'):
+        return modelo._default_manager.using(queryset.db).order_by('-pk').values_list('pk', flat=True).first()
+    return None
+
+
+class PaginadorEstimado(Paginator):
+    """Paginador cuyo total es una estimación cuando el listado no tiene filtros y la tabla es grande."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimado = filas_estimadas(self.object_list)
+            if estimado is not None and estimado > CONTEO_EXACTO_HASTA:
+                return estimado
+        return super().count
+
+
+class FiltroAutocompletar(admin.RelatedFieldListFilter):
+    """
+    Filtro por una ForeignKey con un selector de autocompletado. La barra lateral solo
+    carga el objeto elegido; el resto se busca con la vista de autocompletado del admin,
+    así que el modelo relacionado debe tener un ModelAdmin con search_fields.
+    """
+
+    template = 'admin/filtro_autocompletar.html'
+
+    def field_choices(self, field, request, model_admin):
+        if not self.lookup_val:
+            return []
+        nombre = field.target_field.name
+        try:
+            elegidos = list(field.remote_field.model._default_manager.filter(**{f'{nombre}__in': self.lookup_val}))
+        except (ValueError, ValidationError):
+            return []  # queryset() lo reporta como IncorrectLookupParameters
+        return [(getattr(obj, nombre), str(obj)) for obj in elegidos]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        self.url_autocompletar = reverse('admin:autocomplete')
+        self.opts_origen = self.field.model._meta
+        self.nombre_campo = self.field.name
+        # Al elegir una opción, filtro_autocompletar.js reemplaza __valor__ y navega
+        self.plantilla_url = changelist.get_query_string(
+            {self.lookup_kwarg: '__valor__'}, [self.lookup_kwarg_isnull]
+        )
+        yield {
+            'selected': not self.lookup_val,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull]),
+            'display': 'Todos',
+        }
+
+
+class _ChangeListLigero(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.campos_diferidos:
+            queryset = queryset.defer(*self.model_admin.campos_diferidos)
+        return queryset
+
+
+class ListadoEscalable:
+    """Mixin de ModelAdmin para listados de tablas grandes (ver el docstring del módulo)."""
+
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    # Columnas que el listado no muestra y no conviene traer (solo en el listado, no en el formulario)
+    campos_diferidos = ()
+
+    def get_changelist(self, request, **kwargs):
+        return _ChangeListLigero
+
+    @property
+    def media(self):
+        # Lo mismo que carga un campo autocomplete_fields (jQuery, select2 y su traducción)
+        autocompletar = AutocompleteSelect(self.model._meta.pk, self.admin_site).media
+        return super().media + autocompletar + forms.Media(
+            js=['admin/js/jquery.init.js', 'blog_circadiano/js/filtro_autocompletar.js']
+        )
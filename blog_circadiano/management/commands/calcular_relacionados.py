@@ -0,0 +1,21 @@
+# blog_circadiano/management/commands/calcular_relacionados.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano import relacionados
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la tabla de artículos relacionados: vectoriza por lotes los artículos "
+        "cuyo texto cambió y recalcula las listas de todos (ver blog_circadiano/relacionados.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=200, help="Artículos por consulta y por escritura.")
+
+    def handle(self, *args, **options):
+        vectorizados, cambiadas = relacionados.reconstruir(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{vectorizados} artículos vectorizados, {cambiadas} listas de relacionados actualizadas."
+        ))
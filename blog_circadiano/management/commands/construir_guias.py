@@ -0,0 +1,41 @@
+# blog_circadiano/management/commands/construir_guias.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_circadiano import guias
+from blog_circadiano.models import Articulo
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-renderiza las guías interactivas a HTML estático con su CSS y Chart.js locales "
+        "(ver blog_circadiano/guias.py). Después hay que ejecutar collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chartjs', metavar='RUTA',
+            help="Archivo de Chart.js a usar en lugar de la copia en blog_circadiano/vendor/.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            construidas = guias.construir(chartjs=options['chartjs'])
+        except guias.ErrorChartjs as e:
+            raise CommandError(str(e)) from e
+        except guias.ClasesSinEstilo as e:
+            lineas = [f"  {guia}: {' '.join(clases)}" for guia, clases in e.por_guia.items()]
+            raise CommandError(
+                "Hay clases sin estilo; añádelas a estilos_guias.py o defínelas en la guía:\n" + '\n'.join(lineas)
+            ) from e
+        for nombre, archivo in construidas.items():
+            self.stdout.write(f"{nombre} -> {guias.PREFIJO_ESTATICO}{archivo}")
+
+        sin_plantilla = (
+            Articulo.objects.exclude(guia_slug__isnull=True).exclude(guia_slug='')
+            .exclude(guia_slug__in=construidas).values_list('guia_slug', flat=True)
+        )
+        for guia_slug in sin_plantilla:
+            self.stdout.write(self.style.WARNING(f"Hay artículos con guia_slug '{guia_slug}' sin plantilla."))
+
+        self.stdout.write(self.style.SUCCESS(f"{len(construidas)} guías construidas."))
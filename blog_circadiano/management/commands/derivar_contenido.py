@@ -0,0 +1,43 @@
+# blog_circadiano/management/commands/derivar_contenido.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.contenido import derivar_campos, hash_contenido
+from blog_circadiano.models import Articulo
+
+CAMPOS_DERIVADOS = ['texto_plano', 'extracto', 'palabras', 'minutos_lectura', 'hash_contenido']
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula texto plano, extracto, palabras, minutos de lectura y hash de los artículos "
+        "cuyo contenido cambió sin pasar por Articulo.save() (o de todos con --todos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help="Recalcula aunque el hash no haya cambiado.")
+        parser.add_argument('--lote', type=int, default=200, help="Artículos por consulta y por bulk_update.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        revisados = actualizados = 0
+        pendientes = []
+
+        articulos = Articulo.objects.only('id', 'contenido', 'hash_contenido')
+        for articulo in articulos.iterator(chunk_size=lote):
+            revisados += 1
+            if not options['todos'] and articulo.hash_contenido == hash_contenido(articulo.contenido):
+                continue
+            for campo, valor in derivar_campos(articulo.contenido).items():
+                setattr(articulo, campo, valor)
+            pendientes.append(articulo)
+            if len(pendientes) >= lote:
+                Articulo.objects.bulk_update(pendientes, CAMPOS_DERIVADOS)
+                actualizados += len(pendientes)
+                pendientes = []
+
+        if pendientes:
+            Articulo.objects.bulk_update(pendientes, CAMPOS_DERIVADOS)
+            actualizados += len(pendientes)
+
+        self.stdout.write(self.style.SUCCESS(f"{actualizados} de {revisados} artículos actualizados."))
@@ -0,0 +1,40 @@
+# blog_circadiano/management/commands/exportar_contenido.py
+
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.intercambio import LOTE_POR_OMISION, exportar
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta categorías, etiquetas, series y artículos (con etiquetas, likes y comentarios) "
+        "como JSON Lines, por lotes. Se importa en otro entorno con 'importar_contenido'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', default='-', help="Archivo de salida ('-' = salida estándar; con .gz se comprime).")
+        parser.add_argument('--lote', type=int, default=LOTE_POR_OMISION, help="Artículos por consulta.")
+
+    def handle(self, *args, **options):
+        salida = options['salida']
+        if salida == '-':
+            archivo = sys.stdout
+        elif salida.endswith('.gz'):
+            archivo = gzip.open(salida, 'wt', encoding='utf-8')
+        else:
+            archivo = open(salida, 'w', encoding='utf-8')
+
+        registros = 0
+        try:
+            for linea in exportar(lote=options['lote']):
+                archivo.write(linea + '\n')
+                registros += 1
+        finally:
+            if archivo is not sys.stdout:
+                archivo.close()
+
+        if salida != '-':
+            self.stdout.write(self.style.SUCCESS(f"{registros} registros exportados a {salida}."))
@@ -0,0 +1,38 @@
+# blog_circadiano/management/commands/exportar_sitio.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.exportacion import exportar
+
+
+def _host_publico():
+    return next((h for h in settings.ALLOWED_HOSTS if not h.startswith(('.', '*'))), 'localhost')
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta el blog público (inicio, listas, artículos, series, categorías y etiquetas) "
+        "a HTML estático precomprimido con manifiesto. Solo vuelve a generar lo que cambió "
+        "desde la exportación anterior (o todo con --todo)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--destino', default=str(settings.EXPORTACION_DIR), help="Carpeta de salida.")
+        parser.add_argument('--host', default=None, help="Dominio con el que se piden las páginas (uno de ALLOWED_HOSTS).")
+        parser.add_argument('--procesos', type=int, default=1, help="Procesos en paralelo para archivos grandes.")
+        parser.add_argument('--todo', action='store_true', help="Vuelve a pedir todas las páginas.")
+
+    def handle(self, *args, **options):
+        resumen = exportar(
+            options['destino'],
+            options['host'] or _host_publico(),
+            procesos=max(1, options['procesos']),
+            todo=options['todo'],
+        )
+        for error in resumen['errores']:
+            self.stdout.write(self.style.WARNING(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumen['exportados']} de {resumen['trabajos']} trabajos exportados: "
+            f"{resumen['escritas']} archivos escritos, {resumen['borradas']} páginas borradas."
+        ))
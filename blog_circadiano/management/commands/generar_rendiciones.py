@@ -0,0 +1,41 @@
+# blog_circadiano/management/commands/generar_rendiciones.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano import rendiciones, taxonomia
+from blog_circadiano.condicional import marcar_articulos_modificados
+from blog_circadiano.models import Articulo, Serie
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las rendiciones (thumb, card, hero en WebP y JPEG) de las imágenes destacadas "
+        "de artículos y series que aún no las tienen o cuya imagen cambió (o de todas con --todos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help="Regenera aunque ya existan.")
+
+    def handle(self, *args, **options):
+        articulos = self._procesar(Articulo, options['todos'])
+        series = self._procesar(Serie, options['todos'])
+
+        # update() no dispara signals: se invalidan a mano las páginas que muestran estas imágenes
+        if articulos:
+            marcar_articulos_modificados(articulos)
+        if articulos or series:
+            taxonomia.invalidar()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendiciones generadas: {len(articulos)} artículos y {len(series)} series."
+        ))
+
+    def _procesar(self, modelo, todos):
+        actualizados = []
+        pendientes = modelo.objects.exclude(imagen_destacada='').exclude(imagen_destacada__isnull=True)
+        for pk, nombre, actuales in pendientes.values_list('pk', 'imagen_destacada', 'imagen_rendiciones').iterator():
+            if not todos and (actuales or {}).get('origen') == nombre:
+                continue
+            modelo.objects.filter(pk=pk).update(imagen_rendiciones=rendiciones.generar(nombre))
+            actualizados.append(pk)
+        return actualizados
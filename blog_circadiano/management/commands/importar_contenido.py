@@ -0,0 +1,39 @@
+# blog_circadiano/management/commands/importar_contenido.py
+
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_circadiano.intercambio import LOTE_POR_OMISION, ErrorImportacion, importar
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa un archivo JSON Lines generado por 'exportar_contenido'. Crea o actualiza por "
+        "clave natural, así que se puede repetir sin duplicar nada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="Archivo a importar ('-' = entrada estándar; .gz se descomprime).")
+        parser.add_argument('--lote', type=int, default=LOTE_POR_OMISION, help="Artículos por transacción y por inserción masiva.")
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        if ruta == '-':
+            archivo = sys.stdin
+        elif ruta.endswith('.gz'):
+            archivo = gzip.open(ruta, 'rt', encoding='utf-8')
+        else:
+            archivo = open(ruta, encoding='utf-8')
+
+        try:
+            resumen = importar(archivo, lote=max(1, options['lote']))
+        except ErrorImportacion as e:
+            raise CommandError(f"{e} Los lotes anteriores quedaron importados.")
+        finally:
+            if archivo is not sys.stdin:
+                archivo.close()
+
+        detalle = ', '.join(f"{cantidad} {nombre}" for nombre, cantidad in sorted(resumen.items())) or 'nada'
+        self.stdout.write(self.style.SUCCESS(f"Importado: {detalle}."))
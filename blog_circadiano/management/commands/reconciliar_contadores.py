@@ -0,0 +1,16 @@
+# blog_circadiano/management/commands/reconciliar_contadores.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.contadores import recalcular_articulos, recalcular_comentarios
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los contadores de likes y comentarios activos de artículos y comentarios."
+
+    def handle(self, *args, **options):
+        articulos = recalcular_articulos()
+        comentarios = recalcular_comentarios()
+        self.stdout.write(self.style.SUCCESS(
+            f"Contadores recalculados: {articulos} artículos, {comentarios} comentarios."
+        ))
@@ -0,0 +1,22 @@
+# blog_circadiano/management/commands/reindexar_busqueda.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.models import Articulo
+from blog_circadiano.search import reindexar
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los documentos de búsqueda de los artículos (todos o los indicados con --ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='+', type=int, help="IDs de artículos a reindexar.")
+        parser.add_argument('--lote', type=int, default=200, help="Artículos leídos por consulta.")
+
+    def handle(self, *args, **options):
+        articulos = Articulo.objects.all()
+        if options['ids']:
+            articulos = articulos.filter(pk__in=options['ids'])
+
+        total = reindexar(articulos, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"{total} artículos indexados."))
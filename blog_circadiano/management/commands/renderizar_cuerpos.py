@@ -0,0 +1,48 @@
+# blog_circadiano/management/commands/renderizar_cuerpos.py
+
+from django.core.management.base import BaseCommand
+
+from blog_circadiano.condicional import marcar_articulos_modificados
+from blog_circadiano.cuerpo import huella, renderizar_articulo
+from blog_circadiano.models import Articulo
+
+CAMPOS_RENDERIZADOS = ['contenido_html', 'documento_html', 'hash_render']
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelve a limpiar y renderizar el contenido y el documento detallado de los artículos "
+        "cuyo HTML o reglas de renderizado (cuerpo.VERSION) cambiaron (o de todos con --todos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help="Renderiza aunque la huella no haya cambiado.")
+        parser.add_argument('--lote', type=int, default=100, help="Artículos por consulta y por bulk_update.")
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        revisados = actualizados = 0
+        pendientes = []
+
+        articulos = Articulo.objects.only('id', 'contenido', 'documento_detallado', 'hash_render')
+        for articulo in articulos.iterator(chunk_size=lote):
+            revisados += 1
+            if not options['todos'] and articulo.hash_render == huella(articulo.contenido, articulo.documento_detallado):
+                continue
+            for campo, valor in renderizar_articulo(articulo).items():
+                setattr(articulo, campo, valor)
+            pendientes.append(articulo)
+            if len(pendientes) >= lote:
+                actualizados += self._guardar(pendientes)
+                pendientes = []
+
+        if pendientes:
+            actualizados += self._guardar(pendientes)
+
+        self.stdout.write(self.style.SUCCESS(f"{actualizados} de {revisados} artículos renderizados."))
+
+    def _guardar(self, articulos):
+        # bulk_update no dispara signals: las páginas cacheadas y los ETag se invalidan a mano
+        Articulo.objects.bulk_update(articulos, CAMPOS_RENDERIZADOS)
+        marcar_articulos_modificados([a.pk for a in articulos])
+        return len(articulos)
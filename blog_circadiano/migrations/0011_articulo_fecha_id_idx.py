@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0010_serie_articulo_serie'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['-fecha_publicacion', '-id'], name='articulo_fecha_id_idx'),
+        ),
+    ]
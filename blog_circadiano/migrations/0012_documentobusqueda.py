@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0011_articulo_fecha_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusqueda',
+            fields=[
+                ('articulo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='documento_busqueda', serialize=False, to='blog_circadiano.articulo')),
+                ('titulo', models.CharField(max_length=200)),
+                ('taxonomia', models.TextField(blank=True, help_text='Categoría, etiquetas y serie del artículo.')),
+                ('cuerpo', models.TextField(blank=True, help_text='Contenido del artículo en texto plano.')),
+            ],
+            options={
+                'verbose_name': 'Documento de búsqueda',
+                'verbose_name_plural': 'Documentos de búsqueda',
+            },
+        ),
+    ]
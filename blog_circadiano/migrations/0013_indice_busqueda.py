@@ -0,0 +1,121 @@
+# Índice de texto completo para DocumentoBusqueda (ver blog_circadiano/search.py).
+# PostgreSQL: columna tsvector generada + índice GIN. SQLite: tabla virtual FTS5 + triggers.
+
+from django.db import migrations
+
+TABLA = 'blog_circadiano_documentobusqueda'
+TABLA_FTS = TABLA + '_fts'
+
+SQL_POSTGRES = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+    f"""
+    ALTER TABLE {TABLA} ADD COLUMN vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(taxonomia, '')), 'B') ||
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(cuerpo, '')), 'C')
+    ) STORED
+    """,
+    f"CREATE INDEX {TABLA}_vector_gin ON {TABLA} USING GIN (vector)",
+]
+
+SQL_POSTGRES_REVERSO = [
+    f"DROP INDEX IF EXISTS {TABLA}_vector_gin",
+    f"ALTER TABLE {TABLA} DROP COLUMN IF EXISTS vector",
+]
+
+SQL_SQLITE = [
+    f"""
+    CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5(
+        titulo, taxonomia, cuerpo,
+        content='{TABLA}', content_rowid='articulo_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {TABLA_FTS}_ai AFTER INSERT ON {TABLA} BEGIN
+        INSERT INTO {TABLA_FTS}(rowid, titulo, taxonomia, cuerpo)
+        VALUES (new.articulo_id, new.titulo, new.taxonomia, new.cuerpo);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABLA_FTS}_ad AFTER DELETE ON {TABLA} BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, titulo, taxonomia, cuerpo)
+        VALUES ('delete', old.articulo_id, old.titulo, old.taxonomia, old.cuerpo);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {TABLA_FTS}_au AFTER UPDATE ON {TABLA} BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, titulo, taxonomia, cuerpo)
+        VALUES ('delete', old.articulo_id, old.titulo, old.taxonomia, old.cuerpo);
+        INSERT INTO {TABLA_FTS}(rowid, titulo, taxonomia, cuerpo)
+        VALUES (new.articulo_id, new.titulo, new.taxonomia, new.cuerpo);
+    END
+    """,
+]
+
+SQL_SQLITE_REVERSO = [
+    f"DROP TRIGGER IF EXISTS {TABLA_FTS}_ai",
+    f"DROP TRIGGER IF EXISTS {TABLA_FTS}_ad",
+    f"DROP TRIGGER IF EXISTS {TABLA_FTS}_au",
+    f"DROP TABLE IF EXISTS {TABLA_FTS}",
+]
+
+
+def _ejecutar(schema_editor, por_motor):
+    for sentencia in por_motor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sentencia)
+
+
+def crear_indice(apps, schema_editor):
+    _ejecutar(schema_editor, {'postgresql': SQL_POSTGRES, 'sqlite': SQL_SQLITE})
+
+
+def borrar_indice(apps, schema_editor):
+    _ejecutar(schema_editor, {'postgresql': SQL_POSTGRES_REVERSO, 'sqlite': SQL_SQLITE_REVERSO})
+
+
+def poblar_documentos(apps, schema_editor):
+    from blog_circadiano.contenido import html_a_texto
+
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    DocumentoBusqueda = apps.get_model('blog_circadiano', 'DocumentoBusqueda')
+
+    articulos = Articulo.objects.select_related('categoria', 'serie').prefetch_related('etiquetas')
+    for articulo in articulos.iterator(chunk_size=200):
+        partes = []
+        if articulo.categoria_id:
+            partes.append(articulo.categoria.nombre)
+        partes.extend(etiqueta.nombre for etiqueta in articulo.etiquetas.all())
+        if articulo.serie_id:
+            partes.append(articulo.serie.titulo)
+        DocumentoBusqueda.objects.update_or_create(
+            articulo=articulo,
+            defaults={
+                'titulo': articulo.titulo,
+                'taxonomia': ' '.join(partes),
+                'cuerpo': html_a_texto(articulo.contenido),
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0012_documentobusqueda'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, borrar_indice),
+        migrations.RunPython(poblar_documentos, migrations.RunPython.noop),
+    ]
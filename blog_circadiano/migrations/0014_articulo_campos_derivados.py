@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+def derivar_existentes(apps, schema_editor):
+    from blog_circadiano.contenido import derivar_campos
+
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    pendientes = []
+    for articulo in Articulo.objects.only('id', 'contenido').iterator(chunk_size=200):
+        for campo, valor in derivar_campos(articulo.contenido).items():
+            setattr(articulo, campo, valor)
+        pendientes.append(articulo)
+        if len(pendientes) >= 200:
+            Articulo.objects.bulk_update(pendientes, ['texto_plano', 'extracto', 'palabras', 'minutos_lectura', 'hash_contenido'])
+            pendientes = []
+    if pendientes:
+        Articulo.objects.bulk_update(pendientes, ['texto_plano', 'extracto', 'palabras', 'minutos_lectura', 'hash_contenido'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0013_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='extracto',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='hash_contenido',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='minutos_lectura',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Minutos de lectura'),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='palabras',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='texto_plano',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(derivar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:49
+
+from django.db import migrations, models
+
+
+def actualizado_desde_publicacion(apps, schema_editor):
+    # Para los artículos existentes la mejor aproximación es su fecha de publicación
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    Articulo.objects.update(actualizado=models.F('fecha_publicacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0014_articulo_campos_derivados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='actualizado',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última modificación'),
+        ),
+        migrations.RunPython(actualizado_desde_publicacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _conteo(queryset, campo):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{campo: OuterRef('pk')}).order_by().values(campo)
+            .annotate(total=Count('*')).values('total')[:1],
+            output_field=models.IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def calcular_contadores(apps, schema_editor):
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    Comentario = apps.get_model('blog_circadiano', 'Comentario')
+    Articulo.objects.update(
+        num_likes=_conteo(Articulo.likes.through.objects.all(), 'articulo_id'),
+        num_comentarios=_conteo(Comentario.objects.filter(activo=True), 'articulo_id'),
+    )
+    Comentario.objects.update(num_likes=_conteo(Comentario.likes.through.objects.all(), 'comentario_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0015_articulo_actualizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='num_comentarios',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comentarios activos'),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='num_likes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Likes'),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='num_likes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Likes'),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+DIGITOS_RUTA = 10
+
+
+def calcular_rutas(apps, schema_editor):
+    # Los padres siempre tienen un id menor que sus respuestas: basta recorrer por id
+    Comentario = apps.get_model('blog_circadiano', 'Comentario')
+    rutas = {}
+    pendientes = []
+    for pk, parent_id in Comentario.objects.order_by('pk').values_list('pk', 'parent_id').iterator():
+        ruta = rutas.get(parent_id, '') + f'{pk:0{DIGITOS_RUTA}d}'
+        rutas[pk] = ruta
+        pendientes.append(Comentario(pk=pk, ruta=ruta, profundidad=len(ruta) // DIGITOS_RUTA - 1))
+        if len(pendientes) >= 500:
+            Comentario.objects.bulk_update(pendientes, ['ruta', 'profundidad'])
+            pendientes = []
+    if pendientes:
+        Comentario.objects.bulk_update(pendientes, ['ruta', 'profundidad'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0016_contadores'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comentario',
+            name='profundidad',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comentario',
+            name='ruta',
+            field=models.CharField(blank=True, editable=False, max_length=1000),
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['articulo', 'ruta'], name='comentario_hilo_idx'),
+        ),
+        migrations.RunPython(calcular_rutas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+def renderizar_existentes(apps, schema_editor):
+    from blog_circadiano.cuerpo import renderizar_articulo
+
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    campos = ['contenido_html', 'documento_html', 'hash_render']
+    pendientes = []
+    for articulo in Articulo.objects.only('id', 'contenido', 'documento_detallado').iterator(chunk_size=100):
+        # Sin procesar imágenes (su tabla aún no existe): hash_render vacío deja el artículo
+        # pendiente para 'manage.py renderizar_cuerpos', que corre en cada release (Procfile)
+        for campo, valor in renderizar_articulo(articulo, con_imagenes=False).items():
+            setattr(articulo, campo, valor)
+        articulo.hash_render = ''
+        pendientes.append(articulo)
+        if len(pendientes) >= 100:
+            Articulo.objects.bulk_update(pendientes, campos)
+            pendientes = []
+    if pendientes:
+        Articulo.objects.bulk_update(pendientes, campos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0017_comentario_ruta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='contenido_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='documento_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='articulo',
+            name='hash_render',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(renderizar_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0018_articulo_cuerpo_renderizado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImagenContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ruta', models.CharField(help_text='Nombre del archivo en el almacenamiento por defecto.', max_length=500, unique=True)),
+                ('ancho', models.PositiveIntegerField()),
+                ('alto', models.PositiveIntegerField()),
+                ('variantes', models.JSONField(blank=True, default=dict, help_text='Ancho en píxeles -> URL de la variante.')),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Imagen de contenido',
+                'verbose_name_plural': 'Imágenes de contenido',
+            },
+        ),
+    ]
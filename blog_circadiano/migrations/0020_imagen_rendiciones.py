@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0019_imagencontenido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='imagen_rendiciones',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serie',
+            name='imagen_rendiciones',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
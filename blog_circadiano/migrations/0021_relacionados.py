@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0020_imagen_rendiciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VectorArticulo',
+            fields=[
+                ('articulo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='blog_circadiano.articulo')),
+                ('terminos', models.JSONField(default=dict, help_text='Término -> número de apariciones.')),
+                ('hash_texto', models.CharField(blank=True, max_length=64)),
+            ],
+            options={
+                'verbose_name': 'Vector de artículo',
+                'verbose_name_plural': 'Vectores de artículos',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticuloRelacionado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posicion', models.PositiveSmallIntegerField()),
+                ('puntaje', models.FloatField()),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionados', to='blog_circadiano.articulo')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog_circadiano.articulo')),
+            ],
+            options={
+                'verbose_name': 'Artículo relacionado',
+                'verbose_name_plural': 'Artículos relacionados',
+                'ordering': ['articulo', 'posicion'],
+                'constraints': [models.UniqueConstraint(fields=('articulo', 'posicion'), name='relacionado_posicion_unica')],
+            },
+        ),
+    ]
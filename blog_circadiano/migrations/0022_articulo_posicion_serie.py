@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def numerar_partes(apps, schema_editor):
+    # Hasta ahora las series se leían por fecha de publicación: ese es el orden inicial
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    pendientes = []
+    serie_actual, posicion = None, 0
+    filas = Articulo.objects.filter(serie__isnull=False).order_by('serie_id', 'fecha_publicacion', 'pk')
+    for pk, serie_id in filas.values_list('pk', 'serie_id').iterator():
+        posicion = posicion + 1 if serie_id == serie_actual else 1
+        serie_actual = serie_id
+        pendientes.append(Articulo(pk=pk, posicion_serie=posicion))
+    Articulo.objects.bulk_update(pendientes, ['posicion_serie'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0021_relacionados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='posicion_serie',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Orden dentro de la serie. Vacío: al final.', null=True, verbose_name='Parte de la serie'),
+        ),
+        migrations.AddIndex(
+            model_name='articulo',
+            index=models.Index(fields=['serie', 'posicion_serie'], name='articulo_serie_posicion_idx'),
+        ),
+        migrations.RunPython(numerar_partes, migrations.RunPython.noop),
+    ]
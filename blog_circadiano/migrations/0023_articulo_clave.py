@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:40
+
+import uuid
+
+from django.db import migrations, models
+
+
+def generar_claves(apps, schema_editor):
+    Articulo = apps.get_model('blog_circadiano', 'Articulo')
+    pendientes = []
+    for pk in Articulo.objects.filter(clave__isnull=True).values_list('pk', flat=True).iterator():
+        pendientes.append(Articulo(pk=pk, clave=uuid.uuid4()))
+        if len(pendientes) >= 500:
+            Articulo.objects.bulk_update(pendientes, ['clave'])
+            pendientes = []
+    if pendientes:
+        Articulo.objects.bulk_update(pendientes, ['clave'])
+
+
+class Migration(migrations.Migration):
+    # La restricción única va en la migración siguiente: en PostgreSQL no se puede
+    # alterar la tabla en la misma transacción que actualizó sus filas
+
+    dependencies = [
+        ('blog_circadiano', '0022_articulo_posicion_serie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articulo',
+            name='clave',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(generar_claves, migrations.RunPython.noop),
+    ]
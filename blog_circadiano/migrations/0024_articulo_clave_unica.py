@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:40
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0023_articulo_clave'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='articulo',
+            name='clave',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:58
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_vectores(apps, schema_editor):
+    # Índice invertido y frecuencias de los vectores existentes; los pesos que faltan los
+    # calcula relacionados.py al usarlos (y todos la siguiente reconstrucción)
+    VectorArticulo = apps.get_model('blog_circadiano', 'VectorArticulo')
+    TerminoArticulo = apps.get_model('blog_circadiano', 'TerminoArticulo')
+    FrecuenciaTermino = apps.get_model('blog_circadiano', 'FrecuenciaTermino')
+    documentos = Counter()
+    total = 0
+    for pk, terminos in VectorArticulo.objects.values_list('articulo_id', 'terminos').iterator(chunk_size=500):
+        terminos = [t for t in terminos if len(t) <= 100]
+        TerminoArticulo.objects.bulk_create([TerminoArticulo(termino=t, articulo_id=pk) for t in terminos])
+        documentos.update(terminos)
+        total += 1
+    documentos[''] = total
+    FrecuenciaTermino.objects.bulk_create(
+        [FrecuenciaTermino(termino=t, documentos=n) for t, n in documentos.items()], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0024_articulo_clave_unica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrecuenciaTermino',
+            fields=[
+                ('termino', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('documentos', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Frecuencia de término',
+                'verbose_name_plural': 'Frecuencias de términos',
+            },
+        ),
+        migrations.AddField(
+            model_name='vectorarticulo',
+            name='pesos',
+            field=models.JSONField(default=dict, help_text='Término -> peso TF-IDF normalizado, con el IDF de cuando se calculó.'),
+        ),
+        migrations.CreateModel(
+            name='TerminoArticulo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=100)),
+                ('articulo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog_circadiano.articulo')),
+            ],
+            options={
+                'verbose_name': 'Término de artículo',
+                'verbose_name_plural': 'Términos de artículos',
+                'constraints': [models.UniqueConstraint(fields=('termino', 'articulo'), name='termino_articulo_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_vectores, migrations.RunPython.noop),
+    ]
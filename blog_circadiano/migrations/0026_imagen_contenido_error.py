@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_circadiano', '0025_relacionados_incremental'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagencontenido',
+            name='error',
+            field=models.CharField(blank=True, help_text='Por qué no se pudo leer el archivo (vacío si se procesó).', max_length=300),
+        ),
+        migrations.AlterField(
+            model_name='imagencontenido',
+            name='alto',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='imagencontenido',
+            name='ancho',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
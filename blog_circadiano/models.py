@@ -1,9 +1,15 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.template.defaultfilters import slugify # Para crear slugs automáticamente
 from ckeditor_uploader.fields import RichTextUploadingField
 
+from .contenido import derivar_campos, hash_contenido
+from .cuerpo import huella as huella_cuerpo, renderizar_articulo
+from . import rendiciones
+
 class Categoria(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True) # Para URLs amigables
@@ -40,6 +46,8 @@ class Serie(models.Model):
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     descripcion = models.TextField(blank=True, null=True)
     imagen_destacada = models.ImageField(upload_to='series/', blank=True, null=True)
+    # Tamaños thumb/card/hero de la imagen destacada, generados en segundo plano (ver rendiciones.py)
+    imagen_rendiciones = models.JSONField(default=dict, blank=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Series"
@@ -48,21 +56,43 @@ class Serie(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.titulo)
+        update_fields = kwargs.get('update_fields')
+        imagen_nueva = (update_fields is None or 'imagen_destacada' in update_fields) and rendiciones.actualizar(self)
+        if imagen_nueva and update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'imagen_rendiciones'}
         super().save(*args, **kwargs)
+        if imagen_nueva and self.imagen_destacada:
+            rendiciones.encolar(self)
 
     def __str__(self):
         return self.titulo
 
 class Articulo(models.Model):
+    # Identificador estable entre entornos: la exportación/importación JSONL
+    # ('manage.py exportar_contenido' / 'importar_contenido', ver intercambio.py) lo usa para el upsert
+    clave = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     titulo = models.CharField(max_length=200)
     contenido = RichTextUploadingField(verbose_name="Contenido Principal")
     fecha_publicacion = models.DateTimeField(default=timezone.now)
+    # Última modificación visible del artículo: se actualiza al guardarlo y, desde signals.py,
+    # cuando cambian sus comentarios, sus likes o el nombre de su categoría/etiquetas/serie.
+    actualizado = models.DateTimeField(auto_now=True, verbose_name="Última modificación")
     autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='articulos')
     imagen_destacada = models.ImageField(upload_to='articulos/', blank=True, null=True)
+    # Tamaños thumb/card/hero de la imagen destacada, generados en segundo plano (ver rendiciones.py)
+    imagen_rendiciones = models.JSONField(default=dict, blank=True, editable=False)
     likes = models.ManyToManyField(User, related_name='articulos_liked', blank=True)
+    # Contadores desnormalizados, mantenidos con F() desde signals.py (ver contadores.py para reconciliar)
+    num_likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Likes")
+    num_comentarios = models.PositiveIntegerField(default=0, editable=False, verbose_name="Comentarios activos")
     
     # ¡ESTOS SON LOS CAMPOS CLAVE QUE DEBEN ESTAR AQUÍ!
     serie = models.ForeignKey(Serie, on_delete=models.SET_NULL, null=True, blank=True, related_name='articulos')
+    # Orden de lectura dentro de la serie. Si se deja vacío, save() pone el artículo al final.
+    posicion_serie = models.PositiveSmallIntegerField(
+        null=True, blank=True, verbose_name="Parte de la serie",
+        help_text="Orden dentro de la serie. Vacío: al final.",
+    )
     categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True, related_name='articulos')
     etiquetas = models.ManyToManyField(Etiqueta, blank=True, related_name='articulos')
 
@@ -79,17 +109,108 @@ class Articulo(models.Model):
         verbose_name="Documento Detallado (Investigación)"
     )
 
+    # Campos derivados de 'contenido', calculados en save() (ver contenido.derivar_campos).
+    # Las listas y la búsqueda usan estos campos y nunca cargan el HTML completo.
+    texto_plano = models.TextField(blank=True, editable=False)
+    extracto = models.CharField(max_length=300, blank=True, editable=False)
+    palabras = models.PositiveIntegerField(default=0, editable=False)
+    minutos_lectura = models.PositiveSmallIntegerField(default=1, editable=False, verbose_name="Minutos de lectura")
+    hash_contenido = models.CharField(max_length=64, blank=True, editable=False)
+
+    # Cuerpos ya limpios y listos para la plantilla, renderizados en save() (ver cuerpo.py).
+    # hash_render identifica el HTML de origen y la versión de las reglas con que se generaron.
+    contenido_html = models.TextField(blank=True, editable=False)
+    documento_html = models.TextField(blank=True, editable=False)
+    hash_render = models.CharField(max_length=64, blank=True, editable=False)
+
+    # Lo que el registro de taxonomía toma de cada artículo (conteos por categoría y serie,
+    # última publicación de cada serie): signals.py solo publica una versión nueva si cambia
+    CAMPOS_TAXONOMIA = ('categoria_id', 'serie_id', 'fecha_publicacion')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Serie y posición tal como están en la BD: al guardar se sabe si el artículo
+        # cambió de serie (pasa al final de la nueva) y qué partes hay que invalidar (signals.py)
+        if 'serie_id' in field_names and 'posicion_serie' in field_names:
+            instancia._serie_guardada = (instancia.serie_id, instancia.posicion_serie)
+        instancia._taxonomia_guardada = {
+            campo: getattr(instancia, campo) for campo in cls.CAMPOS_TAXONOMIA if campo in field_names
+        }
+        return instancia
+
     def __str__(self):
         return self.titulo
 
+    def _posicion_calculada(self):
+        if not self.serie_id:
+            return None
+        serie_guardada, posicion_guardada = getattr(self, '_serie_guardada', (None, None))
+        # Se respeta la posición indicada, salvo si el artículo cambió de serie sin tocarla
+        if self.posicion_serie is not None and (self.serie_id == serie_guardada or self.posicion_serie != posicion_guardada):
+            return self.posicion_serie
+        ultima = Articulo.objects.filter(serie_id=self.serie_id).exclude(pk=self.pk).aggregate(
+            ultima=models.Max('posicion_serie')
+        )['ultima']
+        return (ultima or 0) + 1
+
+    def _en_juego(self, campos, update_fields):
+        # Un campo diferido no se modificó, y con update_fields solo cuentan los indicados
+        cargados = not set(campos) & self.get_deferred_fields()
+        return cargados and (update_fields is None or bool(set(campos) & set(update_fields)))
+
+    def save(self, *args, **kwargs):
+        # Solo se vuelve a derivar o renderizar si el HTML cambió desde el último guardado
+        update_fields = kwargs.get('update_fields')
+        calculados = {}
+        if self._en_juego(['contenido'], update_fields) and self.hash_contenido != hash_contenido(self.contenido):
+            calculados.update(derivar_campos(self.contenido))
+        if self._en_juego(['contenido', 'documento_detallado'], update_fields) and (
+            self.hash_render != huella_cuerpo(self.contenido, self.documento_detallado)
+        ):
+            calculados.update(renderizar_articulo(self))
+        imagen_nueva = self._en_juego(['imagen_destacada'], update_fields) and rendiciones.actualizar(self)
+        if imagen_nueva:
+            calculados['imagen_rendiciones'] = self.imagen_rendiciones
+        # get_deferred_fields() usa 'serie_id'; update_fields admite 'serie' o 'serie_id'
+        if self._en_juego(['serie', 'serie_id', 'posicion_serie'], update_fields):
+            posicion = self._posicion_calculada()
+            if posicion != self.posicion_serie:
+                calculados['posicion_serie'] = posicion
+        for campo, valor in calculados.items():
+            setattr(self, campo, valor)
+        if calculados and update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(calculados)
+        super().save(*args, **kwargs)
+        if not {'serie_id', 'posicion_serie'} & self.get_deferred_fields():
+            self._serie_guardada = (self.serie_id, self.posicion_serie)
+        diferidos = self.get_deferred_fields()
+        self._taxonomia_guardada = {
+            campo: getattr(self, campo) for campo in self.CAMPOS_TAXONOMIA if campo not in diferidos
+        }
+        if imagen_nueva and self.imagen_destacada:
+            rendiciones.encolar(self)
+
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.num_likes
 
     class Meta:
         ordering = ['-fecha_publicacion']
+        indexes = [
+            # Índice para la paginación por cursor (fecha_publicacion, id) de lista_articulos
+            models.Index(fields=['-fecha_publicacion', '-id'], name='articulo_fecha_id_idx'),
+            # Partes de una serie en orden de lectura (detalle_serie y navegación anterior/siguiente)
+            models.Index(fields=['serie', 'posicion_serie'], name='articulo_serie_posicion_idx'),
+        ]
 
 class Comentario(models.Model):
+    DIGITOS_RUTA = 10
+    LARGO_RUTA = 1000
+    # La ruta admite LARGO_RUTA // DIGITOS_RUTA niveles: un comentario a esta profundidad
+    # ya no acepta respuestas (ComentarioForm lo valida y _comment.html no ofrece "Responder")
+    PROFUNDIDAD_MAXIMA = LARGO_RUTA // DIGITOS_RUTA - 1
+
     articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='comentarios')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comentarios_realizados')
@@ -98,6 +219,25 @@ class Comentario(models.Model):
     activo = models.BooleanField(default=True)
     # Campo para los likes del comentario (ManyToManyField para saber quién dio like)
     likes = models.ManyToManyField(User, related_name='comentarios_liked', blank=True)
+    num_likes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Likes")
+    # Ruta materializada: ids de los ancestros y el propio, cada uno con 10 dígitos
+    # ('0000000012' + '0000000045' ...). Ordenar por (articulo, ruta) entrega el hilo
+    # completo en orden de lectura con una sola consulta (ver comentarios.py).
+    ruta = models.CharField(max_length=LARGO_RUTA, blank=True, editable=False)
+    profundidad = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Recordamos 'activo' tal como está en la BD para saber, al guardar, si cambió
+        # (el contador Articulo.num_comentarios solo cuenta comentarios activos).
+        if 'activo' in field_names:
+            instancia._activo_guardado = instancia.activo
+        return instancia
+
+    @property
+    def admite_respuestas(self):
+        return self.profundidad < self.PROFUNDIDAD_MAXIMA
 
     def __str__(self):
         if self.parent:
@@ -107,10 +247,143 @@ class Comentario(models.Model):
     # Propiedad para obtener el número de likes del comentario
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.num_likes
 
     class Meta:
         ordering = ['fecha_creacion']
+        indexes = [
+            models.Index(fields=['articulo', 'ruta'], name='comentario_hilo_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # La ruta necesita el id propio: se completa justo después del primer INSERT
+        if not self.ruta:
+            prefijo = self.parent.ruta if self.parent_id else ''
+            self.ruta = f'{prefijo}{self.pk:0{Comentario.DIGITOS_RUTA}d}'
+            self.profundidad = len(self.ruta) // Comentario.DIGITOS_RUTA - 1
+            Comentario.objects.filter(pk=self.pk).update(ruta=self.ruta, profundidad=self.profundidad)
 
     def is_parent(self):
-        return self.parent is None
\ No newline at end of file
+        return self.parent is None
+
+class DocumentoBusqueda(models.Model):
+    """
+    Documento de búsqueda de un artículo: texto plano ya preparado para el motor
+    de búsqueda (ver blog_circadiano/search.py). Se mantiene desde signals.py.
+
+    El índice real depende de la base de datos y se crea en la migración:
+    una columna tsvector con índice GIN en PostgreSQL o una tabla virtual FTS5 en SQLite.
+    """
+    articulo = models.OneToOneField(Articulo, on_delete=models.CASCADE, primary_key=True, related_name='documento_busqueda')
+    titulo = models.CharField(max_length=200)
+    taxonomia = models.TextField(blank=True, help_text="Categoría, etiquetas y serie del artículo.")
+    cuerpo = models.TextField(blank=True, help_text="Contenido del artículo en texto plano.")
+
+    class Meta:
+        verbose_name = "Documento de búsqueda"
+        verbose_name_plural = "Documentos de búsqueda"
+
+    def __str__(self):
+        return self.titulo
+
+
+class ImagenContenido(models.Model):
+    """
+    Metadatos de una imagen subida con CKEditor y sus variantes redimensionadas
+    (ver blog_circadiano/imagenes.py). Se calculan una vez, al renderizar el primer
+    artículo que la usa: renderizar de nuevo nunca vuelve a leer el archivo.
+
+    Si el archivo falta o no se puede leer, la fila guarda el motivo en 'error' (sin
+    dimensiones) y la imagen se muestra tal cual; para reintentar, se borra la fila.
+    """
+    ruta = models.CharField(max_length=500, unique=True, help_text="Nombre del archivo en el almacenamiento por defecto.")
+    ancho = models.PositiveIntegerField(null=True, blank=True)
+    alto = models.PositiveIntegerField(null=True, blank=True)
+    variantes = models.JSONField(default=dict, blank=True, help_text="Ancho en píxeles -> URL de la variante.")
+    error = models.CharField(max_length=300, blank=True, help_text="Por qué no se pudo leer el archivo (vacío si se procesó).")
+    creada = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Imagen de contenido"
+        verbose_name_plural = "Imágenes de contenido"
+
+    def __str__(self):
+        return self.ruta
+
+
+class VectorArticulo(models.Model):
+    """
+    Términos del título y el cuerpo de un artículo con su frecuencia, ya tokenizados
+    (ver blog_circadiano/relacionados.py). Con ellos se calcula la similitud TF-IDF
+    sin volver a leer ni procesar el texto de todo el corpus.
+    """
+    articulo = models.OneToOneField(Articulo, on_delete=models.CASCADE, primary_key=True, related_name='vector')
+    terminos = models.JSONField(default=dict, help_text="Término -> número de apariciones.")
+    hash_texto = models.CharField(max_length=64, blank=True)
+    pesos = models.JSONField(
+        default=dict, help_text="Término -> peso TF-IDF normalizado, con el IDF de cuando se calculó."
+    )
+
+    class Meta:
+        verbose_name = "Vector de artículo"
+        verbose_name_plural = "Vectores de artículos"
+
+    def __str__(self):
+        return f'Vector de {self.articulo_id}'
+
+
+class TerminoArticulo(models.Model):
+    """
+    Índice invertido de VectorArticulo: qué artículos contienen cada término. Con él la
+    actualización de un artículo lee solo los artículos que comparten términos con él.
+    """
+    LARGO_MAXIMO = 100
+
+    termino = models.CharField(max_length=LARGO_MAXIMO)
+    articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        verbose_name = "Término de artículo"
+        verbose_name_plural = "Términos de artículos"
+        constraints = [
+            models.UniqueConstraint(fields=['termino', 'articulo'], name='termino_articulo_unico'),
+        ]
+
+    def __str__(self):
+        return f'{self.termino} en {self.articulo_id}'
+
+
+class FrecuenciaTermino(models.Model):
+    """En cuántos artículos aparece cada término: el IDF de relacionados.py sin recorrer el corpus."""
+    termino = models.CharField(max_length=TerminoArticulo.LARGO_MAXIMO, primary_key=True)
+    documentos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Frecuencia de término"
+        verbose_name_plural = "Frecuencias de términos"
+
+    def __str__(self):
+        return f'{self.termino}: {self.documentos}'
+
+
+class ArticuloRelacionado(models.Model):
+    """
+    Los artículos más parecidos a cada artículo, precalculados fuera de la petición
+    (ver blog_circadiano/relacionados.py). El detalle los lee con una consulta.
+    """
+    articulo = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='relacionados')
+    relacionado = models.ForeignKey(Articulo, on_delete=models.CASCADE, related_name='+')
+    posicion = models.PositiveSmallIntegerField()
+    puntaje = models.FloatField()
+
+    class Meta:
+        ordering = ['articulo', 'posicion']
+        verbose_name = "Artículo relacionado"
+        verbose_name_plural = "Artículos relacionados"
+        constraints = [
+            models.UniqueConstraint(fields=['articulo', 'posicion'], name='relacionado_posicion_unica'),
+        ]
+
+    def __str__(self):
+        return f'{self.articulo_id} -> {self.relacionado_id} ({self.puntaje:.3f})'
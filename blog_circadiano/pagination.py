@@ -0,0 +1,75 @@
+# blog_circadiano/pagination.py
+
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido en la URL no se pudo decodificar."""
+
+
+def codificar_cursor(valor, pk):
+    """
+    Convierte la pareja (valor de orden, id) del último elemento de una página
+    en un token opaco y seguro para URLs. El valor puede ser una fecha
+    (fecha_publicacion) o un número (la relevancia de una búsqueda).
+    """
+    if isinstance(valor, datetime):
+        valor_str = 't' + valor.isoformat()
+    else:
+        valor_str = 'f' + repr(float(valor))
+    crudo = f"{valor_str}|{pk}".encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Operación inversa de codificar_cursor. Lanza CursorInvalido si el token
+    fue manipulado o está truncado.
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        crudo = base64.urlsafe_b64decode(cursor + relleno).decode()
+        valor_str, pk_str = crudo.rsplit('|', 1)
+        tipo, valor_str = valor_str[:1], valor_str[1:]
+        if tipo == 't':
+            valor = datetime.fromisoformat(valor_str)
+        elif tipo == 'f':
+            valor = float(valor_str)
+        else:
+            raise ValueError(tipo)
+        return valor, int(pk_str)
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise CursorInvalido(cursor) from e
+
+
+def paginar_por_cursor(queryset, cursor=None, por_pagina=10, campo='fecha_publicacion'):
+    """
+    Paginación por conjunto de claves (keyset) sobre (campo, id) descendente.
+    campo puede ser un campo del modelo o una anotación (ej. 'relevancia').
+
+    En lugar de OFFSET, cada página filtra "estrictamente antes" del último
+    elemento de la página anterior, así que la página 500 cuesta lo mismo que
+    la primera (usa el índice en vez de recorrer y descartar filas).
+
+    Retorna (elementos, siguiente_cursor). siguiente_cursor es None en la última página.
+    """
+    qs = queryset.order_by(f'-{campo}', '-id')
+
+    if cursor:
+        valor, pk = decodificar_cursor(cursor)
+        qs = qs.filter(
+            Q(**{f'{campo}__lt': valor}) | Q(**{campo: valor, 'id__lt': pk})
+        )
+
+    # Pedimos un elemento extra solo para saber si existe una página siguiente.
+    elementos = list(qs[:por_pagina + 1])
+    siguiente_cursor = None
+    if len(elementos) > por_pagina:
+        elementos = elementos[:por_pagina]
+        ultimo = elementos[-1]
+        siguiente_cursor = codificar_cursor(getattr(ultimo, campo), ultimo.pk)
+
+    return elementos, siguiente_cursor
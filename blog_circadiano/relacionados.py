@@ -0,0 +1,460 @@
+# blog_circadiano/relacionados.py
+
+"""
+Artículos relacionados, precalculados fuera de la petición.
+
+El puntaje entre dos artículos suma:
+- la similitud coseno TF-IDF de su título y texto plano (PESO_TEXTO),
+- la proporción de etiquetas compartidas, índice de Jaccard (PESO_ETIQUETAS),
+- misma categoría (PESO_CATEGORIA) y misma serie (PESO_SERIE).
+
+Los RELACIONADOS_POR_ARTICULO mejores de cada artículo se guardan en ArticuloRelacionado
+y el detalle los lee con una consulta (de()). Los términos de cada artículo se guardan
+tokenizados en VectorArticulo junto con sus pesos TF-IDF; TerminoArticulo es el índice
+invertido (qué artículos contienen cada término) y FrecuenciaTermino, el número de
+artículos con cada término (la fila de término vacío guarda el total).
+
+- 'manage.py calcular_relacionados' (y una tarea diaria) reconstruye todo, vectorizando
+  el corpus por lotes y puntuando con un índice en memoria (Corpus). También recalcula
+  las frecuencias y los pesos, que se desvían con cada actualización suelta.
+- Al guardar un artículo (si cambió su texto, categoría o serie) o cambiar sus etiquetas,
+  signals.py encola actualizar(pk). No recorre el corpus: puntúa el artículo solo contra
+  los que comparten con él uno de sus TERMINOS_CANDIDATOS términos de más peso, una
+  etiqueta, la categoría o la serie, con los pesos y frecuencias guardados, y corrige las
+  listas de esos artículos. Es una aproximación (una lista de la que sale el artículo no
+  busca un reemplazo fuera de su lista) que la reconstrucción diaria deja exacta.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .condicional import marcar_articulos_modificados
+from .models import Articulo, ArticuloRelacionado, FrecuenciaTermino, TerminoArticulo, VectorArticulo
+from .search import _raiz
+
+VERSION = 1  # cambiarla obliga a revectorizar todo el corpus en la siguiente reconstrucción
+
+RELACIONADOS_POR_ARTICULO = 4
+PESO_TEXTO = 0.6
+PESO_ETIQUETAS = 0.2
+PESO_CATEGORIA = 0.1
+PESO_SERIE = 0.1
+PUNTAJE_MINIMO = 0.02
+
+MAX_TERMINOS = 200                   # términos más frecuentes que se guardan por artículo
+MAX_PROPORCION_DOCUMENTOS = 0.5      # un término presente en más de la mitad del corpus no discrimina
+TERMINOS_CANDIDATOS = 25             # términos de más peso con que actualizar() busca candidatos
+TOTAL_DOCUMENTOS = ''                # término de FrecuenciaTermino que guarda el número de artículos
+LOTE_ESCRITURA = 1000
+
+_PALABRA = re.compile(r'[^\W\d_]{3,}')
+
+PALABRAS_VACIAS = frozenset("""
+    ante bajo cabe con contra desde durante entre hacia hasta mediante para por segun sin sobre tras
+    los las del una uno unos unas que como cuando donde quien cual cuales cuyo cuya pero sino aunque
+    mas muy tan tanto tambien ademas incluso solo ya aun asi pues porque luego entonces
+    este esta esto estos estas ese esa eso esos esas aquel aquella aquello aquellos aquellas
+    ser estar haber tener hacer poder deber son sus suyo suya nos nuestro nuestra ellos ellas
+    usted ustedes ella hay han has hemos habia fue fueron era eran sera seria sido siendo
+    esta estan estaba estaban tiene tienen puede pueden debe deben hace hacen otro otra otros otras
+    cada todo toda todos todas mismo misma mismos mismas algo alguno alguna algunos algunas
+    nada ningun ninguna mucho mucha muchos muchas poco poca pocos pocas menos mayor menor mejor peor
+    vez veces parte forma manera tipo caso mientras antes despues siempre nunca tal segun dos tres
+""".split())
+
+
+def tokenizar(texto):
+    """Palabras sin tildes, sin palabras vacías y reducidas a su raíz ('ritmos' -> 'ritm')."""
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return [_raiz(p) for p in _PALABRA.findall(texto) if p not in PALABRAS_VACIAS]
+
+
+def _texto(titulo, texto_plano):
+    # El título pesa el doble que el cuerpo
+    return f'{titulo} {titulo} {texto_plano}'
+
+
+def huella_texto(titulo, texto_plano):
+    """El hash_texto de VectorArticulo: si no cambia, no hay que volver a vectorizar."""
+    return hashlib.sha256(f'{VERSION}|{_texto(titulo, texto_plano)}'.encode()).hexdigest()
+
+
+def vectorizar(titulo, texto_plano):
+    """Retorna (terminos, hash) para VectorArticulo."""
+    terminos = Counter(tokenizar(_texto(titulo, texto_plano))).most_common(MAX_TERMINOS)
+    return dict(terminos), huella_texto(titulo, texto_plano)
+
+
+def _idf(documentos, total):
+    return math.log((1 + total) / (1 + documentos)) + 1
+
+
+def pesar(terminos, documentos, total):
+    """
+    Pesos TF-IDF normalizados de {termino: conteo}, dados {termino: artículos que lo
+    contienen} y el total de artículos. Los términos demasiado comunes no cuentan.
+    """
+    pesos = {}
+    for termino, conteo in terminos.items():
+        frecuencia = documentos.get(termino, 0)
+        if total > 2 and frecuencia / total > MAX_PROPORCION_DOCUMENTOS:
+            continue
+        pesos[termino] = (1 + math.log(conteo)) * _idf(frecuencia, total)
+    norma = math.sqrt(sum(p * p for p in pesos.values())) or 1.0
+    return {t: round(p / norma, 6) for t, p in pesos.items()}
+
+
+def _mejores(puntajes):
+    """Lista [(otro_pk, puntaje)] de los mejores; a igual puntaje, el más reciente."""
+    candidatos = ((otro, p) for otro, p in puntajes.items() if p >= PUNTAJE_MINIMO)
+    return heapq.nlargest(RELACIONADOS_POR_ARTICULO, candidatos, key=lambda c: (c[1], c[0]))
+
+
+class Corpus:
+    """Índices en memoria para puntuar un artículo contra todos los demás (reconstrucción completa)."""
+
+    def __init__(self, vectores, articulos, etiquetas):
+        """
+        vectores: {pk: {termino: conteo}}; articulos: {pk: (categoria_id, serie_id)};
+        etiquetas: {pk: set(etiqueta_id)}.
+        """
+        self.articulos = articulos
+        self.etiquetas = etiquetas
+
+        self.total = max(len(vectores), 1)
+        self.documentos = Counter()
+        for terminos in vectores.values():
+            self.documentos.update(terminos.keys())
+
+        self.pesos = {}
+        self.indice = defaultdict(list)
+        for pk, terminos in vectores.items():
+            self.pesos[pk] = pesar(terminos, self.documentos, self.total)
+            for t, p in self.pesos[pk].items():
+                self.indice[t].append((pk, p))
+
+        self.por_etiqueta = defaultdict(set)
+        for pk, ids in etiquetas.items():
+            for etiqueta in ids:
+                self.por_etiqueta[etiqueta].add(pk)
+        self.por_categoria = defaultdict(set)
+        self.por_serie = defaultdict(set)
+        for pk, (categoria, serie) in articulos.items():
+            if categoria:
+                self.por_categoria[categoria].add(pk)
+            if serie:
+                self.por_serie[serie].add(pk)
+
+    @classmethod
+    def cargar(cls, lote=500):
+        vectores = dict(VectorArticulo.objects.values_list('articulo_id', 'terminos').iterator(chunk_size=lote))
+        articulos = {
+            pk: (categoria, serie)
+            for pk, categoria, serie in Articulo.objects.values_list('pk', 'categoria_id', 'serie_id').iterator(chunk_size=lote)
+        }
+        etiquetas = defaultdict(set)
+        for pk, etiqueta in Articulo.etiquetas.through.objects.values_list('articulo_id', 'etiqueta_id').iterator(chunk_size=lote):
+            etiquetas[pk].add(etiqueta)
+        return cls({pk: v for pk, v in vectores.items() if pk in articulos}, articulos, etiquetas)
+
+    def puntajes(self, pk):
+        """{otro_pk: puntaje} para todos los artículos que comparten algo con 'pk'."""
+        if pk not in self.articulos:
+            return {}
+        puntajes = defaultdict(float)
+        for termino, peso in self.pesos.get(pk, {}).items():
+            for otro, peso_otro in self.indice[termino]:
+                puntajes[otro] += PESO_TEXTO * peso * peso_otro
+
+        propias = self.etiquetas.get(pk, set())
+        compartidas = Counter()
+        for etiqueta in propias:
+            compartidas.update(self.por_etiqueta[etiqueta])
+        for otro, n in compartidas.items():
+            union = len(propias) + len(self.etiquetas.get(otro, ())) - n
+            puntajes[otro] += PESO_ETIQUETAS * n / union
+
+        categoria, serie = self.articulos[pk]
+        for otro in self.por_categoria.get(categoria, ()):
+            puntajes[otro] += PESO_CATEGORIA
+        for otro in self.por_serie.get(serie, ()):
+            puntajes[otro] += PESO_SERIE
+
+        puntajes.pop(pk, None)
+        return puntajes
+
+    def mejores(self, pk):
+        return _mejores(self.puntajes(pk))
+
+
+def _guardar_listas(listas):
+    """
+    Reemplaza las listas {pk: [(otro_pk, puntaje)]} que cambiaron, invalida la página de
+    esos artículos y retorna sus pks.
+
+    Leer, comparar y reemplazar va en una transacción, con los artículos bloqueados: dos
+    workers que recalculan el mismo artículo no chocan con la restricción (articulo, posicion)
+    y un lector nunca ve la lista borrada y todavía sin escribir.
+    """
+    with transaction.atomic():
+        list(Articulo.objects.filter(pk__in=listas).order_by('pk').select_for_update().values_list('pk', flat=True))
+        actuales = defaultdict(list)
+        for fila in ArticuloRelacionado.objects.filter(articulo_id__in=listas).values_list('articulo_id', 'relacionado_id', 'puntaje'):
+            actuales[fila[0]].append((fila[1], round(fila[2], 6)))
+        cambiadas = [
+            pk for pk, lista in listas.items()
+            if [(otro, round(p, 6)) for otro, p in lista] != actuales.get(pk, [])
+        ]
+        if not cambiadas:
+            return []
+
+        ArticuloRelacionado.objects.filter(articulo_id__in=cambiadas).delete()
+        ArticuloRelacionado.objects.bulk_create([
+            ArticuloRelacionado(articulo_id=pk, relacionado_id=otro, posicion=posicion, puntaje=puntaje)
+            for pk in cambiadas
+            for posicion, (otro, puntaje) in enumerate(listas[pk])
+        ])
+        # Las filas se escriben sin Articulo.save(): la página cacheada se invalida a mano
+        marcar_articulos_modificados(cambiadas)
+    return cambiadas
+
+
+# --- Vectores, índice invertido y frecuencias ---
+
+def _indexar(nuevos, anteriores, frecuencias):
+    """
+    Reescribe las filas de TerminoArticulo de los vectores {pk: terminos} recién guardados y,
+    con frecuencias=True, ajusta FrecuenciaTermino según {pk: terminos previos} (sin entrada
+    si el artículo no tenía vector).
+    """
+    TerminoArticulo.objects.filter(articulo_id__in=nuevos).delete()
+    TerminoArticulo.objects.bulk_create(
+        [
+            TerminoArticulo(termino=termino, articulo_id=pk)
+            for pk, terminos in nuevos.items()
+            for termino in terminos if len(termino) <= TerminoArticulo.LARGO_MAXIMO
+        ],
+        batch_size=LOTE_ESCRITURA,
+    )
+    if not frecuencias:
+        return
+    cambios = Counter()
+    for pk, terminos in nuevos.items():
+        previos = anteriores.get(pk, {})
+        cambios.update(terminos.keys() - previos.keys())
+        cambios.subtract(previos.keys() - terminos.keys())
+        if pk not in anteriores:
+            cambios[TOTAL_DOCUMENTOS] += 1
+    por_cambio = defaultdict(list)
+    for termino, cambio in cambios.items():
+        if cambio and len(termino) <= TerminoArticulo.LARGO_MAXIMO:
+            por_cambio[cambio].append(termino)
+    FrecuenciaTermino.objects.bulk_create(
+        [FrecuenciaTermino(termino=t) for terminos in por_cambio.values() for t in terminos], ignore_conflicts=True,
+    )
+    for cambio, terminos in por_cambio.items():
+        FrecuenciaTermino.objects.filter(termino__in=terminos).update(documentos=F('documentos') + cambio)
+
+
+def _vectorizar_lote(articulos, hashes, frecuencias=False):
+    """
+    Crea o actualiza los VectorArticulo de 'articulos' cuyo texto cambió (sus pesos se
+    vuelven a calcular después) y su índice invertido. Retorna cuántos.
+    """
+    nuevos, cambiados = [], []
+    for articulo in articulos:
+        terminos, huella = vectorizar(articulo.titulo, articulo.texto_plano)
+        if hashes.get(articulo.pk) == huella:
+            continue
+        vector = VectorArticulo(articulo_id=articulo.pk, terminos=terminos, hash_texto=huella, pesos={})
+        (cambiados if articulo.pk in hashes else nuevos).append(vector)
+    if not nuevos and not cambiados:
+        return 0
+    anteriores = {}
+    if frecuencias and cambiados:
+        anteriores = dict(
+            VectorArticulo.objects.filter(articulo_id__in=[v.articulo_id for v in cambiados]).values_list('articulo_id', 'terminos')
+        )
+    VectorArticulo.objects.bulk_create(nuevos)
+    VectorArticulo.objects.bulk_update(cambiados, ['terminos', 'hash_texto', 'pesos'])
+    _indexar({v.articulo_id: v.terminos for v in nuevos + cambiados}, anteriores, frecuencias)
+    return len(nuevos) + len(cambiados)
+
+
+def _guardar_frecuencias_y_pesos(corpus, lote):
+    """Tras una reconstrucción: frecuencias exactas del corpus y pesos de todos los vectores."""
+    with transaction.atomic():
+        FrecuenciaTermino.objects.all().delete()
+        filas = [
+            FrecuenciaTermino(termino=termino, documentos=documentos)
+            for termino, documentos in corpus.documentos.items() if len(termino) <= TerminoArticulo.LARGO_MAXIMO
+        ]
+        filas.append(FrecuenciaTermino(termino=TOTAL_DOCUMENTOS, documentos=len(corpus.pesos)))
+        FrecuenciaTermino.objects.bulk_create(filas, batch_size=LOTE_ESCRITURA)
+
+    cambiados = []
+    for pk, guardados in VectorArticulo.objects.values_list('articulo_id', 'pesos').iterator(chunk_size=lote):
+        pesos = corpus.pesos.get(pk)
+        if pesos is not None and pesos != guardados:
+            cambiados.append(VectorArticulo(articulo_id=pk, pesos=pesos))
+    VectorArticulo.objects.bulk_update(cambiados, ['pesos'], batch_size=lote)
+
+
+def _pesos(pks):
+    """
+    {pk: pesos} de esos artículos. Los que no los tienen (texto recién cambiado) se calculan
+    con las frecuencias guardadas y se guardan.
+    """
+    pesos = dict(VectorArticulo.objects.filter(articulo_id__in=pks).values_list('articulo_id', 'pesos'))
+    faltan = [pk for pk, guardados in pesos.items() if not guardados]
+    if faltan:
+        vectores = dict(VectorArticulo.objects.filter(articulo_id__in=faltan).values_list('articulo_id', 'terminos'))
+        terminos = set().union(*vectores.values()) | {TOTAL_DOCUMENTOS}
+        documentos = dict(FrecuenciaTermino.objects.filter(termino__in=terminos).values_list('termino', 'documentos'))
+        total = max(documentos.pop(TOTAL_DOCUMENTOS, 0), 1)
+        calculados = {pk: pesar(vector, documentos, total) for pk, vector in vectores.items()}
+        VectorArticulo.objects.bulk_update(
+            [VectorArticulo(articulo_id=pk, pesos=p) for pk, p in calculados.items()], ['pesos'],
+        )
+        pesos.update(calculados)
+    return pesos
+
+
+# --- Puntajes sin cargar el corpus ---
+
+def _puntajes(pk):
+    """
+    {otro_pk: puntaje} de 'pk' contra los artículos que comparten con él uno de sus
+    TERMINOS_CANDIDATOS términos de más peso, una etiqueta, la categoría o la serie.
+    None si el artículo no existe.
+    """
+    fila = Articulo.objects.filter(pk=pk).values_list('categoria_id', 'serie_id').first()
+    if fila is None:
+        return None
+    categoria, serie = fila
+    puntajes = defaultdict(float)
+
+    propios = _pesos([pk]).get(pk, {})
+    principales = heapq.nlargest(TERMINOS_CANDIDATOS, propios, key=propios.get)
+    por_texto = set(
+        TerminoArticulo.objects.filter(termino__in=principales).exclude(articulo_id=pk).values_list('articulo_id', flat=True)
+    )
+    for otro, pesos in _pesos(por_texto).items():
+        puntajes[otro] += PESO_TEXTO * sum(peso * pesos.get(termino, 0.0) for termino, peso in propios.items())
+
+    relacion_etiquetas = Articulo.etiquetas.through.objects
+    propias = set(relacion_etiquetas.filter(articulo_id=pk).values_list('etiqueta_id', flat=True))
+    if propias:
+        compartidas = Counter(
+            relacion_etiquetas.filter(etiqueta_id__in=propias).exclude(articulo_id=pk).values_list('articulo_id', flat=True)
+        )
+        totales = dict(
+            relacion_etiquetas.filter(articulo_id__in=compartidas).order_by()
+            .values('articulo_id').annotate(total=Count('*')).values_list('articulo_id', 'total')
+        )
+        for otro, n in compartidas.items():
+            puntajes[otro] += PESO_ETIQUETAS * n / (len(propias) + totales[otro] - n)
+
+    misma = Q()
+    if categoria:
+        misma |= Q(categoria_id=categoria)
+    if serie:
+        misma |= Q(serie_id=serie)
+    if misma:
+        for otro, categoria_otro, serie_otro in Articulo.objects.filter(misma).exclude(pk=pk).values_list('pk', 'categoria_id', 'serie_id'):
+            if categoria and categoria_otro == categoria:
+                puntajes[otro] += PESO_CATEGORIA
+            if serie and serie_otro == serie:
+                puntajes[otro] += PESO_SERIE
+
+    puntajes.pop(pk, None)
+    return puntajes
+
+
+# --- Operaciones ---
+
+def reconstruir(lote=200):
+    """Vectoriza por lotes lo que cambió y recalcula todas las listas. Retorna (vectorizados, listas cambiadas)."""
+    hashes = dict(VectorArticulo.objects.values_list('articulo_id', 'hash_texto'))
+    vectorizados = 0
+    pendientes = []
+    for articulo in Articulo.objects.only('id', 'titulo', 'texto_plano').iterator(chunk_size=lote):
+        pendientes.append(articulo)
+        if len(pendientes) >= lote:
+            vectorizados += _vectorizar_lote(pendientes, hashes)
+            pendientes = []
+    vectorizados += _vectorizar_lote(pendientes, hashes)
+
+    corpus = Corpus.cargar()
+    _guardar_frecuencias_y_pesos(corpus, lote)
+    pks = sorted(corpus.articulos)
+    cambiadas = 0
+    for inicio in range(0, len(pks), lote):
+        cambiadas += len(_guardar_listas({pk: corpus.mejores(pk) for pk in pks[inicio:inicio + lote]}))
+    # Artículos borrados desde la última reconstrucción no tienen filas (CASCADE)
+    return vectorizados, cambiadas
+
+
+def recalcular(pks):
+    """Recalcula las listas de 'pks' (p. ej. las que mostraban un artículo borrado)."""
+    listas = {}
+    for pk in pks:
+        puntajes = _puntajes(pk)
+        if puntajes is not None:
+            listas[pk] = _mejores(puntajes)
+    return _guardar_listas(listas)
+
+
+def actualizar(pk):
+    """
+    Tras guardar el artículo 'pk': lo vectoriza de nuevo si su texto cambió, recalcula su
+    lista y corrige las de los artículos en cuya lista entra, cambia de puntaje o de cuya
+    lista sale. Retorna los pks cuyas listas cambiaron.
+    """
+    articulo = Articulo.objects.filter(pk=pk).only('id', 'titulo', 'texto_plano').first()
+    if articulo is None:
+        return []
+    hashes = dict(VectorArticulo.objects.filter(articulo_id=pk).values_list('articulo_id', 'hash_texto'))
+    _vectorizar_lote([articulo], hashes, frecuencias=True)
+
+    puntajes = _puntajes(pk)
+    listas = {pk: _mejores(puntajes)}
+
+    vecinos = set(ArticuloRelacionado.objects.filter(relacionado_id=pk).values_list('articulo_id', flat=True))
+    vecinos |= {otro for otro, p in puntajes.items() if p >= PUNTAJE_MINIMO}
+    actuales = defaultdict(list)
+    for otro, relacionado, puntaje in (
+        ArticuloRelacionado.objects.filter(articulo_id__in=vecinos)
+        .order_by('articulo_id', 'posicion').values_list('articulo_id', 'relacionado_id', 'puntaje')
+    ):
+        actuales[otro].append((relacionado, puntaje))
+    for otro in vecinos:
+        lista = [(relacionado, p) for relacionado, p in actuales[otro] if relacionado != pk]
+        if puntajes.get(otro, 0) >= PUNTAJE_MINIMO:
+            lista.append((pk, puntajes[otro]))
+        lista = heapq.nlargest(RELACIONADOS_POR_ARTICULO, lista, key=lambda c: (c[1], c[0]))
+        if lista != actuales[otro]:
+            listas[otro] = lista
+    return _guardar_listas(listas)
+
+
+def de(articulo_pk):
+    """Artículos relacionados para mostrar en el detalle, en orden, con una consulta."""
+    filas = (
+        ArticuloRelacionado.objects.filter(articulo_id=articulo_pk)
+        .select_related('relacionado')
+        .only(
+            'articulo_id', 'posicion', 'relacionado__id', 'relacionado__titulo', 'relacionado__extracto',
+            'relacionado__minutos_lectura', 'relacionado__imagen_destacada', 'relacionado__imagen_rendiciones',
+        )
+        .order_by('posicion')
+    )
+    return [fila.relacionado for fila in filas]
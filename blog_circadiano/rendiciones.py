@@ -0,0 +1,131 @@
+# blog_circadiano/rendiciones.py
+
+"""
+Rendiciones de la imagen destacada de artículos y series.
+
+Al guardar un Articulo o una Serie con una imagen nueva se encola la generación
+(trabajador de tareas, ver blog_circadiano/tareas.py) de tres tamaños
+con nombre (thumb para listas, card para tarjetas, hero para la cabecera del
+detalle), cada uno en WebP y en JPEG como respaldo. Se guardan junto al original
+con el almacenamiento de STORAGES['default'] (sistema de archivos o Cloudinary)
+y sus nombres quedan en el campo 'imagen_rendiciones' del modelo:
+
+    {'origen': 'articulos/foto.png',
+     'card': {'webp': 'articulos/foto__card.webp', 'jpeg': 'articulos/foto__card.jpg',
+              'ancho': 800, 'alto': 500},
+     ...}
+
+Las plantillas las usan con {% imagen_destacada objeto 'card' %} (templatetags/rendiciones.py).
+'manage.py generar_rendiciones' las crea para imágenes subidas antes de existir este módulo.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from tareas.registro import encolar as encolar_tarea
+
+logger = logging.getLogger(__name__)
+
+# nombre -> (ancho, alto, recortar). Sin recorte, el alto es solo un máximo.
+RENDICIONES = {
+    'thumb': (400, 250, True),
+    'card': (800, 500, True),
+    'hero': (1600, 1000, False),
+}
+CALIDAD_WEBP = 80
+CALIDAD_JPEG = 82
+
+
+def _redimensionar(imagen, ancho, alto, recortar):
+    """Nunca agranda: si el original es más chico, se recorta a la proporción pedida sin escalar."""
+    if recortar:
+        escala = min(1.0, imagen.width / ancho, imagen.height / alto)
+        return ImageOps.fit(imagen, (max(1, round(ancho * escala)), max(1, round(alto * escala))), Image.LANCZOS)
+    copia = imagen.copy()
+    copia.thumbnail((ancho, alto), Image.LANCZOS)
+    return copia
+
+
+def _sin_transparencia(imagen):
+    # JPEG no admite canal alfa: se apoya sobre fondo blanco
+    if imagen.mode in ('RGBA', 'LA') or (imagen.mode == 'P' and 'transparency' in imagen.info):
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, 'white')
+        fondo.paste(imagen, mask=imagen.getchannel('A'))
+        return fondo
+    return imagen.convert('RGB')
+
+
+def _guardar(nombre, imagen, formato, **opciones):
+    buffer = io.BytesIO()
+    imagen.save(buffer, format=formato, **opciones)
+    return default_storage.save(nombre, ContentFile(buffer.getvalue()))
+
+
+def generar(nombre):
+    """Genera todas las rendiciones del archivo 'nombre'. Retorna el diccionario para imagen_rendiciones."""
+    try:
+        with default_storage.open(nombre, 'rb') as archivo:
+            imagen = Image.open(archivo)
+            imagen.load()
+    except (OSError, UnidentifiedImageError, ValueError) as e:
+        logger.warning("No se pudieron generar las rendiciones de %s: %s", nombre, e)
+        return {'origen': nombre}
+
+    imagen = _sin_transparencia(ImageOps.exif_transpose(imagen))
+    base = posixpath.splitext(nombre)[0]
+    rendiciones = {'origen': nombre}
+    for clave, (ancho, alto, recortar) in RENDICIONES.items():
+        copia = _redimensionar(imagen, ancho, alto, recortar)
+        rendiciones[clave] = {
+            'webp': _guardar(f'{base}__{clave}.webp', copia, 'WEBP', quality=CALIDAD_WEBP, method=6),
+            'jpeg': _guardar(f'{base}__{clave}.jpg', copia, 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True),
+            'ancho': copia.width,
+            'alto': copia.height,
+        }
+    return rendiciones
+
+
+def actualizar(instancia):
+    """
+    Llamada desde save() de Articulo y Serie, antes de escribir la fila. Si la imagen
+    destacada cambió, vacía 'imagen_rendiciones' (las plantillas usan el original
+    mientras tanto) y retorna True. Si además hay imagen, save() debe llamar a
+    encolar() cuando la fila ya esté guardada.
+    """
+    if 'imagen_destacada' in instancia.get_deferred_fields():
+        return False
+
+    archivo = instancia.imagen_destacada
+    if not archivo:
+        if instancia.imagen_rendiciones:
+            instancia.imagen_rendiciones = {}
+            return True
+        return False
+    if instancia.imagen_rendiciones.get('origen') == archivo.name:
+        return False
+    instancia.imagen_rendiciones = {}
+    return True
+
+
+def encolar(instancia):
+    """Genera las rendiciones en el trabajador de tareas (ver blog_circadiano/tareas.py)."""
+    encolar_tarea('blog_circadiano.tareas.generar_rendiciones', instancia._meta.model_name, instancia.pk)
+
+
+def guardar(modelo, pk):
+    """
+    Genera y guarda las rendiciones de la imagen destacada actual de la fila 'pk'.
+    Retorna False si no había nada que hacer (sin imagen o ya generadas).
+    """
+    fila = modelo.objects.filter(pk=pk).values('imagen_destacada', 'imagen_rendiciones').first()
+    if not fila or not fila['imagen_destacada'] or fila['imagen_rendiciones'].get('origen') == fila['imagen_destacada']:
+        return False
+    datos = generar(fila['imagen_destacada'])
+    # Solo si la imagen no cambió mientras se generaban
+    return bool(modelo.objects.filter(pk=pk, imagen_destacada=datos['origen']).update(imagen_rendiciones=datos))
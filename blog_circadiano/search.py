@@ -0,0 +1,206 @@
+# blog_circadiano/search.py
+
+"""
+Motor de búsqueda de artículos.
+
+Cada Articulo tiene un DocumentoBusqueda con su título, taxonomía (categoría,
+etiquetas, serie) y cuerpo en texto plano. El índice depende de la base de datos
+(ver migración 0013_indice_busqueda):
+
+- PostgreSQL: columna generada tsvector con pesos A/B/C, configuración
+  'es_unaccent' (stemming español + unaccent) e índice GIN.
+- SQLite (local/tests): tabla virtual FTS5 con remove_diacritics, mantenida por triggers.
+
+Las búsquedas filtran con el índice, se ordenan por relevancia y solo los
+artículos de la página visible piden el fragmento resaltado.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Articulo, DocumentoBusqueda
+
+TABLA = DocumentoBusqueda._meta.db_table
+TABLA_FTS = f'{TABLA}_fts'
+TABLA_ARTICULO = Articulo._meta.db_table
+CONFIG_PG = 'es_unaccent'
+
+MAX_TERMINOS = 8
+
+# Marcadores de resaltado: caracteres que no aparecen en el texto y sobreviven al escape HTML.
+_INICIO_MARCA = '⟦'
+_FIN_MARCA = '⟧'
+
+_TERMINO = re.compile(r'\w+', re.UNICODE)
+_SUFIJOS_PLURAL = ('es', 's')
+_VOCALES = 'aeiouáéíóú'
+
+
+# --- Mantenimiento de los documentos ---
+
+def construir_documento(articulo):
+    """Devuelve los campos de DocumentoBusqueda para un artículo."""
+    partes = []
+    if articulo.categoria_id:
+        partes.append(articulo.categoria.nombre)
+    partes.extend(etiqueta.nombre for etiqueta in articulo.etiquetas.all())
+    if articulo.serie_id:
+        partes.append(articulo.serie.titulo)
+
+    return {
+        'titulo': articulo.titulo,
+        'taxonomia': ' '.join(partes),
+        'cuerpo': articulo.texto_plano,
+    }
+
+
+def actualizar_documento(articulo):
+    """Crea o actualiza el documento de búsqueda de un artículo."""
+    DocumentoBusqueda.objects.update_or_create(
+        articulo=articulo, defaults=construir_documento(articulo)
+    )
+
+
+def reindexar(queryset=None, lote=200):
+    """
+    Reconstruye los documentos de búsqueda de los artículos indicados (todos por defecto).
+    Recorre los artículos por lotes para no cargar el archivo completo en memoria.
+    Retorna el número de artículos indexados.
+    """
+    if queryset is None:
+        queryset = Articulo.objects.all()
+    queryset = queryset.select_related('categoria', 'serie').prefetch_related('etiquetas').only(
+        'id', 'titulo', 'texto_plano', 'categoria__nombre', 'serie__titulo'
+    )
+
+    total = 0
+    for articulo in queryset.iterator(chunk_size=lote):
+        actualizar_documento(articulo)
+        total += 1
+    return total
+
+
+# --- Consultas ---
+
+def _terminos(query):
+    """Separa la consulta en palabras (sin signos ni operadores del motor)."""
+    return [t.lower() for t in _TERMINO.findall(query or '')][:MAX_TERMINOS]
+
+
+def _raiz(termino):
+    """
+    Stemming ligero para español, usado con la búsqueda por prefijo de SQLite:
+    'circadianos' -> 'circadian', 'ritmo' -> 'ritm' (que también encuentra 'rítmico').
+    """
+    for sufijo in _SUFIJOS_PLURAL:
+        if termino.endswith(sufijo) and len(termino) - len(sufijo) >= 4:
+            termino = termino[:-len(sufijo)]
+            break
+    if len(termino) > 4 and termino[-1] in _VOCALES:
+        termino = termino[:-1]
+    return termino
+
+
+def _consulta_motor(terminos):
+    """Traduce los términos a la sintaxis de consulta del motor activo."""
+    if connection.vendor == 'postgresql':
+        # to_tsquery aplica el stemming y unaccent de la configuración a cada término; ':*' = prefijo
+        return ' & '.join(f'{t}:*' for t in terminos)
+    return ' '.join(f'"{_raiz(t)}"*' for t in terminos)
+
+
+def buscar(queryset, query):
+    """
+    Filtra un queryset de Articulo con el índice de búsqueda y lo anota con
+    'relevancia' (mayor es mejor). Pensado para paginar_por_cursor(campo='relevancia').
+    """
+    terminos = _terminos(query)
+    if not terminos:
+        return queryset.none().annotate(relevancia=Value(0.0, output_field=FloatField()))
+
+    consulta = _consulta_motor(terminos)
+
+    if connection.vendor == 'postgresql':
+        coincide = f"SELECT articulo_id FROM {TABLA} WHERE vector @@ to_tsquery('{CONFIG_PG}', %s)"
+        relevancia = (
+            f"SELECT ts_rank_cd(d.vector, to_tsquery('{CONFIG_PG}', %s))::float8 "
+            f"FROM {TABLA} d WHERE d.articulo_id = {TABLA_ARTICULO}.id"
+        )
+    elif connection.vendor == 'sqlite':
+        coincide = f"SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s"
+        # bm25 devuelve valores negativos (menor es mejor); pesos: título, taxonomía, cuerpo
+        relevancia = (
+            f"SELECT -bm25({TABLA_FTS}, 10.0, 4.0, 1.0) FROM {TABLA_FTS} "
+            f"WHERE {TABLA_FTS} MATCH %s AND rowid = {TABLA_ARTICULO}.id"
+        )
+    else:
+        # Otros motores: sin índice de texto completo, búsqueda simple sobre el documento plano.
+        filtro = Q()
+        for termino in terminos:
+            filtro &= (
+                Q(documento_busqueda__titulo__icontains=termino)
+                | Q(documento_busqueda__taxonomia__icontains=termino)
+                | Q(documento_busqueda__cuerpo__icontains=termino)
+            )
+        return queryset.filter(filtro).annotate(relevancia=Value(1.0, output_field=FloatField()))
+
+    return queryset.filter(
+        id__in=RawSQL(coincide, [consulta])
+    ).annotate(
+        relevancia=RawSQL(relevancia, [consulta], output_field=FloatField())
+    )
+
+
+def _marcar(fragmento):
+    """Escapa el fragmento y convierte los marcadores del motor en <mark>."""
+    fragmento = escape(fragmento)
+    fragmento = fragmento.replace(_INICIO_MARCA, '<mark>').replace(_FIN_MARCA, '</mark>')
+    return mark_safe(fragmento)
+
+
+def resaltar(articulos, query):
+    """
+    Asigna a cada artículo (ya paginado) un atributo 'fragmento' con el trozo del
+    cuerpo donde aparecen los términos buscados, resaltados con <mark>.
+    Una sola consulta para toda la página.
+    """
+    terminos = _terminos(query)
+    ids = [articulo.pk for articulo in articulos]
+    if not terminos or not ids:
+        return articulos
+
+    consulta = _consulta_motor(terminos)
+    marcadores = ', '.join(['%s'] * len(ids))
+
+    if connection.vendor == 'postgresql':
+        opciones = (
+            f'StartSel={_INICIO_MARCA}, StopSel={_FIN_MARCA}, MaxWords=35, MinWords=15, '
+            'MaxFragments=2, FragmentDelimiter=" … "'
+        )
+        sql = (
+            f"SELECT articulo_id, ts_headline('{CONFIG_PG}', cuerpo, to_tsquery('{CONFIG_PG}', %s), %s) "
+            f"FROM {TABLA} WHERE articulo_id IN ({marcadores})"
+        )
+        parametros = [consulta, opciones, *ids]
+    elif connection.vendor == 'sqlite':
+        sql = (
+            f"SELECT rowid, snippet({TABLA_FTS}, 2, '{_INICIO_MARCA}', '{_FIN_MARCA}', '…', 30) "
+            f"FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s AND rowid IN ({marcadores})"
+        )
+        parametros = [consulta, *ids]
+    else:
+        return articulos
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        fragmentos = dict(cursor.fetchall())
+
+    for articulo in articulos:
+        fragmento = fragmentos.get(articulo.pk)
+        articulo.fragmento = _marcar(fragmento) if fragmento else ''
+    return articulos
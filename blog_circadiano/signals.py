@@ -0,0 +1,304 @@
+# blog_circadiano/signals.py
+
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Articulo, ArticuloRelacionado, Categoria, Comentario, Etiqueta, Serie, VectorArticulo
+from . import contadores, relacionados, search, taxonomia
+from .cache_paginas import invalidar_articulo, invalidar_colecciones, invalidar_listados
+from .condicional import marcar_articulos_modificados
+from .tareas import actualizar_relacionados, recalcular_relacionados
+
+
+# --- Documento de búsqueda ---
+
+@receiver(post_save, sender=Articulo)
+def actualizar_busqueda_articulo(sender, instance, raw=False, **kwargs):
+    """Mantiene al día el documento de búsqueda cada vez que se guarda un artículo."""
+    if raw:  # loaddata: los documentos se reconstruyen con 'manage.py reindexar_busqueda'
+        return
+    search.actualizar_documento(instance)
+
+
+@receiver(m2m_changed, sender=Articulo.etiquetas.through)
+def actualizar_busqueda_etiquetas(sender, instance, action, reverse, pk_set, **kwargs):
+    """Las etiquetas forman parte del documento: se reindexa al añadirlas o quitarlas."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.actualizar_documento(instance)
+        return
+
+    # Se modificaron los artículos desde la etiqueta (etiqueta.articulos.add(...)).
+    # En un clear() hay que recordar los artículos antes de que desaparezca la relación.
+    if action == 'pre_clear':
+        instance._articulos_a_reindexar = list(instance.articulos.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        search.reindexar(Articulo.objects.filter(pk__in=pk_set))
+    elif action == 'post_clear':
+        search.reindexar(Articulo.objects.filter(pk__in=getattr(instance, '_articulos_a_reindexar', [])))
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_save, sender=Etiqueta)
+@receiver(post_save, sender=Serie)
+def actualizar_busqueda_taxonomia(sender, instance, created, raw=False, **kwargs):
+    """Si cambia el nombre de una categoría, etiqueta o serie, se reindexan sus artículos."""
+    if raw or created:
+        return
+    search.reindexar(instance.articulos.all())
+
+
+@receiver(pre_delete, sender=Categoria)
+@receiver(pre_delete, sender=Etiqueta)
+@receiver(pre_delete, sender=Serie)
+def recordar_articulos_taxonomia(sender, instance, **kwargs):
+    # Después del borrado ya no se puede saber qué artículos tenían esta categoría/etiqueta/serie
+    instance._articulos_a_reindexar = list(instance.articulos.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Categoria)
+@receiver(post_delete, sender=Etiqueta)
+@receiver(post_delete, sender=Serie)
+def actualizar_busqueda_taxonomia_borrada(sender, instance, **kwargs):
+    search.reindexar(Articulo.objects.filter(pk__in=getattr(instance, '_articulos_a_reindexar', [])))
+
+
+# --- Registro de taxonomía ---
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_save, sender=Etiqueta)
+@receiver(post_save, sender=Serie)
+@receiver(post_delete, sender=Categoria)
+@receiver(post_delete, sender=Etiqueta)
+@receiver(post_delete, sender=Serie)
+@receiver(post_delete, sender=Articulo)
+def invalidar_taxonomia(sender, **kwargs):
+    """Cualquier cambio en la taxonomía o en los conteos de artículos publica una nueva versión."""
+    taxonomia.invalidar()
+
+
+@receiver(post_save, sender=Articulo)
+def invalidar_taxonomia_articulo(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Un artículo guardado solo cambia el registro si es nuevo o si cambió de categoría, de
+    serie o de fecha (Articulo.CAMPOS_TAXONOMIA): editar el texto no obliga a los workers
+    a reconstruirlo. Las etiquetas se siguen por su m2m (abajo).
+    """
+    guardados = getattr(instance, '_taxonomia_guardada', None)
+    if created or raw or guardados is None:
+        taxonomia.invalidar()
+        return
+    # Con update_fields (también el que Django calcula al guardar un artículo con campos
+    # diferidos) solo cuentan los campos escritos; admite 'serie' o 'serie_id'
+    campos = [
+        campo for campo in Articulo.CAMPOS_TAXONOMIA
+        if update_fields is None or {campo, campo.removesuffix('_id')} & set(update_fields)
+    ]
+    if any(campo not in guardados or getattr(instance, campo) != guardados[campo] for campo in campos):
+        taxonomia.invalidar()
+
+
+@receiver(m2m_changed, sender=Articulo.etiquetas.through)
+def invalidar_taxonomia_etiquetas(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        taxonomia.invalidar()
+
+
+# --- Caché de páginas anónimas y Articulo.actualizado ---
+# Los cambios de taxonomía ya cambian la versión del registro (arriba); aquí se invalidan
+# las listas de artículos y la página de detalle del artículo afectado y, cuando el cambio
+# no pasa por Articulo.save(), se actualiza su fecha de modificación (validadores ETag/Last-Modified).
+
+@receiver(post_save, sender=Articulo)
+@receiver(post_delete, sender=Articulo)
+def invalidar_pagina_articulo(sender, instance, **kwargs):
+    invalidar_listados()  # las listas muestran título, extracto e imagen de cada artículo
+    invalidar_colecciones()  # feeds, sitemaps y API
+    invalidar_articulo(instance.pk)  # 'actualizado' ya lo fija auto_now
+
+
+def _marcar_partes(series, excepto):
+    series = {pk for pk in series if pk is not None}
+    if series:
+        marcar_articulos_modificados(list(
+            Articulo.objects.filter(serie_id__in=series).exclude(pk=excepto).values_list('pk', flat=True)
+        ))
+
+
+@receiver(post_save, sender=Articulo)
+def invalidar_partes_de_la_serie(sender, instance, raw=False, **kwargs):
+    # Cada parte muestra su número, el total y las partes vecinas: si un artículo entra,
+    # sale o se mueve dentro de una serie, cambian las páginas de las demás partes
+    if raw or {'serie_id', 'posicion_serie'} & instance.get_deferred_fields():
+        return
+    anterior = getattr(instance, '_serie_guardada', (None, None))
+    actual = (instance.serie_id, instance.posicion_serie)
+    if actual != anterior:
+        _marcar_partes({anterior[0], actual[0]}, instance.pk)
+
+
+@receiver(post_delete, sender=Articulo)
+def invalidar_partes_por_borrado(sender, instance, **kwargs):
+    if 'serie_id' not in instance.get_deferred_fields():
+        _marcar_partes({instance.serie_id}, instance.pk)
+
+
+@receiver(post_save, sender=Comentario)
+@receiver(post_delete, sender=Comentario)
+def invalidar_pagina_por_comentario(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    marcar_articulos_modificados([instance.articulo_id])
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_save, sender=Etiqueta)
+@receiver(post_save, sender=Serie)
+def invalidar_paginas_por_taxonomia(sender, instance, created, raw=False, **kwargs):
+    # El nombre de la categoría/etiqueta/serie aparece en la página de cada uno de sus artículos
+    if raw or created:
+        return
+    marcar_articulos_modificados(list(instance.articulos.values_list('pk', flat=True)))
+
+
+@receiver(m2m_changed, sender=Articulo.likes.through)
+def invalidar_pagina_por_like_articulo(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        marcar_articulos_modificados([instance.pk])
+    else:
+        # user.articulos_liked.add(...): pk_set son artículos
+        marcar_articulos_modificados(list(pk_set or []))
+
+
+@receiver(m2m_changed, sender=Comentario.likes.through)
+def invalidar_pagina_por_like_comentario(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        marcar_articulos_modificados([instance.articulo_id])
+    elif pk_set:
+        # user.comentarios_liked.add(...): pk_set son comentarios
+        articulos = Comentario.objects.filter(pk__in=pk_set).values_list('articulo_id', flat=True).distinct()
+        marcar_articulos_modificados(list(articulos))
+
+
+# --- Contadores desnormalizados (ver contadores.py) ---
+
+def _contar_likes(sender, instance, action, reverse, pk_set, modelo, campo_origen, **kwargs):
+    """
+    Mantiene num_likes de Articulo o Comentario para cualquier operación sobre el M2M de likes,
+    desde el objeto (articulo.likes.add(user)) o desde el usuario (user.articulos_liked.add(articulo)).
+    En remove/clear se cuentan antes las filas que realmente existen, para no descontar de más.
+    """
+    relacion = sender.objects.all()
+    if not reverse:
+        filas = relacion.filter(**{campo_origen: instance.pk})
+        if action == 'post_add':
+            contadores.sumar(modelo, [instance.pk], 'num_likes', len(pk_set))
+        elif action in ('pre_remove', 'pre_clear'):
+            if action == 'pre_remove':
+                filas = filas.filter(user_id__in=pk_set)
+            instance._likes_a_descontar = filas.count()
+        elif action in ('post_remove', 'post_clear'):
+            contadores.sumar(modelo, [instance.pk], 'num_likes', -getattr(instance, '_likes_a_descontar', 0))
+    else:
+        filas = relacion.filter(user_id=instance.pk)
+        if action == 'post_add':
+            contadores.sumar(modelo, list(pk_set), 'num_likes', 1)
+        elif action in ('pre_remove', 'pre_clear'):
+            if action == 'pre_remove':
+                filas = filas.filter(**{f'{campo_origen}__in': pk_set})
+            instance._likes_a_descontar = list(filas.values_list(campo_origen, flat=True))
+        elif action in ('post_remove', 'post_clear'):
+            contadores.sumar(modelo, getattr(instance, '_likes_a_descontar', []), 'num_likes', -1)
+
+
+@receiver(m2m_changed, sender=Articulo.likes.through)
+def contar_likes_articulo(sender, **kwargs):
+    _contar_likes(sender, modelo=Articulo, campo_origen='articulo_id', **kwargs)
+
+
+@receiver(m2m_changed, sender=Comentario.likes.through)
+def contar_likes_comentario(sender, **kwargs):
+    _contar_likes(sender, modelo=Comentario, campo_origen='comentario_id', **kwargs)
+
+
+@receiver(post_save, sender=Comentario)
+def contar_comentarios_guardado(sender, instance, created, raw=False, **kwargs):
+    """num_comentarios cuenta solo comentarios activos: se ajusta al crear o al cambiar 'activo'."""
+    if raw:
+        return
+    if created:
+        cambio = 1 if instance.activo else 0
+    else:
+        anterior = getattr(instance, '_activo_guardado', instance.activo)
+        cambio = int(instance.activo) - int(anterior)
+    instance._activo_guardado = instance.activo
+    contadores.sumar(Articulo, [instance.articulo_id], 'num_comentarios', cambio)
+
+
+@receiver(post_delete, sender=Comentario)
+def contar_comentarios_borrado(sender, instance, **kwargs):
+    if instance.activo:
+        contadores.sumar(Articulo, [instance.articulo_id], 'num_comentarios', -1)
+
+
+# --- Artículos relacionados (ver relacionados.py) ---
+# El cálculo corre en el trabajador de tareas, nunca dentro de la petición.
+
+def _cambian_relacionados(instance, update_fields):
+    """
+    Los relacionados de un artículo guardado solo cambian si cambió su texto (título y
+    texto plano), su categoría o su serie; las etiquetas se siguen por su m2m (abajo).
+    """
+    guardados = getattr(instance, '_taxonomia_guardada', None)
+    if guardados is None:
+        return True
+
+    def escrito(campo):
+        # Con update_fields solo cuentan los campos escritos; admite 'serie' o 'serie_id'
+        return update_fields is None or bool({campo, campo.removesuffix('_id')} & set(update_fields))
+
+    for campo in ('categoria_id', 'serie_id'):
+        if escrito(campo) and (campo not in guardados or getattr(instance, campo) != guardados[campo]):
+            return True
+    if not (escrito('titulo') or escrito('texto_plano')):
+        return False
+    if {'titulo', 'texto_plano'} & instance.get_deferred_fields():
+        return True
+    guardado = VectorArticulo.objects.filter(articulo_id=instance.pk).values_list('hash_texto', flat=True).first()
+    return guardado != relacionados.huella_texto(instance.titulo, instance.texto_plano)
+
+
+@receiver(post_save, sender=Articulo)
+def encolar_relacionados_articulo(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:  # loaddata: los relacionados se reconstruyen con 'manage.py calcular_relacionados'
+        return
+    if created or _cambian_relacionados(instance, update_fields):
+        actualizar_relacionados.encolar(instance.pk)
+
+
+@receiver(m2m_changed, sender=Articulo.etiquetas.through)
+def encolar_relacionados_etiquetas(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # Desde la etiqueta (etiqueta.articulos.clear()) no se conocen los artículos: lo corrige la reconstrucción diaria
+    for pk in ([instance.pk] if not reverse else (pk_set or [])):
+        actualizar_relacionados.encolar(pk)
+
+
+@receiver(pre_delete, sender=Articulo)
+def recordar_listas_con_articulo(sender, instance, **kwargs):
+    # Tras el borrado (CASCADE) ya no se sabe qué listas lo mostraban
+    instance._listado_en = list(
+        ArticuloRelacionado.objects.filter(relacionado=instance).values_list('articulo_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Articulo)
+def encolar_relacionados_borrado(sender, instance, **kwargs):
+    listas = [pk for pk in getattr(instance, '_listado_en', []) if pk != instance.pk]
+    if listas:
+        recalcular_relacionados.encolar(listas)
@@ -0,0 +1,122 @@
+# blog_circadiano/sitemaps.py
+
+"""
+Sitemaps para buscadores: /sitemap.xml es un índice que apunta a un sitemap por sección
+(páginas fijas, artículos, series, categorías y etiquetas).
+
+Los documentos se generan en streaming a medida que se leen las filas (iterator(), solo
+las columnas necesarias), así que el tamaño del sitio no se traduce en memoria. Los
+artículos se reparten en sitemaps de URLS_POR_SITEMAP entradas (?p=2, ...).
+
+Como los feeds, llevan ETag y Last-Modified y se guardan en caché hasta que cambia
+algún artículo o la taxonomía (ver condicional.validadores_coleccion).
+"""
+
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+from django.views.decorators.http import condition
+
+from .cache_paginas import cache_por_etag
+from .condicional import validadores_coleccion
+from .models import Articulo, Categoria, Etiqueta, Serie
+
+# Muy por debajo del límite del protocolo (50.000): cada documento cabe cómodo en la caché
+URLS_POR_SITEMAP = 10000
+FILAS_POR_LECTURA = 2000
+
+_CABECERA_URLS = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_CABECERA_INDICE = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+
+def _entrada(etiqueta, loc, lastmod):
+    fecha = f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+    return f'<{etiqueta}><loc>{escape(loc)}</loc>{fecha}</{etiqueta}>\n'
+
+
+# --- Secciones: cada una produce (ruta, última modificación) ---
+
+def _paginas(pagina, ultima):
+    yield reverse('home'), ultima
+    yield reverse('blog_circadiano:lista_articulos'), ultima
+    yield reverse('blog_circadiano:lista_series'), ultima
+    yield reverse('blog_circadiano:nosotros'), None
+
+
+def _articulos(pagina, ultima):
+    inicio = (pagina - 1) * URLS_POR_SITEMAP
+    filas = Articulo.objects.order_by('pk').values_list('pk', 'actualizado')[inicio:inicio + URLS_POR_SITEMAP]
+    for pk, actualizado in filas.iterator(chunk_size=FILAS_POR_LECTURA):
+        yield reverse('blog_circadiano:detalle_articulo', kwargs={'pk': pk}), actualizado
+
+
+def _taxonomia(modelo, nombre_url, kwarg):
+    def seccion(pagina, ultima):
+        # Una lista cambia cuando cambia alguno de sus artículos
+        filas = modelo.objects.annotate(ultima=Max('articulos__actualizado')).order_by('pk').values_list('slug', 'ultima')
+        for slug, actualizado in filas.iterator(chunk_size=FILAS_POR_LECTURA):
+            yield reverse(nombre_url, kwargs={kwarg: slug}), actualizado
+    return seccion
+
+
+SECCIONES = {
+    'paginas': _paginas,
+    'articulos': _articulos,
+    'series': _taxonomia(Serie, 'blog_circadiano:detalle_serie', 'serie_slug'),
+    'categorias': _taxonomia(Categoria, 'blog_circadiano:articulos_por_categoria', 'categoria_slug'),
+    'etiquetas': _taxonomia(Etiqueta, 'blog_circadiano:articulos_por_etiqueta', 'etiqueta_slug'),
+}
+
+
+# --- Vistas ---
+
+# Todos los sitemaps dependen del conjunto completo de artículos (y de la taxonomía)
+etag_sitemap, ultima_modificacion_sitemap = validadores_coleccion()
+
+
+def _xml(partes):
+    return StreamingHttpResponse((parte.encode() for parte in partes), content_type='application/xml; charset=utf-8')
+
+
+@condition(etag_func=etag_sitemap, last_modified_func=ultima_modificacion_sitemap)
+@cache_por_etag(etag_sitemap)
+def indice(request):
+    ultima = ultima_modificacion_sitemap(request)
+    total = Articulo.objects.count()
+    paginas_articulos = max(1, -(-total // URLS_POR_SITEMAP))
+
+    def partes():
+        yield _CABECERA_INDICE
+        for seccion in SECCIONES:
+            ruta = reverse('sitemap_seccion', kwargs={'seccion': seccion})
+            if seccion == 'articulos':
+                for pagina in range(1, paginas_articulos + 1):
+                    yield _entrada('sitemap', request.build_absolute_uri(ruta if pagina == 1 else f'{ruta}?p={pagina}'), ultima)
+            else:
+                yield _entrada('sitemap', request.build_absolute_uri(ruta), ultima)
+        yield '</sitemapindex>\n'
+
+    return _xml(partes())
+
+
+@condition(etag_func=etag_sitemap, last_modified_func=ultima_modificacion_sitemap)
+@cache_por_etag(etag_sitemap)
+def seccion(request, seccion):
+    if seccion not in SECCIONES:
+        raise Http404("Sitemap no encontrado.")
+    try:
+        pagina = int(request.GET.get('p', 1))
+    except ValueError:
+        raise Http404("Página de sitemap inválida.")
+    if pagina < 1 or (pagina > 1 and seccion != 'articulos'):
+        raise Http404("Página de sitemap inválida.")
+    ultima = ultima_modificacion_sitemap(request, seccion=seccion)
+
+    def partes():
+        yield _CABECERA_URLS
+        for ruta, lastmod in SECCIONES[seccion](pagina, ultima):
+            yield _entrada('url', request.build_absolute_uri(ruta), lastmod)
+        yield '</urlset>\n'
+
+    return _xml(partes())
@@ -0,0 +1,16 @@
+// blog_circadiano/static/blog_circadiano/js/filtro_autocompletar.js
+
+// Filtros laterales con autocompletado del admin (ver listados_admin.FiltroAutocompletar):
+// al elegir una opción se navega al listado filtrado por ella.
+'use strict';
+{
+    const $ = django.jQuery;
+
+    $(function() {
+        $('.filtro-autocompletar').on('change', function() {
+            if (this.value) {
+                window.location.search = this.dataset.plantillaUrl.replace('__valor__', encodeURIComponent(this.value));
+            }
+        });
+    });
+}
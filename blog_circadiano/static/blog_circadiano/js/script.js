@@ -2,26 +2,28 @@
 
 document.addEventListener('DOMContentLoaded', function() {
     // --- Lógica para el manejo de formularios de respuesta de comentarios ---
-    document.querySelectorAll('.reply-link').forEach(link => {
-        link.addEventListener('click', function(e) {
-            e.preventDefault();
-            const commentId = this.dataset.commentId;
-            const replyForm = document.getElementById(`reply-form-${commentId}`);
-            
-            document.querySelectorAll('.reply-form').forEach(form => {
-                if (form.id !== `reply-form-${commentId}`) {
-                    form.style.display = 'none';
-                }
-            });
+    // Delegada en el documento: los comentarios llegan después, desde comentarios_articulo.
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('.reply-link');
+        if (!link) return;
+        e.preventDefault();
+        const commentId = link.dataset.commentId;
+        const replyForm = document.getElementById(`reply-form-${commentId}`);
+        if (!replyForm) return;
 
-            if (replyForm.style.display === 'none' || replyForm.style.display === '') {
-                replyForm.style.display = 'block';
-                // Opcional: Desplazarse al formulario
-                replyForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
-            } else {
-                replyForm.style.display = 'none';
+        document.querySelectorAll('.reply-form').forEach(form => {
+            if (form.id !== `reply-form-${commentId}`) {
+                form.style.display = 'none';
             }
         });
+
+        if (replyForm.style.display === 'none' || replyForm.style.display === '') {
+            replyForm.style.display = 'block';
+            // Opcional: Desplazarse al formulario
+            replyForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        } else {
+            replyForm.style.display = 'none';
+        }
     });
 
     // --- Lógica para el Modo Noche (Dark Mode) ---
@@ -73,63 +75,69 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // --- Lógica para el botón "Me gusta" (toggle_like) ---
-    document.querySelectorAll('.like-button').forEach(button => {
-        button.addEventListener('click', async function(e) {
+    // Delegada en el documento para que funcione también en los comentarios cargados después.
+    document.addEventListener('click', function(e) {
+        const button = e.target.closest('.like-button');
+        if (button) {
             e.preventDefault();
-            const itemType = this.dataset.itemType;
-            const itemId = this.dataset.itemId;
-            const url = this.dataset.url; // Leemos la URL desde el HTML
-            const csrftoken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+            toggleLike.call(button);
+        }
+    });
 
-            try {
-                // Usamos la variable 'url' que leímos del atributo data-url
-                const response = await fetch(url, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/x-www-form-urlencoded',
-                        'X-CSRFToken': csrftoken,
-                    },
-                    body: `item_type=${itemType}&item_id=${itemId}`
-                });
+    async function toggleLike() {
+        const itemType = this.dataset.itemType;
+        const itemId = this.dataset.itemId;
+        const url = this.dataset.url; // Leemos la URL desde el HTML
+        const csrftoken = document.querySelector('[name=csrfmiddlewaretoken]').value;
 
-                // Si la respuesta no es "ok" (ej: 401, 404, 500)
-                if (!response.ok) {
-                    // Si es un error 401 (No Autorizado), mostramos el mensaje para iniciar sesión.
-                    if (response.status === 401) {
-                        if (confirm("Debes iniciar sesión para dar me gusta. ¿Quieres ir a la página de login?")) {
-                            // Redirigimos al usuario, añadiendo "?next=" para que vuelva al artículo.
-                            window.location.href = '/accounts/login/?next=' + window.location.pathname;
-                        }
-                    } else {
-                        // Para otros errores, mostramos un mensaje genérico.
-                        alert('Ocurrió un error. Por favor, inténtalo de nuevo.');
+        try {
+            // Usamos la variable 'url' que leímos del atributo data-url
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                    'X-CSRFToken': csrftoken,
+                },
+                body: `item_type=${itemType}&item_id=${itemId}`
+            });
+
+            // Si la respuesta no es "ok" (ej: 401, 404, 500)
+            if (!response.ok) {
+                // Si es un error 401 (No Autorizado), mostramos el mensaje para iniciar sesión.
+                if (response.status === 401) {
+                    if (confirm("Debes iniciar sesión para dar me gusta. ¿Quieres ir a la página de login?")) {
+                        // Redirigimos al usuario, añadiendo "?next=" para que vuelva al artículo.
+                        window.location.href = '/accounts/login/?next=' + window.location.pathname;
                     }
-                    return; // Detenemos la función aquí.
+                } else {
+                    // Para otros errores, mostramos un mensaje genérico.
+                    alert('Ocurrió un error. Por favor, inténtalo de nuevo.');
                 }
+                return; // Detenemos la función aquí.
+            }
 
-                const data = await response.json();
+            const data = await response.json();
 
-                // Lógica para actualizar el botón y el contador (sin cambios)
-                if (data.status === 'success') {
-                    const idPrefix = itemType === 'articulo' ? 'article' : 'comment';
-                    const likesCountSpan = document.getElementById(`${idPrefix}-likes-count-${itemId}`);
-                    if (likesCountSpan) {
-                        likesCountSpan.textContent = data.total_likes;
-                    }
-                    if (data.liked) {
-                        this.classList.add('liked');
-                        this.innerHTML = '<span class="icon">&#x2764;</span> Ya no me gusta';
-                    } else {
-                        this.classList.remove('liked');
-                        this.innerHTML = '<span class="icon">&#x2764;</span> Me gusta';
-                    }
+            // Lógica para actualizar el botón y el contador (sin cambios)
+            if (data.status === 'success') {
+                const idPrefix = itemType === 'articulo' ? 'article' : 'comment';
+                const likesCountSpan = document.getElementById(`${idPrefix}-likes-count-${itemId}`);
+                if (likesCountSpan) {
+                    likesCountSpan.textContent = data.total_likes;
+                }
+                if (data.liked) {
+                    this.classList.add('liked');
+                    this.innerHTML = '<span class="icon">&#x2764;</span> Ya no me gusta';
+                } else {
+                    this.classList.remove('liked');
+                    this.innerHTML = '<span class="icon">&#x2764;</span> Me gusta';
                 }
-            } catch (error) {
-                console.error('Error de red:', error);
-                alert('Hubo un error de conexión. Por favor, inténtalo de nuevo.');
             }
-        });
-    });
+        } catch (error) {
+            console.error('Error de red:', error);
+            alert('Hubo un error de conexión. Por favor, inténtalo de nuevo.');
+        }
+    }
 
     // --- Lógica para el botón "Archivar/Desarchivar Conversación" ---
     document.querySelectorAll('.archive-toggle-button').forEach(button => {
@@ -200,6 +208,59 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // --- Lógica para el scroll infinito de la lista de artículos ---
+    // El enlace "Cargar más" trae la URL del fragmento (?parcial=1) de la página siguiente.
+    // Sin JavaScript sigue funcionando como un enlace normal.
+    const articlesListContainer = document.querySelector('.articles-list-container');
+
+    async function loadNextArticlesPage(link) {
+        if (link.dataset.loading === 'true') return;
+        link.dataset.loading = 'true';
+        try {
+            const response = await fetch(link.dataset.parcialUrl, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            if (!response.ok) {
+                link.dataset.loading = 'false';
+                return;
+            }
+            const html = await response.text();
+            // Reemplazamos el contenedor del enlace por los artículos nuevos (y su propio "Cargar más")
+            link.closest('.load-more-container').outerHTML = html;
+            observeLoadMoreLink();
+        } catch (error) {
+            console.error('Error al cargar más artículos:', error);
+            link.dataset.loading = 'false';
+        }
+    }
+
+    const loadMoreObserver = ('IntersectionObserver' in window) ? new IntersectionObserver(entries => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadMoreObserver.unobserve(entry.target);
+                loadNextArticlesPage(entry.target);
+            }
+        });
+    }, { rootMargin: '400px' }) : null;
+
+    function observeLoadMoreLink() {
+        const link = articlesListContainer ? articlesListContainer.querySelector('.load-more-link') : null;
+        if (link && loadMoreObserver) {
+            loadMoreObserver.observe(link);
+        }
+    }
+
+    if (articlesListContainer) {
+        articlesListContainer.addEventListener('click', function(e) {
+            const link = e.target.closest('.load-more-link');
+            if (link) {
+                e.preventDefault();
+                loadNextArticlesPage(link);
+            }
+        });
+        observeLoadMoreLink();
+    }
+
     // --- Lógica para mostrar/ocultar comentarios y desplazar ---
     // Asegúrate de que el ID del artículo esté en el h1.articulo-titulo con data-pk
     const articlePkElement = document.querySelector('.articulo-titulo');
@@ -210,11 +271,77 @@ document.addEventListener('DOMContentLoaded', function() {
     const replyToArticleButton = document.getElementById(`reply-to-article-btn-${articlePk}`);
     const articleCommentForm = document.getElementById('article-comment-form');
 
+    // --- Carga perezosa de los comentarios ---
+    // La página llega sin comentarios: la primera vez que se abre la sección pedimos la primera
+    // página a comentarios_articulo; las respuestas y las páginas siguientes, al hacer clic.
+    const commentList = commentsContainer ? commentsContainer.querySelector('.comment-list') : null;
+    let commentsRequested = false;
+
+    async function fetchCommentsFragment(url) {
+        const response = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.text();
+    }
+
+    async function loadComments() {
+        if (!commentList || commentsRequested) return;
+        commentsRequested = true;
+        // Al volver de publicar (#comentario-<id>) ese hilo llega primero y desplegado
+        const target = window.location.hash.match(/^#comentario-(\d+)$/);
+        const url = commentList.dataset.url + (target ? `?destacado=${target[1]}` : '');
+        try {
+            commentList.innerHTML = await fetchCommentsFragment(url);
+            if (target) {
+                const comment = document.getElementById(`comentario-${target[1]}`);
+                if (comment) comment.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            }
+        } catch (error) {
+            console.error('Error al cargar los comentarios:', error);
+            commentsRequested = false;
+        }
+    }
+
+    if (commentList) {
+        commentList.addEventListener('click', async function(e) {
+            const repliesLink = e.target.closest('.load-replies-link');
+            const moreLink = e.target.closest('.load-more-comments-link');
+            const link = repliesLink || moreLink;
+            if (!link) return;
+            e.preventDefault();
+            if (link.dataset.loading === 'true') return;
+            link.dataset.loading = 'true';
+            try {
+                const html = await fetchCommentsFragment(link.dataset.url);
+                if (repliesLink) {
+                    link.closest('.replies').innerHTML = html;
+                } else {
+                    link.closest('.load-more-comments').outerHTML = html;
+                }
+            } catch (error) {
+                console.error('Error al cargar comentarios:', error);
+                link.dataset.loading = 'false';
+            }
+        });
+    }
+
+    function showComments() {
+        commentsContainer.style.display = 'block';
+        if (commentsToggleButton) {
+            commentsToggleButton.textContent = 'Ocultar comentarios'; // Cambiar texto al mostrar
+        }
+        loadComments();
+    }
+
+    if (commentsContainer && /^#comentario-\d+$/.test(window.location.hash)) {
+        showComments();
+    }
+
     if (commentsToggleButton && commentsContainer) {
         commentsToggleButton.addEventListener('click', () => {
             if (commentsContainer.style.display === 'none' || commentsContainer.style.display === '') {
-                commentsContainer.style.display = 'block';
-                commentsToggleButton.textContent = 'Ocultar comentarios'; // Cambiar texto al mostrar
+                showComments();
             } else {
                 commentsContainer.style.display = 'none';
                 // CAMBIO CLAVE AQUÍ: Restablecer el texto original del botón.
@@ -231,13 +358,71 @@ document.addEventListener('DOMContentLoaded', function() {
     if (replyToArticleButton && articleCommentForm) {
         replyToArticleButton.addEventListener('click', () => {
             if (commentsContainer) {
-                commentsContainer.style.display = 'block';
                 // Asegúrate de que el botón de comentarios también refleje que están visibles
-                if (commentsToggleButton) {
-                     commentsToggleButton.textContent = 'Ocultar comentarios';
-                }
+                showComments();
             }
             articleCommentForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
         });
     }
+
+    // --- Historial de una conversación por partes ---
+    // La conversación llega con sus últimos mensajes: "Cargar mensajes anteriores" trae la
+    // página previa (ver mensajeria.views.conversation_messages) y cada cierto tiempo se piden
+    // solo los mensajes posteriores al último que se muestra.
+    const messageList = document.querySelector('.message-list-container[data-url]');
+    const MESSAGE_POLL_MS = 15000;
+
+    async function fetchMessagesFragment(url) {
+        const response = await fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.text();
+    }
+
+    // Añade el fragmento sin repetir los mensajes que ya están en la lista
+    function appendNewMessages(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html;
+        template.content.querySelectorAll('.message-item[data-id]').forEach(item => {
+            if (messageList.querySelector(`.message-item[data-id="${item.dataset.id}"]`)) item.remove();
+        });
+        if (!template.content.querySelector('.message-item')) return;
+        const placeholder = messageList.querySelector('.no-conversations');
+        if (placeholder) placeholder.remove();
+        messageList.appendChild(template.content);
+    }
+
+    async function fetchNewMessages() {
+        try {
+            if (document.visibilityState === 'visible') {
+                const items = messageList.querySelectorAll('.message-item[data-id]');
+                const lastId = items.length ? items[items.length - 1].dataset.id : 0;
+                appendNewMessages(await fetchMessagesFragment(`${messageList.dataset.url}?despues=${lastId}`));
+            }
+        } catch (error) {
+            console.error('Error al buscar mensajes nuevos:', error);
+        } finally {
+            // La siguiente consulta se programa cuando termina esta: nunca hay dos en curso
+            setTimeout(fetchNewMessages, MESSAGE_POLL_MS);
+        }
+    }
+
+    if (messageList) {
+        messageList.addEventListener('click', async function(e) {
+            const link = e.target.closest('.load-older-messages-link');
+            if (!link) return;
+            e.preventDefault();
+            if (link.dataset.loading === 'true') return;
+            link.dataset.loading = 'true';
+            try {
+                // Los mensajes anteriores (con su propio enlace) reemplazan al enlace
+                link.closest('.load-older-messages').outerHTML = await fetchMessagesFragment(link.dataset.url);
+            } catch (error) {
+                console.error('Error al cargar mensajes anteriores:', error);
+                link.dataset.loading = 'false';
+            }
+        });
+        setTimeout(fetchNewMessages, MESSAGE_POLL_MS);
+    }
 });
\ No newline at end of file
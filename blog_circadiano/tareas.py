@@ -0,0 +1,47 @@
+# blog_circadiano/tareas.py
+
+"""Tareas en segundo plano del blog (las ejecuta 'manage.py procesar_tareas')."""
+
+from tareas.registro import tarea
+
+from . import contadores, relacionados, rendiciones, taxonomia
+from .condicional import marcar_articulos_modificados
+from .models import Articulo, Serie
+
+MODELOS_CON_IMAGEN = {'articulo': Articulo, 'serie': Serie}
+
+
+@tarea(max_intentos=3)
+def generar_rendiciones(modelo, pk):
+    """Encolada por save() de Articulo y Serie cuando cambia la imagen destacada."""
+    if not rendiciones.guardar(MODELOS_CON_IMAGEN[modelo], pk):
+        return
+    # update() no dispara signals: se invalidan a mano las páginas que muestran la imagen
+    if modelo == 'articulo':
+        marcar_articulos_modificados([pk])
+    taxonomia.invalidar()
+
+
+@tarea(cada=60 * 60 * 24)
+def reconciliar_contadores():
+    """Corrige a diario cualquier deriva de los contadores de likes y comentarios."""
+    contadores.recalcular_articulos()
+    contadores.recalcular_comentarios()
+
+
+@tarea(max_intentos=3)
+def actualizar_relacionados(pk):
+    """Encolada desde signals.py al guardar un artículo o cambiar sus etiquetas."""
+    relacionados.actualizar(pk)
+
+
+@tarea(max_intentos=3)
+def recalcular_relacionados(pks):
+    """Encolada al borrar un artículo, para las listas que lo mostraban."""
+    relacionados.recalcular(pks)
+
+
+@tarea(cada=60 * 60 * 24)
+def reconstruir_relacionados():
+    """Reconstrucción completa diaria: corrige la deriva del IDF de las actualizaciones sueltas."""
+    relacionados.reconstruir()
@@ -0,0 +1,146 @@
+# blog_circadiano/taxonomia.py
+
+"""
+Registro en memoria de categorías, etiquetas y series.
+
+Cada proceso (worker de gunicorn) guarda una copia de toda la taxonomía con el
+número de artículos de cada elemento, indexada por slug y por id. La copia lleva
+una versión; la versión vigente vive en la caché compartida y signals.py la cambia
+cuando se guarda o borra una categoría, etiqueta o serie, y cuando un artículo se
+crea, se borra o cambia de categoría, serie, fecha o etiquetas (editar su texto no
+la cambia). Así cada worker vuelve a leer la base de datos solo cuando la taxonomía
+cambió. La versión nueva se publica al confirmar la transacción: antes, otro worker la
+usaría para guardar un registro leído sin esos cambios.
+"""
+
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import Http404
+
+from .models import Categoria, Etiqueta, Serie
+
+CLAVE_VERSION = 'taxonomia:version'
+
+# Cada cuántos segundos se consulta la versión en la caché compartida
+# (evita una consulta a la caché por cada uso dentro de la misma petición).
+SEGUNDOS_ENTRE_VERIFICACIONES = 1.0
+
+_lock = threading.Lock()
+_registro = None
+_ultima_verificacion = 0.0
+
+
+class Registro:
+    """
+    Foto inmutable de la taxonomía. Los objetos traen el atributo 'num_articulos';
+    las series, además, 'ultima_publicacion' (fecha de su parte más reciente).
+    """
+
+    def __init__(self, version, categorias, etiquetas, series):
+        self.version = version
+        self.categorias = categorias
+        self.etiquetas = etiquetas
+        self.series = series
+
+        self.categorias_por_slug = {c.slug: c for c in categorias}
+        self.categorias_por_id = {c.pk: c for c in categorias}
+        self.etiquetas_por_slug = {e.slug: e for e in etiquetas}
+        self.etiquetas_por_id = {e.pk: e for e in etiquetas}
+        self.series_por_slug = {s.slug: s for s in series}
+        self.series_por_id = {s.pk: s for s in series}
+
+
+def _version_compartida():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        # Primera vez (o caché vaciada): fijamos una versión para que todos los workers coincidan
+        cache.add(CLAVE_VERSION, uuid.uuid4().hex, None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def _construir(version):
+    con_conteo = Count('articulos', distinct=True)
+    return Registro(
+        version,
+        list(Categoria.objects.annotate(num_articulos=con_conteo)),
+        list(Etiqueta.objects.annotate(num_articulos=con_conteo)),
+        list(Serie.objects.annotate(num_articulos=con_conteo, ultima_publicacion=Max('articulos__fecha_publicacion'))),
+    )
+
+
+def registro():
+    """Devuelve el registro vigente, reconstruyéndolo solo si otro proceso cambió la versión."""
+    global _registro, _ultima_verificacion
+
+    ahora = time.monotonic()
+    if _registro is not None and ahora - _ultima_verificacion < SEGUNDOS_ENTRE_VERIFICACIONES:
+        return _registro
+
+    version = _version_compartida()
+    with _lock:
+        if _registro is None or _registro.version != version:
+            _registro = _construir(version)
+        _ultima_verificacion = ahora
+        return _registro
+
+
+def _publicar_version():
+    global _registro
+    cache.set(CLAVE_VERSION, uuid.uuid4().hex, None)
+    with _lock:
+        _registro = None
+
+
+def invalidar():
+    """Publica una nueva versión al confirmar la transacción en curso: todos los workers reconstruirán su registro."""
+    transaction.on_commit(_publicar_version)
+
+
+def version():
+    return registro().version
+
+
+# --- Búsquedas por slug para las vistas ---
+
+def categoria_o_404(slug):
+    categoria = registro().categorias_por_slug.get(slug)
+    if categoria is None:
+        raise Http404("Categoría no encontrada.")
+    return categoria
+
+
+def etiqueta_o_404(slug):
+    etiqueta = registro().etiquetas_por_slug.get(slug)
+    if etiqueta is None:
+        raise Http404("Etiqueta no encontrada.")
+    return etiqueta
+
+
+def serie_o_404(slug):
+    serie = registro().series_por_slug.get(slug)
+    if serie is None:
+        raise Http404("Serie no encontrada.")
+    return serie
+
+
+def adjuntar(articulos):
+    """
+    Asigna a cada artículo su categoría y serie desde el registro, sin JOIN
+    ni consultas extra (los artículos solo necesitan categoria_id y serie_id).
+    """
+    reg = registro()
+    for articulo in articulos:
+        # Si otro worker acaba de crear la categoría/serie y aún no la vemos, queda la carga perezosa normal
+        categoria = reg.categorias_por_id.get(articulo.categoria_id)
+        if categoria is not None:
+            articulo.categoria = categoria
+        serie = reg.series_por_id.get(articulo.serie_id)
+        if serie is not None:
+            articulo.serie = serie
+    return articulos
@@ -0,0 +1,39 @@
+# blog_circadiano/templatetags/rendiciones.py
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from blog_circadiano.rendiciones import RENDICIONES
+
+register = template.Library()
+
+
+@register.simple_tag
+def imagen_destacada(objeto, rendicion, alt='', clase='', diferida=True):
+    """
+    Imagen destacada de un Articulo o una Serie en el tamaño pedido ('thumb', 'card' o 'hero'):
+    un <picture> con WebP y JPEG de respaldo, con dimensiones para evitar saltos de diseño.
+    Si aún no hay rendiciones (imagen antigua o que no se pudo procesar) usa el original.
+
+    Uso: {% imagen_destacada articulo 'card' alt=articulo.titulo clase='resumen-imagen' %}
+    Con diferida=False la imagen no usa loading="lazy" (cabeceras visibles al cargar).
+    """
+    if rendicion not in RENDICIONES:
+        raise template.TemplateSyntaxError(f"Rendición desconocida: {rendicion!r}")
+    if not objeto.imagen_destacada:
+        return ''
+
+    carga = 'lazy' if diferida else 'eager'
+    datos = (objeto.imagen_rendiciones or {}).get(rendicion)
+    if not datos:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            objeto.imagen_destacada.url, alt, clase, carga,
+        )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" alt="{}" class="{}" width="{}" height="{}" loading="{}" decoding="async"></picture>',
+        default_storage.url(datos['webp']), default_storage.url(datos['jpeg']),
+        alt, clase, datos['ancho'], datos['alto'], carga,
+    )
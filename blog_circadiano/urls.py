@@ -1,7 +1,7 @@
 # blog_circadiano/urls.py
 
 from django.urls import path
-from . import views
+from . import api, feeds, views
 from .models import Categoria, Etiqueta # Importa los modelos para pasarlos al contexto global si es necesario
 from .views import GuiaWrapperView, DocumentoDetalladoView
 
@@ -23,6 +23,9 @@ urlpatterns = [
     
     # URL para detalle de artículo
     path('articulo/<int:pk>/', views.detalle_articulo, name='detalle_articulo'),
+
+    # Fragmentos de comentarios (los pide script.js al abrir la sección)
+    path('articulo/<int:pk>/comentarios/', views.comentarios_articulo, name='comentarios_articulo'),
     
     # URL para likes
     path('toggle_like/', views.toggle_like, name='toggle_like'),
@@ -38,4 +41,22 @@ urlpatterns = [
     # ¡NUEVAS URLs PARA LAS SERIES!
     path('series/', views.lista_series, name='lista_series'),
     path('series/<slug:serie_slug>/', views.detalle_serie, name='detalle_serie'),
+
+    # Feeds RSS y Atom (ver feeds.py)
+    path('feed/', feeds.vista(feeds.ArticulosRss), name='feed_articulos'),
+    path('feed/atom/', feeds.vista(feeds.ArticulosRss, atom=True), name='feed_articulos_atom'),
+    path('categoria/<slug:categoria_slug>/feed/', feeds.vista(feeds.CategoriaRss), name='feed_categoria'),
+    path('categoria/<slug:categoria_slug>/feed/atom/', feeds.vista(feeds.CategoriaRss, atom=True), name='feed_categoria_atom'),
+    path('etiqueta/<slug:etiqueta_slug>/feed/', feeds.vista(feeds.EtiquetaRss), name='feed_etiqueta'),
+    path('etiqueta/<slug:etiqueta_slug>/feed/atom/', feeds.vista(feeds.EtiquetaRss, atom=True), name='feed_etiqueta_atom'),
+    path('series/<slug:serie_slug>/feed/', feeds.vista(feeds.SerieRss), name='feed_serie'),
+    path('series/<slug:serie_slug>/feed/atom/', feeds.vista(feeds.SerieRss, atom=True), name='feed_serie_atom'),
+
+    # API JSON de solo lectura (ver api.py)
+    path('api/v1/articulos/', api.articulos, name='api_articulos'),
+    path('api/v1/articulos/<int:pk>/', api.articulo, name='api_articulo'),
+    path('api/v1/series/', api.series, name='api_series'),
+    path('api/v1/series/<slug:serie_slug>/', api.serie, name='api_serie'),
+    path('api/v1/categorias/', api.categorias, name='api_categorias'),
+    path('api/v1/etiquetas/', api.etiquetas, name='api_etiquetas'),
 ]
\ No newline at end of file
@@ -3,13 +3,21 @@ from django.contrib.auth.decorators import login_required # Para requerir inicio
 from django.urls import reverse # Para construir URLs dinámicamente
 from django.http import JsonResponse, Http404 # Importar para respuestas AJAX
 from django.views.decorators.http import require_POST # Para asegurar que la vista solo acepte POST
-from django.db.models import Max, Q # <-- ¡Importa Q para búsquedas complejas!
+from django.db.models import BooleanField, Count, ExpressionWrapper, F, Max, Q, Window # <-- ¡Importa Q para búsquedas complejas!
+from django.db.models.functions import Lag, Lead, RowNumber
 from django.views.generic import DetailView
 from django.views.decorators.clickjacking import xframe_options_sameorigin
+from django.views.decorators.http import condition
+from django.utils.decorators import method_decorator
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from .models import Articulo, Comentario, Categoria, Etiqueta,Serie
 from .forms import ComentarioForm # Importa tu formulario de comentarios
+from .pagination import paginar_por_cursor, CursorInvalido
+from . import guias, relacionados, search, taxonomia
+from .cache_paginas import cache_anonimo
+from .condicional import etag_articulo, ultima_modificacion_articulo
+from . import comentarios as hilos
 
 
 # circadia/blog_circadiano/views.py
@@ -18,13 +26,60 @@ from django.shortcuts import render, get_object_or_404
 from .models import Articulo, Categoria, Etiqueta, Serie # Asegúrate de importar Serie
 from django.db.models import Q
 
+ARTICULOS_POR_PAGINA = 10
+
+# Columnas grandes de Articulo que las listas no muestran: no se leen ni se transfieren
+CAMPOS_PESADOS = ('contenido', 'documento_detallado', 'texto_plano', 'contenido_html', 'documento_html')
+
+# El detalle solo emite contenido_html: el HTML de origen y el documento no se leen
+CAMPOS_NO_USADOS_EN_DETALLE = ('contenido', 'documento_detallado', 'texto_plano', 'documento_html')
+
+# Orden de lectura de una serie (fecha e id desempatan posiciones repetidas o vacías)
+ORDEN_SERIE = (F('posicion_serie').asc(nulls_last=True), 'fecha_publicacion', 'pk')
+
+
+def navegacion_serie(articulo):
+    """
+    Parte, total de partes y artículos anterior y siguiente dentro de la serie, con una
+    sola consulta (funciones de ventana sobre la serie, filtradas al artículo).
+    None si el artículo no pertenece a una serie.
+    """
+    if not articulo.serie_id:
+        return None
+    orden = {'order_by': ORDEN_SERIE}
+    return (
+        Articulo.objects.filter(serie_id=articulo.serie_id)
+        .annotate(
+            # El propio id, pero como ventana: así Django filtra por él después de calcular
+            # las demás ventanas sobre toda la serie (y no antes, en el WHERE)
+            fila=Window(Max('pk'), partition_by=F('pk')),
+            parte=Window(RowNumber(), **orden),
+            total=Window(Count('pk')),
+            anterior_pk=Window(Lag('pk'), **orden),
+            anterior_titulo=Window(Lag('titulo'), **orden),
+            siguiente_pk=Window(Lead('pk'), **orden),
+            siguiente_titulo=Window(Lead('titulo'), **orden),
+        )
+        .filter(fila=articulo.pk)
+        .order_by()
+        .values('parte', 'total', 'anterior_pk', 'anterior_titulo', 'siguiente_pk', 'siguiente_titulo')
+        .first()
+    )
+
+@cache_anonimo()
 def lista_articulos(request, categoria_slug=None, etiqueta_slug=None):
     """
-    Vista que obtiene TODOS los artículos y permite que la plantilla
+    Vista que obtiene los artículos paginados por cursor y permite que la plantilla
     muestre un marcador si pertenecen a una serie.
+
+    Con ?parcial=1 devuelve solo el fragmento HTML de la página pedida
+    (lo usa el scroll infinito de script.js).
     """
-    # 1. Empezamos con TODOS los artículos. Este es el cambio clave.
-    articulos_qs = Articulo.objects.all() 
+    # 1. Empezamos con TODOS los artículos, trayendo el autor en el mismo JOIN y las etiquetas
+    # en una única consulta adicional (evita N+1 en la plantilla). Categoría y serie salen del registro.
+    articulos_qs = Articulo.objects.select_related('autor').prefetch_related(
+        'etiquetas'
+    ).defer(*CAMPOS_PESADOS)
     
     categoria_actual = None
     etiqueta_actual = None
@@ -32,47 +87,73 @@ def lista_articulos(request, categoria_slug=None, etiqueta_slug=None):
 
     # 2. Aplicamos los filtros de categoría y etiqueta
     if categoria_slug:
-        categoria_actual = get_object_or_404(Categoria, slug=categoria_slug)
-        articulos_qs = articulos_qs.filter(categoria=categoria_actual)
+        categoria_actual = taxonomia.categoria_o_404(categoria_slug)
+        articulos_qs = articulos_qs.filter(categoria_id=categoria_actual.pk)
     
     if etiqueta_slug:
-        etiqueta_actual = get_object_or_404(Etiqueta, slug=etiqueta_slug)
-        articulos_qs = articulos_qs.filter(etiquetas=etiqueta_actual)
+        etiqueta_actual = taxonomia.etiqueta_o_404(etiqueta_slug)
+        articulos_qs = articulos_qs.filter(etiquetas__id=etiqueta_actual.pk)
 
-    # 3. Aplicamos el filtro de búsqueda
+    # 3. Aplicamos la búsqueda de texto completo: los resultados se ordenan por relevancia
+    orden = 'fecha_publicacion'
     if query:
-        articulos_qs = articulos_qs.filter(
-            Q(titulo__icontains=query) | Q(contenido__icontains=query)
+        articulos_qs = search.buscar(articulos_qs, query)
+        orden = 'relevancia'
+
+    # 4. Paginamos por (orden, id): las páginas profundas cuestan lo mismo que la primera
+    try:
+        articulos, siguiente_cursor = paginar_por_cursor(
+            articulos_qs, request.GET.get('cursor'), por_pagina=ARTICULOS_POR_PAGINA, campo=orden
         )
+    except CursorInvalido:
+        raise Http404("Página no encontrada.")
 
-    # 4. Ordenamos y preparamos el contexto final
-    articulos = articulos_qs.order_by('-fecha_publicacion')
+    taxonomia.adjuntar(articulos)
+    if query:
+        # Fragmentos resaltados solo para los artículos de esta página
+        search.resaltar(articulos, query)
 
-    todas_categorias = Categoria.objects.all()
-    todas_etiquetas = Etiqueta.objects.all()
+    # Conservamos ?q= en el enlace "Cargar más"
+    parametros = request.GET.copy()
+    parametros.pop('parcial', None)
+    if siguiente_cursor:
+        parametros['cursor'] = siguiente_cursor
 
     context = {
         # La plantilla espera esta variable: 'articulos'
         'articulos': articulos, 
+        'siguiente_pagina': parametros.urlencode() if siguiente_cursor else None,
         'categoria_actual': categoria_actual,
         'etiqueta_actual': etiqueta_actual,
-        'todas_categorias': todas_categorias,
-        'todas_etiquetas': todas_etiquetas,
         'query': query,
         'show_sidebar': True, # <-- ¡ESTA ES LA LÍNEA QUE FALTABA!
     }
+
+    if request.GET.get('parcial'):
+        return render(request, 'blog_circadiano/partials/articulos_pagina.html', context)
+
+    registro = taxonomia.registro()
+    context['todas_categorias'] = registro.categorias
+    context['todas_etiquetas'] = registro.etiquetas
+    context['taxonomia_version'] = registro.version
     return render(request, 'blog_circadiano/lista_articulos.html', context)
 
+def _comentario_respondido(request, articulo):
+    """Comentario del artículo indicado en parent_id (None si no viene o no existe)."""
+    parent_id = request.POST.get('parent_id', '')
+    if not parent_id.isdigit():
+        return None
+    return Comentario.objects.filter(id=parent_id, articulo=articulo).first()
+
+# Validadores antes que la caché: un navegador con la versión vigente recibe 304 sin tocar nada más
+@condition(etag_func=etag_articulo, last_modified_func=ultima_modificacion_articulo)
+@cache_anonimo(articulo_kwarg='pk')
 def detalle_articulo(request, pk):
-    articulo = get_object_or_404(Articulo, pk=pk)
-    
-    comentarios = Comentario.objects.filter(
-        articulo=articulo, 
-        parent__isnull=True, 
-        activo=True
-    ).select_related('autor').prefetch_related(
-        'replies__autor', 
-        'replies__replies__autor', 
+    articulo = get_object_or_404(
+        Articulo.objects.defer(*CAMPOS_NO_USADOS_EN_DETALLE).annotate(
+            tiene_documento=ExpressionWrapper(~Q(documento_html=''), output_field=BooleanField())
+        ),
+        pk=pk,
     )
     
     nuevo_comentario = None
@@ -86,52 +167,86 @@ def detalle_articulo(request, pk):
         if not request.user.is_authenticated:
             return redirect(reverse('usuarios:login') + f'?next={request.path}')
 
-        form = ComentarioForm(data=request.POST)
+        form = ComentarioForm(data=request.POST, parent=_comentario_respondido(request, articulo))
         if form.is_valid():
             nuevo_comentario = form.save(commit=False)
             nuevo_comentario.articulo = articulo
             nuevo_comentario.autor = request.user
-            
-            parent_id = request.POST.get('parent_id')
-            if parent_id:
-                try:
-                    parent_obj = Comentario.objects.get(id=parent_id)
-                    nuevo_comentario.parent = parent_obj
-                except Comentario.DoesNotExist:
-                    pass
-            
+            nuevo_comentario.parent = form.parent
             nuevo_comentario.save()
             return redirect(reverse('blog_circadiano:detalle_articulo', kwargs={'pk': articulo.pk}) + f'#comentario-{nuevo_comentario.pk}')
     
+    # Los comentarios no se renderizan aquí: script.js los pide a comentarios_articulo al abrir la sección
     context = {
         'articulo': articulo,
-        'comentarios': comentarios,
         'form': form,
         'user_liked_article': user_liked_article,
+        'relacionados': relacionados.de(articulo.pk),
+        'navegacion_serie': navegacion_serie(articulo),
         'show_sidebar': False, # <-- ¡Añadido! No mostrar sidebar en el detalle del artículo
     }
     return render(request, 'blog_circadiano/detalle_articulo.html', context)
 
+@cache_anonimo(articulo_kwarg='pk')
+def comentarios_articulo(request, pk):
+    """
+    Fragmento HTML con los comentarios de un artículo, para script.js.
+
+    - Sin parámetros (o ?cursor=...): una página de comentarios principales, cada uno
+      con un enlace para desplegar sus respuestas, y el enlace a la página siguiente.
+    - ?respuestas_de=<id>: el subárbol completo de respuestas de ese comentario.
+    - ?destacado=<id>: en la primera página, el hilo de ese comentario va primero y
+      desplegado (se usa al volver de publicar, con #comentario-<id> en la URL).
+    """
+    articulo = get_object_or_404(Articulo.objects.only('id'), pk=pk)
+    contexto = {'articulo': articulo, 'form': ComentarioForm()}
+
+    respuestas_de = request.GET.get('respuestas_de', '')
+    if respuestas_de:
+        if not respuestas_de.isdigit():
+            raise Http404("Comentario no encontrado.")
+        raiz = get_object_or_404(
+            Comentario.objects.only('id', 'articulo_id', 'ruta', 'profundidad'),
+            pk=respuestas_de, articulo=articulo, activo=True,
+        )
+        contexto['comentarios'] = hilos.respuestas(raiz, articulo)
+        contexto['comentarios_con_like'] = hilos.ids_con_like(request.user, contexto['comentarios'])
+        return render(request, 'blog_circadiano/_comment_tree.html', contexto)
+
+    cursor = request.GET.get('cursor')
+    destacado = request.GET.get('destacado', '')
+    destacado = int(destacado) if destacado.isdigit() else None
+    try:
+        principales, siguiente_cursor = hilos.pagina(articulo, cursor, destacado=destacado)
+    except CursorInvalido:
+        raise Http404("Página no válida.")
+
+    renderizados = list(principales)
+    for comentario in principales:
+        renderizados.extend(getattr(comentario, 'respuestas', []))
+
+    contexto.update({
+        'principales': principales,
+        'primera_pagina': not cursor,
+        'siguiente_cursor': siguiente_cursor,
+        # "Cargar más" lo repite para que las páginas siguientes no vuelvan a traer ese hilo
+        'destacado': destacado,
+        'comentarios_con_like': hilos.ids_con_like(request.user, renderizados),
+    })
+    return render(request, 'blog_circadiano/partials/comentarios_pagina.html', contexto)
+
 # Vista para manejar solo el envío de comentarios (podría ser redundante con la vista anterior,
 # pero a veces se separa para más claridad o para API)
 @login_required # Decorador para asegurar que solo usuarios logueados pueden acceder
 def post_comentario(request, pk):
     articulo = get_object_or_404(Articulo, pk=pk)
     if request.method == 'POST':
-        form = ComentarioForm(data=request.POST)
+        form = ComentarioForm(data=request.POST, parent=_comentario_respondido(request, articulo))
         if form.is_valid():
             comentario = form.save(commit=False)
             comentario.articulo = articulo
             comentario.autor = request.user
-            
-            parent_id = request.POST.get('parent_id')
-            if parent_id:
-                try:
-                    parent_obj = Comentario.objects.get(id=parent_id)
-                    comentario.parent = parent_obj
-                except Comentario.DoesNotExist:
-                    pass
-            
+            comentario.parent = form.parent
             comentario.save()
             return redirect(reverse('blog_circadiano:detalle_articulo', kwargs={'pk': articulo.pk}) + f'#comentario-{comentario.pk}')
     
@@ -163,19 +278,21 @@ def toggle_like(request):
         
         item = None
         if item_type == 'articulo':
-            item = get_object_or_404(Articulo, id=item_id)
+            item = get_object_or_404(Articulo.objects.only('id', 'num_likes'), id=item_id)
         elif item_type == 'comentario':
-            item = get_object_or_404(Comentario, id=item_id)
+            item = get_object_or_404(Comentario.objects.only('id', 'articulo_id', 'num_likes'), id=item_id)
         else:
              return JsonResponse({'status': 'error', 'message': 'Tipo de ítem inválido.'}, status=400)
 
-        if user in item.likes.all():
+        if item.likes.filter(pk=user.pk).exists():
             item.likes.remove(user)
             liked = False
         else:
             item.likes.add(user)
             liked = True
-        
+
+        # El contador lo actualizan los signals con F(): leemos solo esa columna
+        item.refresh_from_db(fields=['num_likes'])
         return JsonResponse({'status': 'success', 'liked': liked, 'total_likes': item.total_likes})
 
     except Http404:
@@ -185,20 +302,37 @@ def toggle_like(request):
     
 
 # 1. La vista que muestra el marco y el iframe (la que el usuario visita)
+@method_decorator(condition(etag_func=etag_articulo, last_modified_func=ultima_modificacion_articulo), name='dispatch')
 class GuiaWrapperView(DetailView):
     model = Articulo
+    queryset = Articulo.objects.only('id', 'titulo', 'guia_slug')
     template_name = "blog_circadiano/guia_wrapper.html"
     pk_url_kwarg = 'pk'
     context_object_name = 'articulo' # Pasamos el artículo como 'articulo' al contexto
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # El iframe carga la guía pre-renderizada directo de los estáticos (sin pasar por Django)
+        context['url_guia'] = (
+            guias.url(self.object.guia_slug)
+            or reverse('blog_circadiano:vista_guia_contenido', kwargs={'pk': self.object.pk})
+        )
+        return context
+
 # 2. La vista que renderiza SOLO el contenido de la guía para el iframe
 @xframe_options_sameorigin
+@condition(etag_func=etag_articulo, last_modified_func=ultima_modificacion_articulo)
 def guia_contenido_view(request, pk):
-    articulo = get_object_or_404(Articulo, pk=pk)
+    articulo = get_object_or_404(Articulo.objects.only('id', 'titulo', 'guia_slug'), pk=pk)
     
     if not articulo.guia_slug:
         raise Http404("Guía no encontrada.")
 
+    # Guía ya construida con 'manage.py construir_guias': se sirve el archivo estático
+    url_guia = guias.url(articulo.guia_slug)
+    if url_guia:
+        return redirect(url_guia)
+
     template_name = f"blog_circadiano/guias/{articulo.guia_slug}"
     context = {
         'articulo': articulo,
@@ -206,23 +340,26 @@ def guia_contenido_view(request, pk):
     }
     return render(request, template_name, context)
 
+@method_decorator(condition(etag_func=etag_articulo, last_modified_func=ultima_modificacion_articulo), name='dispatch')
 class DocumentoDetalladoView(LoginRequiredMixin, DetailView):
     model = Articulo
     # Esta es la plantilla que crearemos en el siguiente paso
     template_name = 'blog_circadiano/documento_detallado_page.html' 
     context_object_name = 'articulo'
+    # La página solo usa el documento ya renderizado
+    queryset = Articulo.objects.only('id', 'titulo', 'documento_html')
 
+@cache_anonimo()
 def lista_series(request):
     """
     Vista para mostrar todas las series disponibles, incluyendo el sidebar.
     """
-    series = Serie.objects.all()
-
-    # --- LÍNEAS AÑADIDAS ---
-    # Obtenemos los datos para el sidebar
-    todas_categorias = Categoria.objects.all()
-    todas_etiquetas = Etiqueta.objects.all()
-    # -------------------------
+    # Series (con su número de artículos y la fecha de su última parte), categorías y
+    # etiquetas salen del registro en memoria: ninguna consulta por serie
+    registro = taxonomia.registro()
+    series = registro.series
+    todas_categorias = registro.categorias
+    todas_etiquetas = registro.etiquetas
 
     context = {
         'series': series,
@@ -232,12 +369,13 @@ def lista_series(request):
     }
     return render(request, 'blog_circadiano/lista_series.html', context)
 
+@cache_anonimo()
 def detalle_serie(request, serie_slug):
     """
     Vista para mostrar los artículos de una serie específica.
     """
-    serie = get_object_or_404(Serie, slug=serie_slug)
-    articulos_en_serie = serie.articulos.all().order_by('fecha_publicacion') # Ordenamos los artículos cronológicamente
+    serie = taxonomia.serie_o_404(serie_slug)
+    articulos_en_serie = serie.articulos.defer(*CAMPOS_PESADOS).order_by(*ORDEN_SERIE) # En orden de lectura (posicion_serie)
     context = {
         'serie': serie,
         'articulos_en_serie': articulos_en_serie,
@@ -248,13 +386,14 @@ def detalle_serie(request, serie_slug):
 def nosotros(request):
     return render(request, 'blog_circadiano/nosotros.html')
 
+@cache_anonimo()
 def home_view(request):
     """
     Vista para la página de inicio.
     Muestra los últimos 3 artículos y las últimas 3 series.
     """
-    latest_articles = Articulo.objects.order_by('-fecha_publicacion')[:3] # Get the 3 most recent articles
-    featured_series = Serie.objects.all()[:3] # Get 3 series (you might want a 'is_featured' field for better control)
+    latest_articles = Articulo.objects.defer(*CAMPOS_PESADOS).order_by('-fecha_publicacion')[:3] # Get the 3 most recent articles
+    featured_series = taxonomia.registro().series[:3] # Get 3 series (you might want a 'is_featured' field for better control)
 
     context = {
         'latest_articles': latest_articles,
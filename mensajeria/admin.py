@@ -1,52 +1,76 @@
 # mensajeria/admin.py
 
 from django.contrib import admin
-from .models import Conversation, Message
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from django.db.models.functions import Substr
+from blog_circadiano.listados_admin import FiltroAutocompletar, ListadoEscalable
+from .models import Conversation, ConversationMembership, Message
 
-class ConversationAdmin(admin.ModelAdmin):
-    list_display = ('id', 'display_participants', 'created_at', 'updated_at', 'is_archived') # <-- Añadido 'is_archived'
-    list_filter = ('is_archived', 'created_at', 'updated_at') # <-- Añadido filtro por 'is_archived'
-    filter_horizontal = ('participants',)
+# Participantes de toda la página en una sola consulta (solo el username, que es lo que se muestra)
+PARTICIPANTES = User.objects.only('username')
+
+
+class ConversationMembershipInline(admin.TabularInline):
+    # Los participantes se editan aquí (tienen tabla intermedia): archivado y silencio son de cada uno
+    model = ConversationMembership
+    extra = 0
+    raw_id_fields = ('user',)
+    fields = ('user', 'is_archived', 'is_muted', 'unread_count', 'last_read_message_id')
+    readonly_fields = ('unread_count', 'last_read_message_id')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
+
+class ConversationAdmin(ListadoEscalable, admin.ModelAdmin):
+    list_display = ('id', 'display_participants', 'created_at', 'last_message_at', 'message_count')
+    list_filter = ('created_at', 'updated_at')
+    inlines = [ConversationMembershipInline]
     search_fields = ('participants__username',)
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'last_message_at', 'message_count', 'last_message_preview')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(Prefetch('participants', queryset=PARTICIPANTES))
 
     def display_participants(self, obj):
         return ", ".join([p.username for p in obj.participants.all()])
     display_participants.short_description = "Participantes"
 
     # --- Acciones personalizadas para Archivar/Desarchivar ---
+    # El archivado es de cada participante: estas acciones lo cambian para todos ellos
     actions = ['mark_as_archived', 'mark_as_unarchived']
 
     def mark_as_archived(self, request, queryset):
-        queryset.update(is_archived=True)
-    mark_as_archived.short_description = "Archivar conversaciones seleccionadas"
+        ConversationMembership.objects.filter(conversation__in=queryset).update(is_archived=True)
+    mark_as_archived.short_description = "Archivar conversaciones seleccionadas (para todos sus participantes)"
 
     def mark_as_unarchived(self, request, queryset):
-        queryset.update(is_archived=False)
-    mark_as_unarchived.short_description = "Desarchivar conversaciones seleccionadas"
+        ConversationMembership.objects.filter(conversation__in=queryset).update(is_archived=False)
+    mark_as_unarchived.short_description = "Desarchivar conversaciones seleccionadas (para todos sus participantes)"
     # --- Fin Acciones ---
 
 
-class MessageAdmin(admin.ModelAdmin):
-    # ... (Tu clase MessageAdmin permanece sin cambios) ...
-    list_display = ('conversation', 'sender', 'timestamp', 'is_read', 'content_snippet')
-    list_filter = ('is_read', 'timestamp', 'sender', 'conversation__is_archived') # Puedes filtrar por si la conversación está archivada
+class MessageAdmin(ListadoEscalable, admin.ModelAdmin):
+    list_display = ('conversation', 'sender', 'timestamp', 'content_snippet')
+    list_filter = ('timestamp', ('sender', FiltroAutocompletar))
     search_fields = ('content', 'sender__username')
     raw_id_fields = ('sender', 'conversation')
+    # str() de la conversación lista sus participantes: se traen para toda la página de una vez
+    list_select_related = ('conversation', 'sender')
+    # El listado solo muestra el comienzo del mensaje (anotado en get_queryset)
+    campos_diferidos = ('content',)
+    # Los más recientes primero, por la clave primaria (ordenar por fecha no tiene índice)
+    ordering = ('-id',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related(
+            Prefetch('conversation__participants', queryset=PARTICIPANTES)
+        ).annotate(comienzo=Substr('content', 1, 51))
 
     def content_snippet(self, obj):
-        return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
+        return obj.comienzo[:50] + '...' if len(obj.comienzo) > 50 else obj.comienzo
     content_snippet.short_description = "Contenido"
-    
-    actions = ['mark_as_read', 'mark_as_unread']
-
-    def mark_as_read(self, request, queryset):
-        queryset.update(is_read=True)
-    mark_as_read.short_description = "Marcar como leído"
-
-    def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False)
-    mark_as_unread.short_description = "Marcar como no leído"
 
 
 admin.site.register(Conversation, ConversationAdmin)
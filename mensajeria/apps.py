@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MensajeriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mensajeria'
+
+    def ready(self):
+        import mensajeria.signals
@@ -1,39 +1,27 @@
 # mensajeria/context_processors.py
 
-from .models import Message, Conversation
-from django.db.models import Q, OuterRef # <-- Importa OuterRef directamente
-from django.db.models import Exists # También es útil importar Exists para un patrón común
-from django.db import models # <-- Aquí sí importamos 'models' para usarlo directamente si es necesario, pero no de django.db.models
+from django.utils.functional import SimpleLazyObject
+
+from . import no_leidos
+
 
 def unread_messages_count(request):
     """
     Context processor para añadir el número de mensajes no leídos del usuario
     y si tiene alguna conversación con mensajes no leídos al contexto de todas las plantillas.
-    """
-    unread_count = 0
-    has_unread_conversations = False
 
-    if request.user.is_authenticated:
-        # Contar mensajes no leídos que el usuario ha recibido y aún no ha marcado como leídos
-        # Excluye mensajes enviados por el propio usuario.
-        unread_count = Message.objects.filter(
-            conversation__participants=request.user, # La conversación debe ser del usuario
-            is_read=False # El mensaje no debe estar leído
-        ).exclude(
-            sender=request.user # El mensaje no debe haber sido enviado por el propio usuario
-        ).count()
+    Los valores son perezosos: el contador (en caché, ver no_leidos.py) solo se consulta
+    si una plantilla los usa, y una sola vez por petición.
+    """
+    if not request.user.is_authenticated:
+        return {'unread_messages_count': 0, 'has_unread_messages_overall': False}
 
-        # Verificar si existe al menos una conversación con mensajes no leídos para el usuario
-        has_unread_conversations = Conversation.objects.filter(
-            participants=request.user
-        ).filter(
-            # Verifica que la conversación tiene mensajes no leídos por el usuario actual
-            messages__is_read=False,
-            # Ahora models.OuterRef debería ser reconocido
-            messages__sender__in=Conversation.objects.filter(pk=models.OuterRef('pk')).values('participants').exclude(pk=request.user.pk) # Que el remitente no sea yo mismo
-        ).exists()
+    def totales():
+        if not hasattr(request, '_no_leidos'):
+            request._no_leidos = no_leidos.totales(request.user.pk)
+        return request._no_leidos
 
     return {
-        'unread_messages_count': unread_count,
-        'has_unread_messages_overall': has_unread_conversations 
-    }
\ No newline at end of file
+        'unread_messages_count': SimpleLazyObject(lambda: totales()[0]),
+        'has_unread_messages_overall': SimpleLazyObject(lambda: totales()[1] > 0),
+    }
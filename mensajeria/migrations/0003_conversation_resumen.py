@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+
+def resumir_conversaciones(apps, schema_editor):
+    # Mismo UPDATE por conjunto que resumenes.recalcular_resumenes, con los modelos históricos
+    Conversation = apps.get_model('mensajeria', 'Conversation')
+    Message = apps.get_model('mensajeria', 'Message')
+    ultimo = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+    total = (
+        Message.objects.filter(conversation=OuterRef('pk')).order_by().values('conversation')
+        .annotate(total=Count('*')).values('total')[:1]
+    )
+    Conversation.objects.update(
+        last_message=Subquery(ultimo.values('pk')[:1]),
+        last_message_preview=Coalesce(Subquery(ultimo.annotate(inicio=Substr('content', 1, 120)).values('inicio')[:1]), Value('')),
+        last_message_at=Subquery(ultimo.values('timestamp')[:1]),
+        message_count=Coalesce(Subquery(total, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mensajeria', '0002_conversation_is_archived'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='mensajeria.message', verbose_name='Último mensaje'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Fecha del último mensaje'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, editable=False, max_length=120, verbose_name='Vista previa'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Mensajes'),
+        ),
+        migrations.RunPython(resumir_conversaciones, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['-last_message_at', '-id'], name='conversacion_ultimo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'is_read'], name='mensaje_no_leido_idx'),
+        ),
+    ]
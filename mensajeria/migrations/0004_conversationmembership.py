@@ -0,0 +1,127 @@
+# Generated by Django 5.2.3 on 2026-10-18 08:05
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def estado_por_participante(apps, schema_editor):
+    # El archivado pasa a cada participante tal como estaba para la conversación. La marca de
+    # lectura se deja justo antes del primer mensaje de los demás sin leer (o en el último
+    # mensaje si no hay ninguno); los no leídos son los mensajes de los demás después de ella.
+    Conversation = apps.get_model('mensajeria', 'Conversation')
+    ConversationMembership = apps.get_model('mensajeria', 'ConversationMembership')
+    Message = apps.get_model('mensajeria', 'Message')
+
+    conversaciones = list(Conversation.objects.order_by('pk').values_list('pk', 'is_archived', 'last_message_at'))
+    for inicio in range(0, len(conversaciones), 500):
+        lote = {pk: (archivada, fecha) for pk, archivada, fecha in conversaciones[inicio:inicio + 500]}
+        mensajes = defaultdict(list)
+        for conversation_id, pk, sender_id, leido in (
+            Message.objects.filter(conversation_id__in=lote).order_by('conversation_id', 'pk')
+            .values_list('conversation_id', 'pk', 'sender_id', 'is_read').iterator()
+        ):
+            mensajes[conversation_id].append((pk, sender_id, leido))
+
+        pendientes = []
+        for participacion in ConversationMembership.objects.filter(conversation_id__in=lote):
+            marca, no_leidos, bloqueada = 0, 0, False
+            for pk, sender_id, leido in mensajes[participacion.conversation_id]:
+                propio_o_leido = sender_id == participacion.user_id or leido
+                if not propio_o_leido:
+                    bloqueada = True
+                if not bloqueada:
+                    marca = pk
+                elif sender_id != participacion.user_id:
+                    no_leidos += 1
+            participacion.last_read_message_id = marca
+            participacion.unread_count = no_leidos
+            participacion.is_archived, participacion.last_message_at = lote[participacion.conversation_id]
+            pendientes.append(participacion)
+        ConversationMembership.objects.bulk_update(
+            pendientes, ['last_read_message_id', 'unread_count', 'is_archived', 'last_message_at'], batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mensajeria', '0003_conversation_resumen'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # La tabla intermedia del ManyToManyField ya existe (mensajeria_conversation_participants,
+        # con id, conversation_id y user_id): solo cambia el estado de los modelos.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ConversationMembership',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='mensajeria.conversation', verbose_name='Conversación')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+                    ],
+                    options={
+                        'verbose_name': 'Participante',
+                        'verbose_name_plural': 'Participantes',
+                        'db_table': 'mensajeria_conversation_participants',
+                        'unique_together': {('conversation', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='conversation',
+                    name='participants',
+                    field=models.ManyToManyField(related_name='conversations', through='mensajeria.ConversationMembership', to=settings.AUTH_USER_MODEL, verbose_name='Participantes'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='conversationmembership',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Último mensaje leído'),
+        ),
+        migrations.AddField(
+            model_name='conversationmembership',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='No leídos'),
+        ),
+        migrations.AddField(
+            model_name='conversationmembership',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Fecha del último mensaje'),
+        ),
+        migrations.AddField(
+            model_name='conversationmembership',
+            name='is_archived',
+            field=models.BooleanField(default=False, verbose_name='¿Archivada?'),
+        ),
+        migrations.AddField(
+            model_name='conversationmembership',
+            name='is_muted',
+            field=models.BooleanField(default=False, verbose_name='¿Silenciada?'),
+        ),
+        migrations.RunPython(estado_por_participante, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='mensaje_no_leido_idx',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.RemoveIndex(
+            model_name='conversation',
+            name='conversacion_ultimo_idx',
+        ),
+        migrations.RemoveField(
+            model_name='conversation',
+            name='is_archived',
+        ),
+        migrations.AddIndex(
+            model_name='conversationmembership',
+            index=models.Index(fields=['user', '-last_message_at', '-id'], name='participacion_bandeja_idx'),
+        ),
+    ]
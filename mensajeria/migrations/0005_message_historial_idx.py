@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 09:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mensajeria', '0004_conversationmembership'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', '-timestamp', '-id'], name='mensaje_historial_idx'),
+        ),
+    ]
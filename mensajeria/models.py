@@ -11,7 +11,11 @@ class Conversation(models.Model):
     # ManyToManyField para los participantes: una conversación puede tener muchos usuarios,
     # y un usuario puede participar en muchas conversaciones.
     # related_name='conversations' permite acceder a las conversaciones de un usuario (ej. user.conversations.all())
-    participants = models.ManyToManyField(User, related_name='conversations', verbose_name="Participantes")
+    # La tabla intermedia (ConversationMembership) guarda además el estado de cada participante:
+    # hasta dónde leyó, sus no leídos y si archivó o silenció la conversación.
+    participants = models.ManyToManyField(
+        User, through='ConversationMembership', related_name='conversations', verbose_name="Participantes"
+    )
     
     # auto_now_add=True: Establece la fecha y hora de creación automáticamente la primera vez que se guarda el objeto.
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
@@ -19,7 +23,15 @@ class Conversation(models.Model):
     # auto_now=True: Actualiza la fecha y hora automáticamente cada vez que se guarda el objeto.
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actividad")
 
-    is_archived = models.BooleanField(default=False, verbose_name="¿Archivada?")
+    # Resumen desnormalizado del último mensaje, mantenido desde signals.py en cada envío
+    # (ver resumenes.py para reconstruirlo). La bandeja de entrada lee solo estas columnas.
+    last_message = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        editable=False, verbose_name="Último mensaje",
+    )
+    last_message_preview = models.CharField(max_length=120, blank=True, editable=False, verbose_name="Vista previa")
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Fecha del último mensaje")
+    message_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Mensajes")
 
     class Meta:
         verbose_name = "Conversación"
@@ -45,9 +57,11 @@ class Conversation(models.Model):
         Útil para mostrar 'Conversación con [Nombre del Otro Usuario]' en la interfaz de usuario.
         Retorna None si la conversación no tiene exactamente 2 participantes.
         """
-        if self.participants.count() == 2:
+        # .all() aprovecha los participantes precargados (prefetch_related) si los hay
+        participantes = list(self.participants.all())
+        if len(participantes) == 2:
             # Excluye al usuario actual para obtener el "otro" participante
-            return self.participants.exclude(pk=current_user.pk).first()
+            return next((p for p in participantes if p.pk != current_user.pk), None)
         return None # No aplica para conversaciones de grupo o sin participantes
 
 class Message(models.Model):
@@ -68,15 +82,53 @@ class Message(models.Model):
     # auto_now_add=True: Establece la fecha y hora de envío automáticamente la primera vez que se guarda el objeto.
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Marca de Tiempo")
     
-    # is_read: Para rastrear si el mensaje ha sido leído por los destinatarios.
-    is_read = models.BooleanField(default=False, verbose_name="¿Leído?")
+    # Si un mensaje fue leído depende de quién lo mire: ver ConversationMembership.last_read_message_id
 
     class Meta:
         verbose_name = "Mensaje"
         verbose_name_plural = "Mensajes"
         # Ordenar los mensajes cronológicamente dentro de una conversación
-        ordering = ['timestamp'] 
+        ordering = ['timestamp']
+        indexes = [
+            # Historial de una conversación (paginado por cursor sobre timestamp, id)
+            models.Index(fields=['conversation', '-timestamp', '-id'], name='mensaje_historial_idx'),
+        ]
 
     def __str__(self):
         # Representación de cadena para el mensaje, útil en el admin y depuración.
-        return f"Mensaje de {self.sender.username} en '{self.conversation.id}' a las {self.timestamp.strftime('%H:%M')}"
\ No newline at end of file
+        return f"Mensaje de {self.sender.username} en '{self.conversation.id}' a las {self.timestamp.strftime('%H:%M')}"
+
+
+class ConversationMembership(models.Model):
+    """
+    Participación de un usuario en una conversación (tabla intermedia de Conversation.participants),
+    con su estado propio: en una conversación de grupo cada uno lee, archiva y silencia por su cuenta.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='memberships', verbose_name="Conversación")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_memberships', verbose_name="Usuario")
+
+    # Marca de agua de lectura: id del último mensaje leído (0 = ninguno). Los ids crecen con
+    # cada envío, así que "leído" es message.id <= last_read_message_id. Marcar la conversación
+    # como leída es actualizar esta fila, no todos los mensajes.
+    last_read_message_id = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Último mensaje leído")
+    # Mensajes de los demás posteriores a la marca, mantenido con F() en cada envío (ver resumenes.py)
+    unread_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="No leídos")
+    # Copia de Conversation.last_message_at: la bandeja de un usuario se lee de esta tabla por índice
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Fecha del último mensaje")
+
+    is_archived = models.BooleanField(default=False, verbose_name="¿Archivada?")
+    is_muted = models.BooleanField(default=False, verbose_name="¿Silenciada?")
+
+    class Meta:
+        # La tabla es la que Django creó para el ManyToManyField original (migración 0004)
+        db_table = 'mensajeria_conversation_participants'
+        unique_together = [('conversation', 'user')]
+        verbose_name = "Participante"
+        verbose_name_plural = "Participantes"
+        indexes = [
+            # Bandeja de entrada de un usuario (paginada por cursor sobre last_message_at, id)
+            models.Index(fields=['user', '-last_message_at', '-id'], name='participacion_bandeja_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} en la conversación {self.conversation_id}"
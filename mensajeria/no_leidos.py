@@ -0,0 +1,47 @@
+# mensajeria/no_leidos.py
+
+"""
+Número de mensajes no leídos de cada usuario (el indicador del menú), guardado en la
+caché compartida con una entrada por usuario.
+
+El context processor lo pide en cada página, así que no se calcula ahí: se lee de la
+caché y solo se recalcula (una suma sobre las participaciones del usuario) cuando la
+entrada no está. resumenes.py y signals.py borran la entrada de los usuarios afectados
+cada vez que cambian sus no leídos: al enviar o leer un mensaje, al silenciar una
+conversación o al recalcular participaciones. El borrado se hace al confirmar la
+transacción, para que nadie vuelva a guardar el valor anterior mientras tanto.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import ConversationMembership
+
+# Cota de lo que puede durar un valor desactualizado si algo escapa a la invalidación
+SEGUNDOS_EN_CACHE = 10 * 60
+
+
+def _clave(user_id):
+    return f'mensajeria:no_leidos:{user_id}'
+
+
+def totales(user_id):
+    """(mensajes no leídos, conversaciones con no leídos) del usuario, sin las silenciadas."""
+    clave = _clave(user_id)
+    valor = cache.get(clave)
+    if valor is None:
+        suma = ConversationMembership.objects.filter(user_id=user_id, is_muted=False).aggregate(
+            mensajes=Sum('unread_count'),
+            conversaciones=Count('pk', filter=Q(unread_count__gt=0)),
+        )
+        valor = (suma['mensajes'] or 0, suma['conversaciones'])
+        cache.set(clave, valor, SEGUNDOS_EN_CACHE)
+    return valor
+
+
+def invalidar(user_ids):
+    """Borra la entrada de esos usuarios cuando se confirme la transacción en curso."""
+    claves = [_clave(pk) for pk in set(user_ids)]
+    if claves:
+        transaction.on_commit(lambda: cache.delete_many(claves))
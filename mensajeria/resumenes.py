@@ -0,0 +1,117 @@
+# mensajeria/resumenes.py
+
+"""
+Estado desnormalizado de las conversaciones:
+
+- en Conversation, el resumen del último mensaje (id, vista previa y fecha) y el número
+  de mensajes;
+- en ConversationMembership, por participante, la fecha del último mensaje (para su
+  bandeja), su marca de lectura y sus mensajes no leídos.
+
+Al enviar un mensaje todo se actualiza con tres UPDATE desde signals.py (registrar_envio),
+sin importar cuántos mensajes o participantes haya. Leer una conversación es un UPDATE de
+una fila (marcar_leida). Las funciones recalcular_* lo reconstruyen desde los mensajes con
+un UPDATE por conjunto; las usan los borrados y ediciones de mensajes (admin), la llegada
+de un participante nuevo y las migraciones que crearon los campos.
+
+Cada cambio en los no leídos borra además el contador en caché de los usuarios afectados
+(ver no_leidos.py).
+"""
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest, Substr
+
+from . import no_leidos
+from .models import Conversation, ConversationMembership, Message
+
+LARGO_VISTA_PREVIA = Conversation._meta.get_field('last_message_preview').max_length
+
+
+def vista_previa(contenido):
+    return contenido[:LARGO_VISTA_PREVIA]
+
+
+def registrar_envio(mensaje):
+    """El mensaje recién creado pasa a ser el último de su conversación."""
+    Conversation.objects.filter(pk=mensaje.conversation_id).update(
+        last_message=mensaje.pk,
+        last_message_preview=vista_previa(mensaje.content),
+        last_message_at=mensaje.timestamp,
+        message_count=F('message_count') + 1,
+        updated_at=mensaje.timestamp,
+    )
+    miembros = ConversationMembership.objects.filter(conversation_id=mensaje.conversation_id)
+    # Quien envía ya leyó todo lo anterior; para los demás es un no leído más
+    miembros.filter(user_id=mensaje.sender_id).update(
+        last_message_at=mensaje.timestamp, last_read_message_id=mensaje.pk, unread_count=0,
+    )
+    miembros.exclude(user_id=mensaje.sender_id).update(
+        last_message_at=mensaje.timestamp, unread_count=F('unread_count') + 1,
+    )
+    no_leidos.invalidar(miembros.values_list('user_id', flat=True))
+
+
+def marcar_leida(participacion, hasta=None):
+    """
+    Marca como leída la conversación hasta el mensaje 'hasta' (por omisión, su último mensaje
+    conocido), para ese participante (un UPDATE de una fila).
+
+    La marca nunca retrocede, y los no leídos se recuentan en el mismo UPDATE a partir de la
+    marca nueva: si llegó un mensaje después de cargar la conversación, sigue contando.
+    """
+    ultimo = (participacion.conversation.last_message_id if hasta is None else hasta) or 0
+    if participacion.unread_count or participacion.last_read_message_id < ultimo:
+        marca = Greatest(F('last_read_message_id'), Value(ultimo))
+        posteriores = Message.objects.filter(
+            conversation=OuterRef('conversation'),
+            pk__gt=Greatest(OuterRef('last_read_message_id'), Value(ultimo)),
+        ).exclude(sender=OuterRef('user'))
+        ConversationMembership.objects.filter(pk=participacion.pk).update(
+            last_read_message_id=marca, unread_count=_conteo(posteriores, 'conversation'),
+        )
+        participacion.refresh_from_db(fields=['last_read_message_id', 'unread_count'])
+        no_leidos.invalidar([participacion.user_id])
+
+
+def _conteo(queryset, campo):
+    """Subconsulta correlacionada que cuenta las filas de 'queryset' (ya correlacionado) agrupadas por 'campo'."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(campo).annotate(total=Count('*')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def recalcular_resumenes(queryset=None):
+    """Recalcula el resumen de las conversaciones indicadas (todas por defecto)."""
+    if queryset is None:
+        queryset = Conversation.objects.all()
+    ultimo = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+    return queryset.update(
+        last_message=Subquery(ultimo.values('pk')[:1]),
+        last_message_preview=Coalesce(
+            Subquery(ultimo.annotate(inicio=Substr('content', 1, LARGO_VISTA_PREVIA)).values('inicio')[:1]),
+            Value(''),
+        ),
+        last_message_at=Subquery(ultimo.values('timestamp')[:1]),
+        message_count=_conteo(Message.objects.filter(conversation=OuterRef('pk')), 'conversation'),
+    )
+
+
+def recalcular_participaciones(queryset=None):
+    """
+    Recalcula la fecha del último mensaje y los no leídos (mensajes de los demás posteriores
+    a la marca de lectura) de las participaciones indicadas (todas por defecto).
+    """
+    if queryset is None:
+        queryset = ConversationMembership.objects.all()
+    posteriores = Message.objects.filter(
+        conversation=OuterRef('conversation'), pk__gt=OuterRef('last_read_message_id'),
+    ).exclude(sender=OuterRef('user'))
+    no_leidos.invalidar(queryset.values_list('user_id', flat=True))
+    return queryset.update(
+        last_message_at=Subquery(Conversation.objects.filter(pk=OuterRef('conversation')).values('last_message_at')[:1]),
+        unread_count=_conteo(posteriores, 'conversation'),
+    )
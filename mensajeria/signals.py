@@ -0,0 +1,56 @@
+# mensajeria/signals.py
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import no_leidos
+from .models import Conversation, ConversationMembership, Message
+from .resumenes import recalcular_participaciones, recalcular_resumenes, registrar_envio
+
+
+@receiver(post_save, sender=Message)
+def actualizar_resumen(sender, instance, created, raw=False, **kwargs):
+    """Cada mensaje enviado actualiza el resumen de su conversación y los no leídos de sus participantes."""
+    if raw:  # loaddata: se reconstruye con recalcular_resumenes() y recalcular_participaciones()
+        return
+    if created:
+        registrar_envio(instance)
+    else:
+        # Edición desde el admin: puede haber cambiado la vista previa
+        recalcular_resumenes(Conversation.objects.filter(pk=instance.conversation_id))
+
+
+@receiver(post_delete, sender=Message)
+def actualizar_resumen_por_borrado(sender, instance, **kwargs):
+    recalcular_resumenes(Conversation.objects.filter(pk=instance.conversation_id))
+    recalcular_participaciones(ConversationMembership.objects.filter(conversation_id=instance.conversation_id))
+
+
+# --- Participantes nuevos en una conversación que ya tiene mensajes ---
+
+@receiver(post_save, sender=ConversationMembership)
+def preparar_participacion(sender, instance, created, raw=False, **kwargs):
+    """Desde el admin: el participante recién agregado ve como no leído lo que ya había."""
+    if created and not raw:
+        recalcular_participaciones(ConversationMembership.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def preparar_participaciones(sender, instance, action, reverse, pk_set, **kwargs):
+    """conversation.participants.add(...) crea las filas con bulk_create, sin post_save."""
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:  # user.conversations.add(...)
+        filtro = {'user': instance, 'conversation__in': pk_set}
+    else:
+        filtro = {'conversation': instance, 'user__in': pk_set}
+    recalcular_participaciones(ConversationMembership.objects.filter(**filtro))
+
+
+# --- Contador de no leídos en caché ---
+
+@receiver(post_save, sender=ConversationMembership)
+@receiver(post_delete, sender=ConversationMembership)
+def invalidar_no_leidos(sender, instance, **kwargs):
+    """Silenciar, editar desde el admin o salir de una conversación cambia el indicador del usuario."""
+    no_leidos.invalidar([instance.user_id])
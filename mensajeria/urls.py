@@ -8,8 +8,11 @@ app_name = 'mensajeria'
 urlpatterns = [
     path('', views.inbox, name='inbox'),
     path('<int:conversation_id>/', views.conversation_detail, name='conversation_detail'),
+    # Fragmentos de mensajes: páginas anteriores y mensajes nuevos (los pide script.js)
+    path('<int:conversation_id>/mensajes/', views.conversation_messages, name='conversation_messages'),
     # URL para iniciar nueva conversación (con o sin username en la URL)
     path('new/', views.start_new_conversation, name='start_new_conversation'), # <-- ¡Añadida o modificada!
     path('new/<str:username>/', views.start_new_conversation, name='start_new_conversation_with_user'), # <-- Nueva URL para iniciar directamente con un user
     path('toggle_archive/', views.toggle_archive_conversation, name='toggle_archive_conversation'),
+    path('<int:conversation_id>/toggle_mute/', views.toggle_mute_conversation, name='toggle_mute_conversation'),
 ]
\ No newline at end of file
@@ -4,15 +4,20 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required # Para proteger las vistas
 from django.views.decorators.http import require_POST # Para asegurar que la vista solo acepte POST
 from django.contrib.auth.models import User # Para buscar usuarios al iniciar conversaciones
-from django.db.models import Q, Max, Count # Q para OR, Max para última actividad, Count para contar participantes
+from django.db.models import Q, Count, Min, Prefetch # Q para OR, Count para contar participantes
 from django.urls import reverse # Para redirigir usando nombres de URL
 from django.http import JsonResponse, Http404 # Para respuestas JSON y manejo de 404
 from django.db import transaction # Para asegurar operaciones atómicas en la BD
-from django.utils import timezone
 
-from .models import Conversation, Message # Importa los modelos que creaste
+from blog_circadiano.pagination import paginar_por_cursor, CursorInvalido
+from .models import Conversation, ConversationMembership # Importa los modelos que creaste
+from .resumenes import marcar_leida
 from .forms import MessageForm, StartConversationForm # Importa el formulario que acabas de crear
 
+CONVERSACIONES_POR_PAGINA = 20
+# La conversación muestra solo los últimos mensajes; los anteriores se piden por páginas
+MENSAJES_POR_PAGINA = 30
+
 @login_required
 def inbox(request):
     """
@@ -22,31 +27,45 @@ def inbox(request):
     # Obtener el parámetro de filtro 'status' de la URL (ej. ?status=archived)
     conversation_status = request.GET.get('status', 'active') # 'active' por defecto
 
-    conversations_qs = Conversation.objects.filter(participants=request.user)
+    # La bandeja se lee de las participaciones del usuario: cada una trae su archivado y sus
+    # no leídos, y la fecha del último mensaje para ordenar por índice (user, last_message_at, id)
+    memberships_qs = ConversationMembership.objects.filter(user=request.user)
 
     if conversation_status == 'active':
-        conversations_qs = conversations_qs.filter(is_archived=False)
+        memberships_qs = memberships_qs.filter(is_archived=False)
     elif conversation_status == 'archived':
-        conversations_qs = conversations_qs.filter(is_archived=True)
+        memberships_qs = memberships_qs.filter(is_archived=True)
     # Si 'all', no se filtra por is_archived
 
-    conversations = conversations_qs.annotate(
-        last_message_time=Max('messages__timestamp')
-    ).filter(
-        messages__isnull=False # Solo conversaciones con al menos un mensaje
-    ).order_by('-last_message_time', '-updated_at')
+    # Solo conversaciones con al menos un mensaje. Todo lo que muestra la lista sale de la
+    # participación y del resumen de la conversación (resumenes.py): una consulta por página
+    # más la de los participantes, tenga el usuario 10 o 10.000 conversaciones.
+    memberships_qs = memberships_qs.filter(
+        last_message_at__isnull=False
+    ).select_related('conversation').prefetch_related(
+        Prefetch('conversation__participants', queryset=User.objects.only('username'))
+    )
+
+    try:
+        memberships, siguiente_cursor = paginar_por_cursor(
+            memberships_qs, request.GET.get('cursor'), por_pagina=CONVERSACIONES_POR_PAGINA, campo='last_message_at'
+        )
+    except CursorInvalido:
+        raise Http404("Página no encontrada.")
 
-    for conversation in conversations:
-        conversation.other_participant_obj = conversation.get_other_participant(request.user)
-        conversation.has_unread_messages = conversation.messages.filter(
-            is_read=False
-        ).exclude(
-            sender=request.user
-        ).exists()
+    for membership in memberships:
+        # Con los participantes precargados no hace consultas
+        membership.other_participant_obj = membership.conversation.get_other_participant(request.user)
+
+    # Conservamos ?status= en el enlace a la página siguiente
+    parametros = request.GET.copy()
+    if siguiente_cursor:
+        parametros['cursor'] = siguiente_cursor
 
     context = {
-        'conversations': conversations,
+        'memberships': memberships,
         'conversation_status': conversation_status, # Pasa el estado actual a la plantilla
+        'siguiente_pagina': parametros.urlencode() if siguiente_cursor else None,
     }
     return render(request, 'mensajeria/inbox.html', context)
 
@@ -80,12 +99,8 @@ def conversation_detail(request, conversation_id):
                     message = form.save(commit=False)
                     message.conversation = conversation
                     message.sender = request.user
-                    message.is_read = False # El mensaje es nuevo, así que no está leído por el receptor
+                    # Al guardarse, signals.py actualiza el resumen y la última actividad de la conversación
                     message.save()
-                    
-                    # Actualizar la fecha de última actividad de la conversación
-                    conversation.updated_at = timezone.now()
-                    conversation.save() # Guarda para que updated_at se actualice después del add
 
                 return redirect('mensajeria:conversation_detail', conversation_id=conversation.id)
         
@@ -101,10 +116,8 @@ def conversation_detail(request, conversation_id):
         return render(request, 'mensajeria/conversation_detail.html', context)
 
     else: # Caso de conversación existente
-        conversation = get_object_or_404(Conversation, id=conversation_id, participants=request.user)
-        messages = conversation.messages.all()
-
-        Message.objects.filter(conversation=conversation, is_read=False).exclude(sender=request.user).update(is_read=True)
+        membership = _membership_or_404(request, conversation_id)
+        conversation = membership.conversation
 
         form = MessageForm()
 
@@ -114,24 +127,100 @@ def conversation_detail(request, conversation_id):
                 message = form.save(commit=False)
                 message.conversation = conversation
                 message.sender = request.user
-                message.is_read = False
+                # Al guardarse, signals.py actualiza el resumen y la última actividad de la conversación
                 message.save()
-                
-                conversation.updated_at = timezone.now()
-                conversation.save()
 
                 return redirect('mensajeria:conversation_detail', conversation_id=conversation.id)
-        
+
+        # Solo la última página de mensajes (o la indicada con ?antes=, sin JavaScript)
+        try:
+            messages, anteriores_cursor = _pagina_mensajes(conversation, request.GET.get('antes'))
+        except CursorInvalido:
+            raise Http404("Página no encontrada.")
+
         context = {
             'conversation': conversation,
             'messages': messages,
+            'anteriores_cursor': anteriores_cursor,
             'form': form,
             'other_participant': conversation.get_other_participant(request.user),
+            'membership': membership,
+            'read_by_others_up_to': _read_by_others_up_to(request, conversation),
             'is_new_conversation': False,
         }
+        # Leer la conversación es actualizar la participación propia, no los mensajes
+        marcar_leida(membership)
         return render(request, 'mensajeria/conversation_detail.html', context)
 
 
+@login_required
+def conversation_messages(request, conversation_id):
+    """
+    Fragmento HTML con mensajes de una conversación, para script.js:
+    - ?antes=<cursor>: la página de mensajes anterior a ese cursor, con su propio enlace
+      para seguir cargando hacia atrás.
+    - ?despues=<id>: los mensajes nuevos posteriores a ese id (como mucho una página; el
+      script vuelve a preguntar desde el último que recibió).
+    """
+    membership = _membership_or_404(request, conversation_id)
+    conversation = membership.conversation
+    context = {
+        'conversation': conversation,
+        'read_by_others_up_to': _read_by_others_up_to(request, conversation),
+        'anteriores_cursor': None,
+    }
+
+    despues = request.GET.get('despues', '')
+    if despues:
+        if not despues.isdigit():
+            raise Http404("Página no encontrada.")
+        context['messages'] = list(
+            _mensajes(conversation).filter(pk__gt=despues).order_by('id')[:MENSAJES_POR_PAGINA]
+        )
+        if context['messages']:
+            # Solo hasta lo que se devuelve: si hay más de una página, el resto sigue sin leer
+            marcar_leida(membership, hasta=context['messages'][-1].pk)
+    else:
+        try:
+            context['messages'], context['anteriores_cursor'] = _pagina_mensajes(conversation, request.GET.get('antes'))
+        except CursorInvalido:
+            raise Http404("Página no encontrada.")
+
+    return render(request, 'mensajeria/partials/mensajes_pagina.html', context)
+
+
+def _membership_or_404(request, conversation_id):
+    """Participación del usuario en la conversación; 404 si no participa en ella."""
+    return get_object_or_404(
+        ConversationMembership.objects.select_related('conversation'), conversation_id=conversation_id, user=request.user
+    )
+
+
+def _mensajes(conversation):
+    # Solo lo que muestra la plantilla; el remitente viene en la misma consulta
+    return conversation.messages.select_related('sender').only(
+        'id', 'conversation_id', 'timestamp', 'content', 'sender__username'
+    )
+
+
+def _pagina_mensajes(conversation, cursor):
+    """
+    Una página de mensajes por cursor sobre (timestamp, id), de la más reciente hacia atrás
+    (índice mensaje_historial_idx). Retorna (mensajes en orden cronológico, cursor de la anterior).
+    """
+    mensajes, anteriores_cursor = paginar_por_cursor(
+        _mensajes(conversation), cursor, por_pagina=MENSAJES_POR_PAGINA, campo='timestamp'
+    )
+    return mensajes[::-1], anteriores_cursor
+
+
+def _read_by_others_up_to(request, conversation):
+    # Hasta dónde leyeron los demás: los mensajes propios hasta ahí se muestran como leídos
+    return ConversationMembership.objects.filter(
+        conversation=conversation
+    ).exclude(user=request.user).aggregate(marca=Min('last_read_message_id'))['marca'] or 0
+
+
 @login_required
 def start_new_conversation(request, username=None):
     """
@@ -196,24 +285,39 @@ def toggle_archive_conversation(request):
         return JsonResponse({'status': 'error', 'message': 'ID de conversación no proporcionado.'}, status=400)
 
     try:
-        conversation = get_object_or_404(Conversation, id=conversation_id)
-        
+        # El archivado es de cada participante: solo cambia la participación del usuario actual
+        membership = ConversationMembership.objects.filter(conversation_id=conversation_id, user=user).first()
+
         # Asegurarse de que el usuario actual es un participante de la conversación
-        if not conversation.participants.filter(id=user.id).exists():
+        if membership is None:
+            get_object_or_404(Conversation, id=conversation_id)
             return JsonResponse({'status': 'error', 'message': 'No tienes permiso para archivar esta conversación.'}, status=403)
 
         # Invertir el estado de archivado
-        conversation.is_archived = not conversation.is_archived
-        conversation.save()
+        membership.is_archived = not membership.is_archived
+        membership.save(update_fields=['is_archived'])
 
         return JsonResponse({
             'status': 'success',
-            'is_archived': conversation.is_archived, # Nuevo estado
-            'message': 'Conversación archivada' if conversation.is_archived else 'Conversación desarchivada'
+            'is_archived': membership.is_archived, # Nuevo estado
+            'message': 'Conversación archivada' if membership.is_archived else 'Conversación desarchivada'
         })
 
     except Http404:
         return JsonResponse({'status': 'error', 'message': 'Conversación no encontrada.'}, status=404)
     except Exception as e:
         print(f"Error inesperado en toggle_archive_conversation: {e}")
-        return JsonResponse({'status': 'error', 'message': 'Ocurrió un error interno del servidor.'}, status=500)
\ No newline at end of file
+        return JsonResponse({'status': 'error', 'message': 'Ocurrió un error interno del servidor.'}, status=500)
+
+
+@login_required
+@require_POST
+def toggle_mute_conversation(request, conversation_id):
+    """
+    Silencia o vuelve a activar los avisos de una conversación para el usuario actual:
+    sus no leídos no cuentan en el indicador de mensajes nuevos del menú.
+    """
+    membership = get_object_or_404(ConversationMembership, conversation_id=conversation_id, user=request.user)
+    membership.is_muted = not membership.is_muted
+    membership.save(update_fields=['is_muted'])
+    return redirect('mensajeria:conversation_detail', conversation_id=conversation_id)
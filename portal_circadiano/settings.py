@@ -67,6 +67,7 @@ INSTALLED_APPS = [
     'usuarios.apps.UsuariosConfig',
     'widget_tweaks',
     'mensajeria',
+    'tareas.apps.TareasConfig',
     'ckeditor',
     'ckeditor_uploader',
 ]
@@ -112,6 +113,23 @@ DATABASES = {
     'default': dj_database_url.config(conn_max_age=600, ssl_require=not DEBUG)
 }
 
+# --- INICIO: CACHÉ ---
+# La caché debe ser compartida entre los workers de gunicorn: ahí vive, por ejemplo, la versión
+# del registro de taxonomía (blog_circadiano/taxonomia.py). En producción usamos una tabla de la
+# base de datos (se crea con 'createcachetable' en el release); en desarrollo basta la memoria local.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_circadiano',
+    }
+}
+
+if DEBUG:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+# --- FIN: CACHÉ ---
+
 # portal_circadiano/settings.py
 
 # --- INICIO: CONFIGURACIÓN DE CLOUDINARY ---
@@ -137,6 +155,17 @@ STORAGES = {
     },
 }
 
+# Archivos con hash de contenido en el nombre (los de collectstatic y las guías de
+# 'manage.py construir_guias'): WhiteNoise los sirve con caché de un año
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+\.[0-9a-f]{12}\..+$'
+
+# Copia estática del blog público ('manage.py exportar_sitio'). Con SITIO_ESTATICO=True
+# WhiteNoise la sirve antes que las vistas: respaldo de solo lectura ante picos o caídas.
+EXPORTACION_DIR = BASE_DIR / 'sitio_estatico'
+if os.environ.get('SITIO_ESTATICO') == 'True':
+    WHITENOISE_ROOT = EXPORTACION_DIR
+    WHITENOISE_INDEX_FILE = True
+
 if not DEBUG:
     # Sobrescribe el almacenamiento "default" para usar Cloudinary en producción
     STORAGES['default']['BACKEND'] = 'cloudinary_storage.storage.MediaCloudinaryStorage'
@@ -153,7 +182,10 @@ AUTHENTICATION_BACKENDS = [
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Los correos se encolan y los envía el trabajador de tareas ('manage.py procesar_tareas')
+# con TAREAS_EMAIL_BACKEND: una conexión SMTP lenta no bloquea la petición web.
+EMAIL_BACKEND = 'tareas.correo.EmailBackendEnCola'
+TAREAS_EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -161,6 +193,10 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER_GMAIL')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD_GMAIL')
 DEFAULT_FROM_EMAIL = os.environ.get('EMAIL_HOST_USER_GMAIL')
 
+if DEBUG:
+    # En desarrollo no suele haber trabajador: los correos se muestran en la consola
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
 LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = 'account_login'
 LOGOUT_REDIRECT_URL = '/'
@@ -3,12 +3,16 @@ from django.urls import path, include # Asegúrate de importar 'include'
 from django.conf import settings # Importa settings
 from django.conf.urls.static import static # Importa static
 from blog_circadiano.views import home_view
+from blog_circadiano import sitemaps
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     #path('usuarios/', include('usuarios.urls')), # <-- Ahora incluimos las URLs de tu app 'usuarios'
     #path('', include('blog_circadiano.urls')), # Incluye las URLs de tu aplicación 'blog'
     path('', home_view, name='home'),
+    # Sitemaps para buscadores (ver blog_circadiano/sitemaps.py)
+    path('sitemap.xml', sitemaps.indice, name='sitemap'),
+    path('sitemap-<slug:seccion>.xml', sitemaps.seccion, name='sitemap_seccion'),
     path('messages/', include('mensajeria.urls')), # <-- ¡Añade esta línea para incluir las URLs de mensajería!
     # Añade las URLs de allauth
     # Esto manejará /accounts/login/, /accounts/signup/, /accounts/logout/, etc.
@@ -0,0 +1,28 @@
+# tareas/admin.py
+
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Programacion, Tarea
+
+
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ('id', 'nombre', 'estado', 'intentos', 'ejecutar_desde', 'creada', 'terminada')
+    list_filter = ('estado', 'nombre')
+    search_fields = ('nombre', 'ultimo_error')
+    readonly_fields = ('trabajador', 'bloqueada_hasta', 'creada', 'terminada', 'ultimo_error')
+    actions = ['reintentar']
+
+    def reintentar(self, request, queryset):
+        queryset.exclude(estado=Tarea.EN_CURSO).update(
+            estado=Tarea.PENDIENTE, intentos=0, ejecutar_desde=timezone.now(), terminada=None
+        )
+    reintentar.short_description = "Volver a encolar las tareas seleccionadas"
+
+
+class ProgramacionAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'proxima_ejecucion', 'ultima_ejecucion')
+
+
+admin.site.register(Tarea, TareaAdmin)
+admin.site.register(Programacion, ProgramacionAdmin)
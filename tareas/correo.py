@@ -0,0 +1,62 @@
+# tareas/correo.py
+
+"""
+Backend de correo que no envía: encola. Con EMAIL_BACKEND apuntando aquí, los
+correos de allauth (confirmación de cuenta, recuperar contraseña...) se guardan
+como tareas y los envía el trabajador con el backend de TAREAS_EMAIL_BACKEND,
+así una conexión lenta con el servidor SMTP nunca retrasa una petición web.
+
+Los adjuntos de attach(MIMEBase) son partes MIME ya armadas que no se pueden guardar
+como JSON: esos correos se envían en el momento con el backend real, como sin la cola.
+"""
+
+import base64
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tareas import enviar_correo
+
+
+def _serializar(mensaje):
+    adjuntos = []
+    for nombre, contenido, tipo in mensaje.attachments:  # adjuntos (nombre, contenido, tipo) de attach()
+        binario = isinstance(contenido, bytes)
+        if binario:
+            contenido = base64.b64encode(contenido).decode('ascii')  # JSON no admite bytes
+        adjuntos.append([nombre, contenido, tipo, binario])
+    return {
+        'subject': str(mensaje.subject),
+        'body': str(mensaje.body),
+        'from_email': mensaje.from_email,
+        'to': list(mensaje.to),
+        'cc': list(mensaje.cc),
+        'bcc': list(mensaje.bcc),
+        'reply_to': list(mensaje.reply_to),
+        'headers': dict(mensaje.extra_headers),
+        'alternatives': [[str(contenido), tipo] for contenido, tipo in getattr(mensaje, 'alternatives', [])],
+        'content_subtype': mensaje.content_subtype,
+        'encoding': mensaje.encoding,
+        'attachments': adjuntos,
+    }
+
+
+def _encolable(mensaje):
+    return not any(isinstance(adjunto, MIMEBase) for adjunto in mensaje.attachments)
+
+
+class EmailBackendEnCola(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        directos = []
+        for mensaje in email_messages:
+            if _encolable(mensaje):
+                enviar_correo.encolar(_serializar(mensaje))
+            else:
+                directos.append(mensaje)
+        enviados = len(email_messages) - len(directos)
+        if directos:
+            conexion = get_connection(settings.TAREAS_EMAIL_BACKEND, fail_silently=self.fail_silently)
+            enviados += conexion.send_messages(directos) or 0
+        return enviados
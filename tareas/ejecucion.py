@@ -0,0 +1,144 @@
+# tareas/ejecucion.py
+
+"""
+Lo que hace el trabajador ('manage.py procesar_tareas') en cada vuelta:
+
+1. programar_periodicas(): encola las tareas periódicas cuyo momento llegó.
+2. reclamar(): toma hasta N tareas pendientes. La toma es un UPDATE condicionado
+   al estado 'pendiente', así que dos trabajadores nunca ejecutan la misma tarea
+   (funciona igual en PostgreSQL y en SQLite).
+3. ejecutar(): corre cada tarea. Si falla se reintenta más tarde con espera
+   exponencial, hasta max_intentos; después queda como 'fallida' con su error.
+   Mientras corre, un hilo adelanta su bloqueada_hasta cada SEGUNDOS_RENOVACION:
+   reclamar() solo devuelve a la cola las tareas cuyo trabajador dejó de renovarlas
+   (murió), no las que simplemente tardan más que SEGUNDOS_BLOQUEO.
+"""
+
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.utils import timezone
+
+from . import registro
+from .models import Programacion, Tarea
+
+logger = logging.getLogger(__name__)
+
+SEGUNDOS_BLOQUEO = 15 * 60        # sin renovación en este plazo, se considera muerto a su trabajador
+SEGUNDOS_RENOVACION = 5 * 60      # cada cuánto el trabajador renueva el bloqueo de la tarea en curso
+ESPERA_BASE_REINTENTO = 30        # segundos; se duplica en cada intento
+ESPERA_MAXIMA_REINTENTO = 60 * 60
+
+
+def programar_periodicas():
+    ahora = timezone.now()
+    for nombre, segundos in registro.periodicas().items():
+        programacion, _ = Programacion.objects.get_or_create(nombre=nombre, defaults={'proxima_ejecucion': ahora})
+        if programacion.proxima_ejecucion > ahora:
+            continue
+        # Solo el trabajador que logra mover la fecha encola (si hay varios, los demás no ven la fila vigente)
+        movida = Programacion.objects.filter(
+            pk=programacion.pk, proxima_ejecucion=programacion.proxima_ejecucion
+        ).update(proxima_ejecucion=ahora + timedelta(seconds=segundos), ultima_ejecucion=ahora)
+        if movida:
+            registro.encolar(nombre)
+
+
+def reclamar(trabajador, limite):
+    """Toma hasta 'limite' tareas pendientes y las retorna ya marcadas como 'en curso'."""
+    ahora = timezone.now()
+
+    # Tareas de un trabajador que murió sin terminarlas: vuelven a la cola
+    Tarea.objects.filter(estado=Tarea.EN_CURSO, bloqueada_hasta__lt=ahora).update(
+        estado=Tarea.PENDIENTE, trabajador=''
+    )
+
+    candidatas = Tarea.objects.filter(estado=Tarea.PENDIENTE, ejecutar_desde__lte=ahora).values_list('pk', flat=True)
+    tomadas = []
+    for pk in candidatas[:limite * 2]:
+        tomada = Tarea.objects.filter(pk=pk, estado=Tarea.PENDIENTE).update(
+            estado=Tarea.EN_CURSO,
+            trabajador=trabajador,
+            bloqueada_hasta=ahora + timedelta(seconds=SEGUNDOS_BLOQUEO),
+            intentos=F('intentos') + 1,
+        )
+        if tomada:
+            tomadas.append(pk)
+            if len(tomadas) >= limite:
+                break
+    return list(Tarea.objects.filter(pk__in=tomadas))
+
+
+def _espera_reintento(intentos):
+    return timedelta(seconds=min(ESPERA_BASE_REINTENTO * 2 ** (intentos - 1), ESPERA_MAXIMA_REINTENTO))
+
+
+@contextmanager
+def _bloqueo_renovado(tarea):
+    """Mantiene la tarea bloqueada para este trabajador mientras dura el bloque."""
+    terminada = threading.Event()
+
+    def renovar():
+        try:
+            while not terminada.wait(SEGUNDOS_RENOVACION):
+                try:
+                    renovada = Tarea.objects.filter(
+                        pk=tarea.pk, estado=Tarea.EN_CURSO, trabajador=tarea.trabajador
+                    ).update(bloqueada_hasta=timezone.now() + timedelta(seconds=SEGUNDOS_BLOQUEO))
+                except DatabaseError:
+                    logger.exception("Tarea %s: no se pudo renovar el bloqueo", tarea.pk)
+                    continue
+                if not renovada:
+                    logger.warning("Tarea %s (%s): otro trabajador la reclamó", tarea.pk, tarea.nombre)
+                    return
+        finally:
+            connection.close()  # la conexión de este hilo
+
+    hilo = threading.Thread(target=renovar, name=f'renovar-tarea-{tarea.pk}', daemon=True)
+    hilo.start()
+    try:
+        yield
+    finally:
+        terminada.set()
+        hilo.join()
+
+
+def ejecutar(tarea):
+    """Corre una tarea ya reclamada y guarda el resultado. Retorna True si terminó bien."""
+    cambios = {'trabajador': '', 'bloqueada_hasta': None}
+    try:
+        funcion = registro.obtener(tarea.nombre)
+    except KeyError:
+        # Código que ya no existe (o que este trabajador no cargó): reintentar no sirve
+        logger.error("Tarea %s: '%s' no está registrada", tarea.pk, tarea.nombre)
+        cambios.update(estado=Tarea.FALLIDA, terminada=timezone.now(), ultimo_error="Tarea no registrada.")
+        Tarea.objects.filter(pk=tarea.pk, trabajador=tarea.trabajador).update(**cambios)
+        return False
+
+    try:
+        with _bloqueo_renovado(tarea):
+            funcion(*tarea.argumentos.get('args', []), **tarea.argumentos.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        if tarea.intentos >= tarea.max_intentos:
+            logger.error("Tarea %s (%s) fallida tras %s intentos", tarea.pk, tarea.nombre, tarea.intentos)
+            cambios.update(estado=Tarea.FALLIDA, terminada=timezone.now(), ultimo_error=error)
+        else:
+            logger.warning("Tarea %s (%s) falló; se reintentará", tarea.pk, tarea.nombre)
+            cambios.update(
+                estado=Tarea.PENDIENTE,
+                ejecutar_desde=timezone.now() + _espera_reintento(tarea.intentos),
+                ultimo_error=error,
+            )
+        exito = False
+    else:
+        cambios.update(estado=Tarea.COMPLETADA, terminada=timezone.now())
+        exito = True
+
+    Tarea.objects.filter(pk=tarea.pk, trabajador=tarea.trabajador).update(**cambios)
+    return exito
@@ -0,0 +1,63 @@
+# tareas/management/commands/procesar_tareas.py
+
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from tareas.ejecucion import ejecutar, programar_periodicas, reclamar
+
+
+class Command(BaseCommand):
+    help = (
+        "Trabajador de la cola de tareas: ejecuta las tareas pendientes (varias a la vez con "
+        "--concurrencia), reintenta las que fallan y encola las periódicas. Termina limpio con SIGTERM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=1, help="Tareas ejecutadas en paralelo (hilos).")
+        parser.add_argument('--intervalo', type=float, default=2.0, help="Segundos de espera cuando no hay tareas.")
+        parser.add_argument('--una-vez', action='store_true', help="Procesa lo pendiente y termina (útil en cron o pruebas).")
+
+    def handle(self, *args, **options):
+        concurrencia = max(1, options['concurrencia'])
+        nombre = f'{socket.gethostname()}:{os.getpid()}'
+        self.detener = False
+        signal.signal(signal.SIGTERM, self._detener)
+        signal.signal(signal.SIGINT, self._detener)
+
+        self.stdout.write(f"Trabajador {nombre} iniciado (concurrencia {concurrencia}).")
+        completadas = fallidas = 0
+        with ThreadPoolExecutor(max_workers=concurrencia) as hilos:
+            while not self.detener:
+                close_old_connections()
+                programar_periodicas()
+                tareas = reclamar(nombre, concurrencia)
+                if not tareas:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+                for exito in hilos.map(self._ejecutar_en_hilo, tareas):
+                    completadas += exito
+                    fallidas += not exito
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Trabajador {nombre} detenido: {completadas} tareas completadas, {fallidas} con error."
+        ))
+
+    def _detener(self, *args):
+        # Termina las tareas en curso y sale en la próxima vuelta
+        self.detener = True
+
+    @staticmethod
+    def _ejecutar_en_hilo(tarea):
+        try:
+            return ejecutar(tarea)
+        finally:
+            # Cada hilo abre su propia conexión: se cierra para no dejarlas colgando
+            connection.close()
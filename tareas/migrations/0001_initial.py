@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 07:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Programacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=200, unique=True)),
+                ('proxima_ejecucion', models.DateTimeField()),
+                ('ultima_ejecucion', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Programación',
+                'verbose_name_plural': 'Programaciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='Tarea',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(help_text='Nombre con que se registró la función.', max_length=200)),
+                ('argumentos', models.JSONField(blank=True, default=dict, help_text="{'args': [...], 'kwargs': {...}}")),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_curso', 'En curso'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('ejecutar_desde', models.DateTimeField(default=django.utils.timezone.now)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('max_intentos', models.PositiveSmallIntegerField(default=5)),
+                ('trabajador', models.CharField(blank=True, max_length=100)),
+                ('bloqueada_hasta', models.DateTimeField(blank=True, null=True)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('terminada', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['ejecutar_desde', 'id'],
+                'indexes': [models.Index(fields=['estado', 'ejecutar_desde'], name='tarea_cola_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# tareas/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class Tarea(models.Model):
+    """
+    Una ejecución pendiente (o ya hecha) de una función registrada con @tarea.
+    La guarda registro.encolar() y la ejecuta 'manage.py procesar_tareas'.
+    """
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    COMPLETADA = 'completada'
+    FALLIDA = 'fallida'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_CURSO, 'En curso'),
+        (COMPLETADA, 'Completada'),
+        (FALLIDA, 'Fallida'),
+    ]
+
+    nombre = models.CharField(max_length=200, help_text="Nombre con que se registró la función.")
+    argumentos = models.JSONField(default=dict, blank=True, help_text="{'args': [...], 'kwargs': {...}}")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    ejecutar_desde = models.DateTimeField(default=timezone.now)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    max_intentos = models.PositiveSmallIntegerField(default=5)
+    # Mientras corre, la tarea queda a nombre de un trabajador hasta 'bloqueada_hasta';
+    # si el trabajador muere, pasado ese plazo otro la vuelve a tomar.
+    trabajador = models.CharField(max_length=100, blank=True)
+    bloqueada_hasta = models.DateTimeField(null=True, blank=True)
+    ultimo_error = models.TextField(blank=True)
+    creada = models.DateTimeField(auto_now_add=True)
+    terminada = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['ejecutar_desde', 'id']
+        indexes = [
+            # La consulta del trabajador: pendientes cuyo momento ya llegó, en orden
+            models.Index(fields=['estado', 'ejecutar_desde'], name='tarea_cola_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} ({self.get_estado_display()})"
+
+
+class Programacion(models.Model):
+    """Próxima ejecución de cada tarea periódica (@tarea(cada=...)), compartida por todos los trabajadores."""
+    nombre = models.CharField(max_length=200, unique=True)
+    proxima_ejecucion = models.DateTimeField()
+    ultima_ejecucion = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Programación"
+        verbose_name_plural = "Programaciones"
+
+    def __str__(self):
+        return self.nombre
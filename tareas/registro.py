@@ -0,0 +1,77 @@
+# tareas/registro.py
+
+"""
+Registro de funciones que pueden ejecutarse en segundo plano.
+
+    from tareas.registro import tarea
+
+    @tarea
+    def enviar_resumen(usuario_id):
+        ...
+
+    enviar_resumen.encolar(usuario.pk)              # lo antes posible
+    enviar_resumen.encolar_en(60, usuario.pk)       # dentro de 60 segundos
+
+    @tarea(cada=60 * 60 * 24)                       # además, una vez al día
+    def limpiar():
+        ...
+
+Los argumentos se guardan como JSON: solo números, textos, listas, diccionarios
+y None (se pasan ids, no instancias de modelos). Encolar dentro de una transacción
+es atómico: la tarea solo existe para el trabajador si la transacción confirma.
+"""
+
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import Tarea
+
+_registradas = {}
+_periodicas = {}
+
+
+def tarea(funcion=None, *, nombre=None, max_intentos=5, cada=None):
+    """Decorador. 'cada' (segundos) la convierte además en tarea periódica."""
+    def registrar(f):
+        clave = nombre or f'{f.__module__}.{f.__qualname__}'
+        _registradas[clave] = f
+        if cada:
+            _periodicas[clave] = cada
+        f.nombre_tarea = clave
+        f.max_intentos = max_intentos
+        f.encolar = lambda *args, **kwargs: encolar(clave, *args, **kwargs)
+        f.encolar_en = lambda cuando, *args, **kwargs: encolar_en(cuando, clave, *args, **kwargs)
+        return f
+    return registrar(funcion) if funcion is not None else registrar
+
+
+def obtener(nombre):
+    return _registradas[nombre]
+
+
+def periodicas():
+    return dict(_periodicas)
+
+
+def encolar_en(cuando, nombre, *args, **kwargs):
+    """
+    Guarda una ejecución de la tarea 'nombre'. 'cuando' es un datetime, una cantidad
+    de segundos desde ahora o None (lo antes posible).
+    """
+    if nombre not in _registradas:
+        raise KeyError(f"Tarea no registrada: {nombre}")
+    if cuando is None:
+        cuando = timezone.now()
+    elif not isinstance(cuando, datetime):
+        cuando = timezone.now() + timedelta(seconds=cuando)
+    return Tarea.objects.create(
+        nombre=nombre,
+        argumentos={'args': list(args), 'kwargs': kwargs},
+        ejecutar_desde=cuando,
+        max_intentos=_registradas[nombre].max_intentos,
+    )
+
+
+def encolar(nombre, *args, **kwargs):
+    return encolar_en(None, nombre, *args, **kwargs)
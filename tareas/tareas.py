@@ -0,0 +1,42 @@
+# tareas/tareas.py
+
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from .models import Tarea
+from .registro import tarea
+
+DIAS_CONSERVAR_COMPLETADAS = 7
+
+
+@tarea(max_intentos=8)
+def enviar_correo(datos):
+    """Envía un correo encolado por correo.EmailBackendEnCola con el backend real (TAREAS_EMAIL_BACKEND)."""
+    mensaje = EmailMultiAlternatives(
+        subject=datos['subject'],
+        body=datos['body'],
+        from_email=datos['from_email'],
+        to=datos['to'],
+        cc=datos['cc'],
+        bcc=datos['bcc'],
+        reply_to=datos['reply_to'],
+        headers=datos['headers'],
+        alternatives=[tuple(a) for a in datos['alternatives']],
+    )
+    mensaje.content_subtype = datos['content_subtype']
+    mensaje.encoding = datos['encoding']
+    for nombre, contenido, tipo, binario in datos['attachments']:
+        mensaje.attach(nombre, base64.b64decode(contenido) if binario else contenido, tipo)
+    # Sin fail_silently: si el servidor SMTP falla, la tarea se reintenta más tarde
+    get_connection(settings.TAREAS_EMAIL_BACKEND).send_messages([mensaje])
+
+
+@tarea(cada=60 * 60 * 24)
+def purgar_completadas():
+    """Borra las tareas completadas hace más de una semana (las fallidas se conservan para revisión)."""
+    limite = timezone.now() - timedelta(days=DIAS_CONSERVAR_COMPLETADAS)
+    Tarea.objects.filter(estado=Tarea.COMPLETADA, terminada__lt=limite).delete()